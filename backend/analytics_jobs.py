@@ -0,0 +1,155 @@
+import heapq
+
+import numpy as np
+
+from job_executor import JobError, JobKind
+from optimizer import OptimizerError, check_request, objective_fields, optimize_catalog
+from weapon_table import ATTRIBUTES
+
+# Chunks per job; more than the pool size so uneven chunks still balance
+CHUNKS = 16
+MAX_RESULTS = 100
+MAX_PROFILES = 256
+
+
+def sweep_weapon(table, row, level, stats, attributes=ATTRIBUTES):
+    """/api/sweep entry for one table row: level clamped per upgrade stone, stats already clamped."""
+    row_level = max(0, min(int(level), int(table.max_levels()[row])))
+    curves = table.sweep(row, row_level, attributes=attributes, **stats)
+    return {'name': table.names()[row], 'level': row_level, **stats, 'curves': curves}
+
+
+def _profile(source, default_level=1):
+    profile = {'level': int(source.get('level', default_level))}
+    for stat in ATTRIBUTES:
+        profile[stat] = max(1, min(int(source.get(stat, 10)), 99))
+    return profile
+
+
+def _weapon_type(params):
+    weapon_type = params.get('type')
+    if weapon_type is not None and not isinstance(weapon_type, str):
+        raise JobError('type must be a string')
+    return weapon_type
+
+
+def _rows(table, weapon_type):
+    if weapon_type is None:
+        return np.arange(len(table))
+    return np.array([row for row, row_type in enumerate(table.types()) if row_type == weapon_type], dtype=np.intp)
+
+
+def _chunks(rows):
+    if not len(rows):
+        return []
+    return [chunk.tolist() for chunk in np.array_split(rows, min(CHUNKS, len(rows))) if len(chunk)]
+
+
+def _limit(params, default):
+    return max(1, min(int(params.get('limit', default)), MAX_RESULTS))
+
+
+def plan_optimize(table, params):
+    """Catalog-wide build search; same body as POST /api/optimize without a name"""
+    if 'budget' not in params:
+        raise JobError('optimize jobs need a budget')
+    minimums = params.get('minimums') or {}
+    if not isinstance(minimums, dict):
+        raise JobError('minimums must be an object of attribute minimums')
+    params = {
+        'level': int(params.get('level', 1)),
+        'budget': int(params['budget']),
+        'minimums': {stat: int(value) for stat, value in minimums.items()},
+        'objective': params.get('objective', 'total'),
+        'limit': _limit(params, 1),
+        'type': _weapon_type(params)
+    }
+    check_request(params['budget'], params['minimums'], params['objective'])
+    return params, _chunks(_rows(table, params['type']))
+
+
+def run_optimize(table, params, rows):
+    return optimize_catalog(table, params['level'], params['budget'], params['minimums'], params['objective'],
+                            params['limit'], rows)
+
+
+def combine_optimize(table, params, results):
+    best = heapq.nlargest(params['limit'], (result for chunk in results for result in chunk),
+                          key=lambda result: result['score'])
+    return {'results': best}
+
+
+def plan_sweep(table, params):
+    """Level and attribute curves (as /api/sweep) for every weapon, or every weapon of a type"""
+    profile = _profile(params)
+    attributes = params.get('attributes') or list(ATTRIBUTES)
+    # A string would otherwise be taken apart into single characters
+    if not isinstance(attributes, list):
+        raise JobError('attributes must be a list of attribute names')
+    unknown = [str(attribute) for attribute in attributes if attribute not in ATTRIBUTES]
+    if unknown:
+        raise JobError(f"Unknown attributes: {', '.join(unknown)}")
+    params = {**profile, 'attributes': attributes, 'type': _weapon_type(params)}
+    return params, _chunks(_rows(table, params['type']))
+
+
+def run_sweep(table, params, rows):
+    stats = {stat: params[stat] for stat in ATTRIBUTES}
+    return [sweep_weapon(table, row, params['level'], stats, params['attributes']) for row in rows]
+
+
+def combine_sweep(table, params, results):
+    return {'weapons': [weapon for chunk in results for weapon in chunk]}
+
+
+def plan_rank(table, params):
+    """Top weapons by a metric under each of many stat profiles"""
+    profiles = params.get('profiles')
+    if (not isinstance(profiles, list) or not profiles or len(profiles) > MAX_PROFILES or
+            not all(isinstance(profile, dict) for profile in profiles)):
+        raise JobError(f'profiles must be a list of 1 to {MAX_PROFILES} stat profiles')
+    params = {
+        'profiles': [_profile(profile) for profile in profiles],
+        'metric': params.get('metric', 'total'),
+        'limit': _limit(params, 10),
+        'type': _weapon_type(params)
+    }
+    objective_fields(params['metric'])
+    return params, _chunks(_rows(table, params['type']))
+
+
+def run_rank(table, params, rows):
+    """Best limit (score, row) pairs of this chunk for every profile."""
+    rows = np.asarray(rows, dtype=np.intp)
+    fields = objective_fields(params['metric'])
+    max_levels = table.max_levels()[rows]
+    ranked = []
+    for profile in params['profiles']:
+        stats = {stat: profile[stat] for stat in ATTRIBUTES}
+        scaled = table.evaluate_pairs(rows, level=np.clip(profile['level'], 0, max_levels), **stats)
+        scores = sum(scaled[field] for field in fields)
+        top = np.argsort(-scores, kind='stable')[:params['limit']]
+        ranked.append([(scores[i].item(), int(rows[i])) for i in top])
+    return ranked
+
+
+def combine_rank(table, params, results):
+    names = table.names()
+    types = table.types()
+    rankings = []
+    for i, profile in enumerate(params['profiles']):
+        candidates = [pair for chunk in results for pair in chunk[i]]
+        best = heapq.nsmallest(params['limit'], candidates, key=lambda pair: (-pair[0], pair[1]))
+        rankings.append({
+            'profile': profile,
+            'results': [{'name': names[row], 'type': types[row], 'score': score} for score, row in best]
+        })
+    return {'rankings': rankings}
+
+
+JOB_KINDS = {
+    'optimize': JobKind(plan_optimize, run_optimize, combine_optimize),
+    'sweep': JobKind(plan_sweep, run_sweep, combine_sweep),
+    'rank': JobKind(plan_rank, run_rank, combine_rank)
+}
+PARAMETER_ERRORS = (JobError, OptimizerError, TypeError, ValueError)
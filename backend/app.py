@@ -1,14 +1,59 @@
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, g, jsonify, request, send_from_directory
 from flask_cors import CORS
-from weapon import Weapon
+from weapon import WeaponRecord
 from collection import CollectionObjects
+from weapon_table import WeaponTable
+from name_index import NameIndex
+from payload_cache import CachedPayload
+from optimizer import MAX_STAT, MIN_STAT, OptimizerError, objective_fields, optimize_allocation, optimize_catalog
+from scaling_tables import ScalingTables
+from catalog_snapshot import CatalogSnapshot, write_snapshot
+from stat_cache import ScaledStatCache
+from catalog_query import CatalogIndex, QueryError, NUMERIC_FIELDS, DEFAULT_LIMIT
+from weapon_table import ATTRIBUTES, REGULAR_MAX_LEVEL
+from pareto import skyline
+from search_index import SearchIndex
+from job_executor import JobExecutor
+from analytics_jobs import JOB_KINDS, PARAMETER_ERRORS, sweep_weapon
+from metrics import MetricsRegistry
+from request_sampler import RequestSampler
+from live_session import SessionError, SessionStore
+from wire_format import FormatError, parse_fields, parse_layout, respond, shape
+import numpy as np
 import csv
+import functools
+import json
 import os
+import threading
+import time
 
 app = Flask(__name__)
 
 # Define BASE_DIR based on the current working directory
 BASE_DIR = os.getcwd()
+WEAPONS_CSV_PATH = os.path.join(BASE_DIR, 'data', 'weapons.csv')
+ELDEN_RING_WEAPON_CSV_PATH = os.path.join(BASE_DIR, 'data', 'elden_ring_weapon.csv')
+# Built offline with `python scaling_tables.py`; compiled at load time when missing or stale
+SCALING_TABLES_PATH = os.path.join(BASE_DIR, 'data', 'scaling_tables.npz')
+# Built offline with `python catalog_snapshot.py`, or by the first worker that finds it stale
+SNAPSHOT_PATH = os.path.join(BASE_DIR, 'data', 'weapons.snapshot')
+SNAPSHOT_SOURCES = [ELDEN_RING_WEAPON_CSV_PATH, WEAPONS_CSV_PATH]
+
+# Scaled results kept per worker for repeated slider profiles
+STAT_CACHE_SIZE = 4096
+# Processes in the job runner's pool. They share the host with the gunicorn workers serving
+# requests, so one by default; raise it where jobs have cores of their own
+JOB_WORKERS = max(1, int(os.environ.get('JOB_WORKERS', 1)))
+# Opt-in: profile requests slower than this many milliseconds (off when unset)
+PROFILE_SLOW_REQUESTS_MS = os.environ.get('PROFILE_SLOW_REQUESTS_MS')
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(BASE_DIR, 'profiles'))
+# Live session documents, shared by every worker; must be one directory for all of them.
+# Created by the first session or job, not at import
+SESSION_DIR = os.environ.get('SESSION_DIR', os.path.join(BASE_DIR, 'sessions'))
+# Job documents and results, shared by every worker like SESSION_DIR
+JOB_DIR = os.environ.get('JOB_DIR', os.path.join(BASE_DIR, 'jobs'))
+
+SCALE_GRADES = {'-': 0, 'S': 7.0, 'A': 5.5, 'B': 4.5, 'C': 3.5, 'D': 2.5, 'E': 1.5}
 
 CORS(app, resources={
     r"/*": {
@@ -18,121 +63,369 @@ CORS(app, resources={
     }
 })
 
-# Initialize weapons collection globally
-weapons_collection = CollectionObjects()
+# Weapons grouped by type; dropped by load_weapons() and built on first use (see current_collection())
+weapons_collection = None
+weapons_collection_lock = threading.Lock()
+# Columnar catalog for batched scoring, over the mapped snapshot when there is one; rebuilt by load_weapons()
+weapons_table = None
+# Normalized name -> row in weapons_table, rebuilt by load_weapons()
+weapons_index = NameIndex()
+# Lookup tables behind get_weapon, rebuilt by load_weapons()
+scaling_tables = None
+# Memoized get_weapon results, reset by load_weapons()
+stat_cache = ScaledStatCache(STAT_CACHE_SIZE)
+# Serialized /api/weapons body, rebuilt by load_weapons() since it only changes with the data
+weapons_payload = None
+# Cached variants of weapons_payload for PROJECTION_PRESETS, keyed by (fields, layout), built on first request
+projected_payloads = {}
+projected_payloads_lock = threading.Lock()
+# The (fields, layout) projections worth caching; any other projection is serialized per request
+PROJECTION_PRESETS = {
+    (None, 'columns'),                              # the whole catalog, one list per field
+    (('name',), 'rows'),                            # name lists for pickers
+    (('name',), 'columns'),
+    (('name', 'type', 'weight', 'value'), 'rows'),  # what the weapon cards show
+}
+# Full-text and typeahead index over names and descriptions; dropped by load_weapons() and built on the
+# first search after it, so workers that never serve one never pay for it (see current_search_index())
+search_index = None
+search_index_lock = threading.Lock()
+# Live stat sessions of every worker, keyed by weapon name so they survive reloads and restarts
+live_sessions = SessionStore(SESSION_DIR)
+# Background analytics jobs of every worker, run by one of them; reset by load_weapons() with the new catalog
+job_executor = JobExecutor(JOB_KINDS, JOB_DIR, JOB_WORKERS)
 
-def load_weapons():
-    """Load weapons from CSV file into collection"""
+# Instrumentation, served at /metrics
+metrics = MetricsRegistry('eldenarmory_')
+request_duration = metrics.histogram('request_duration_seconds', 'Request latency by route', ('endpoint', 'method'))
+requests_total = metrics.counter('requests_total', 'Requests by route and status', ('endpoint', 'method', 'status'))
+request_errors = metrics.counter('request_errors_total', 'Requests answered with a 5xx status', ('endpoint',))
+scaling_duration = metrics.histogram('scaling_duration_seconds', 'Time spent scaling weapon stats', ('endpoint',))
+catalog_load_duration = metrics.gauge('catalog_load_duration_seconds', 'Duration of the last catalog load')
+catalog_loads = metrics.counter('catalog_loads_total', 'Catalog loads by weapon source', ('source',))
+catalog_weapons = metrics.gauge('catalog_weapons', 'Weapons in the loaded catalog')
+# Only the encodings built so far, so a scrape never compresses the catalog
+metrics.gauge('catalog_payload_bytes', 'Size of the /api/weapons body', ('encoding',),
+              function=lambda: {} if weapons_payload is None else {
+                  (encoding,): size for encoding, size in weapons_payload.built_sizes().items()})
+metrics.gauge('stat_cache_entries', 'Scaled results held by the stat cache',
+              function=lambda: stat_cache.stats()['size'])
+metrics.counter('stat_cache_lookups_total', 'Stat cache lookups by result', ('result',),
+                function=lambda: {('hit',): stat_cache.stats()['hits'], ('miss',): stat_cache.stats()['misses']})
+metrics.gauge('live_sessions', 'Open live stat sessions', function=lambda: len(live_sessions))
+metrics.gauge('jobs', 'Background jobs of every worker', ('status',),
+              function=lambda: {(status,): count for status, count in job_executor.stats()['by_status'].items()})
+slow_request_profiles = metrics.counter('slow_request_profiles_total', 'Slow request profiles written', ('endpoint',))
+
+request_sampler = None
+if PROFILE_SLOW_REQUESTS_MS:
+    request_sampler = RequestSampler(PROFILE_DIR, threshold=float(PROFILE_SLOW_REQUESTS_MS) / 1000)
+    request_sampler.start()
+# Sorted and bitmap indexes behind filtered /api/weapons queries
+catalog_index = None
+
+def read_weapon_csvs():
+    """Parse both CSV files into a list of weapons"""
+    weapons = []
+    # Index image URLs and descriptions by normalized weapon name
+    weapon_details = NameIndex()
+    weapons_csv_path, elden_ring_weapon_csv_path = WEAPONS_CSV_PATH, ELDEN_RING_WEAPON_CSV_PATH
+
+    print(f"Looking for weapons CSV at: {weapons_csv_path}")
+    print(f"Looking for elden ring CSV at: {elden_ring_weapon_csv_path}")
+
+    # First, load the weapon details from weapons.csv
     try:
-        # Create a dictionary to store image URLs and descriptions
-        weapon_details = {}
-        weapons_csv_path = os.path.join(BASE_DIR, 'data', 'weapons.csv')
-        elden_ring_weapon_csv_path = os.path.join(BASE_DIR, 'data', 'elden_ring_weapon.csv')
-        
-        print(f"Looking for weapons CSV at: {weapons_csv_path}")
-        print(f"Looking for elden ring CSV at: {elden_ring_weapon_csv_path}")
-        
-        # First, load the weapon details from weapons.csv
-        try:
-            with open(weapons_csv_path, 'r', encoding='utf-8') as file:
-                reader = csv.reader(file)
-                next(reader)  # Skip header
-                for line in reader:
-                    weapon_name = line[1].strip()  # name column, strip whitespace
-                    image_url = line[2]    # image column
-                    description = line[3]   # description column
-                    # Store with lowercase key for case-insensitive matching
-                    weapon_details[weapon_name.lower()] = {
-                        'image_url': image_url,
-                        'description': description
-                    }
-                print(f"Loaded details for {len(weapon_details)} weapons")
-        except Exception as e:
-            print(f"Error loading weapons.csv: {str(e)}")
-            weapon_details = {}
-
-        print("Loading main weapon stats...")
-        with open(elden_ring_weapon_csv_path, 'r', encoding='utf-8') as file:
+        with open(weapons_csv_path, 'r', encoding='utf-8') as file:
             reader = csv.reader(file)
             next(reader)  # Skip header
-            count = 0
             for line in reader:
-                name = line[0].strip()  # Strip whitespace
-                weapon_type = line[1]
-                # Directly use the values from CSV - they're already the correct numbers
-                physical_dmg = int(line[2]) if line[2] != '-' else 0
-                magic_dmg = int(line[3]) if line[3] != '-' else 0
-                fire_dmg = int(line[4]) if line[4] != '-' else 0
-                light_dmg = int(line[5]) if line[5] != '-' else 0
-                holy_dmg = int(line[6]) if line[6] != '-' else 0
-                crit_dmg = int(line[7]) if line[7] != '-' else 0
-                stamina_dmg = int(line[8]) if line[8] != '-' else 0
-                
-                # Parse scaling values
-                scale_dict = {'-': 0, 'S': 7.0, 'A': 5.5, 'B': 4.5, 'C': 3.5, 'D': 2.5, 'E': 1.5}
-                str_scale = scale_dict[line[9]]
-                dex_scale = scale_dict[line[10]]
-                int_scale = scale_dict[line[11]]
-                fai_scale = scale_dict[line[12]]
-                arc_scale = scale_dict[line[13]]
-                
-                weight = float(line[22]) if line[22] != '-' else 0.0
-                upgrade_type = line[23]
-                
-                # Case-insensitive lookup for weapon details
-                details = weapon_details.get(name.lower(), {'image_url': '', 'description': ''})
-                
-                weapon = Weapon(
-                    name, weapon_type, physical_dmg, magic_dmg, fire_dmg, 
-                    light_dmg, holy_dmg, crit_dmg, stamina_dmg, 
-                    str_scale, dex_scale, int_scale, fai_scale, arc_scale,
-                    weight, upgrade_type, details['image_url'], details['description']
-                )
-                weapons_collection.add_object(weapon, weapon_type)
-                count += 1
-            print(f"Successfully loaded {count} weapons")
-            return True
+                weapon_name = line[1]  # name column
+                image_url = line[2]    # image column
+                description = line[3]   # description column
+                weapon_details.add(weapon_name, {
+                    'image_url': image_url,
+                    'description': description
+                })
+            print(f"Loaded details for {len(weapon_details)} weapons")
+    except Exception as e:
+        print(f"Error loading weapons.csv: {str(e)}")
+        weapon_details = NameIndex()
+
+    print("Loading main weapon stats...")
+    with open(elden_ring_weapon_csv_path, 'r', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        next(reader)  # Skip header
+        for line in reader:
+            name = line[0].strip()  # Strip whitespace
+            weapon_type = line[1]
+            # Directly use the values from CSV - they're already the correct numbers
+            physical_dmg = int(line[2]) if line[2] != '-' else 0
+            magic_dmg = int(line[3]) if line[3] != '-' else 0
+            fire_dmg = int(line[4]) if line[4] != '-' else 0
+            light_dmg = int(line[5]) if line[5] != '-' else 0
+            holy_dmg = int(line[6]) if line[6] != '-' else 0
+            crit_dmg = int(line[7]) if line[7] != '-' else 0
+            stamina_dmg = int(line[8]) if line[8] != '-' else 0
+
+            # Parse scaling values
+            str_scale = SCALE_GRADES[line[9]]
+            dex_scale = SCALE_GRADES[line[10]]
+            int_scale = SCALE_GRADES[line[11]]
+            fai_scale = SCALE_GRADES[line[12]]
+            arc_scale = SCALE_GRADES[line[13]]
+
+            weight = float(line[22]) if line[22] != '-' else 0.0
+            upgrade_type = line[23]
+
+            # Normalized (case, accent and punctuation insensitive) lookup for weapon details
+            details = weapon_details.get(name, {'image_url': '', 'description': ''})
+
+            weapons.append(WeaponRecord(
+                name, weapon_type, physical_dmg, magic_dmg, fire_dmg,
+                light_dmg, holy_dmg, crit_dmg, stamina_dmg,
+                str_scale, dex_scale, int_scale, fai_scale, arc_scale,
+                weight, upgrade_type, details['image_url'], details['description']
+            ))
+    return weapons
+
+def table_order(weapons):
+    """Weapons grouped by type in order of first appearance, the row order of WeaponTable.from_collection()"""
+    groups = {}
+    for weapon in weapons:
+        groups.setdefault(weapon.type(), []).append(weapon)
+    return [weapon for group in groups.values() for weapon in group]
+
+def read_catalog():
+    """WeaponTable over the binary snapshot when it is fresh, otherwise from the CSVs (refreshing the snapshot)"""
+    snapshot = CatalogSnapshot.open(SNAPSHOT_PATH, SNAPSHOT_SOURCES)
+    if snapshot is not None and snapshot.is_fresh():
+        print(f"Loading weapons from snapshot at: {SNAPSHOT_PATH}")
+        catalog_loads.inc('snapshot')
+        return WeaponTable.from_snapshot(snapshot)
+
+    weapons = table_order(read_weapon_csvs())
+    catalog_loads.inc('csv')
+    try:
+        write_snapshot(SNAPSHOT_PATH, weapons, SNAPSHOT_SOURCES)
+        print(f"Wrote weapons snapshot to: {SNAPSHOT_PATH}")
+        # Serve from the mapping too, so this worker shares it with the others
+        return WeaponTable.from_snapshot(CatalogSnapshot.load(SNAPSHOT_PATH, SNAPSHOT_SOURCES))
+    except (OSError, ValueError) as e:
+        print(f"Could not write weapons snapshot: {str(e)}")
+    return WeaponTable(weapons)
+
+def load_weapons():
+    """Load weapons into the collection and build the derived lookup structures"""
+    global weapons_table, weapons_index, weapons_payload, scaling_tables, catalog_index
+    global projected_payloads, search_index, weapons_collection
+    try:
+        started = time.perf_counter()
+        weapons_table = read_catalog()
+        count = len(weapons_table)
+        # Rebuilt from the new table on first use, so a reload replaces the catalog instead of appending to it
+        weapons_collection = None
+        index = NameIndex()
+        for row, name in enumerate(weapons_table.names()):
+            index.add(name, row)
+        weapons_index = index
+        tables = ScalingTables.load(SCALING_TABLES_PATH)
+        if tables is None or not tables.matches(weapons_table):
+            print("Compiling scaling tables...")
+            tables = ScalingTables.compile(weapons_table)
+        scaling_tables = tables
+        stat_cache.reset(weapons_table.scaling())
+        # Bound to this table, so a representation built after a reload still matches its ETag;
+        # serialized and compressed by the first request for it rather than in every worker at load
+        weapons_payload = CachedPayload(functools.partial(catalog_entries, table=weapons_table))
+        projected_payloads = {}
+        search_index = None
+        snapshot = weapons_table.snapshot()
+        # Ties cursors and jobs to this catalog in every worker; a mapped snapshot's digest does that
+        # without serializing the catalog, a table read from the CSVs falls back to the body's ETag
+        version = snapshot.digest() if snapshot is not None else weapons_payload.etag()
+        catalog_index = CatalogIndex(weapons_table, SCALE_GRADES, version)
+        job_executor.reset(weapons_table, version)
+        catalog_load_duration.set(time.perf_counter() - started)
+        catalog_weapons.set(len(weapons_table))
+        print(f"Successfully loaded {count} weapons")
+        return True
     except Exception as e:
         print(f"Error loading weapons: {str(e)}")
         return False
 
+def current_collection():
+    """weapons_collection, built over weapons_table on first use after a load"""
+    global weapons_collection
+    collection = weapons_collection
+    if collection is None:
+        with weapons_collection_lock:
+            collection = weapons_collection
+            if collection is None:
+                collection = CollectionObjects()
+                for weapon in weapons_table.weapons():
+                    collection.add_object(weapon, weapon.type())
+                weapons_collection = collection
+    return collection
+
+def weapon_summary(weapon, scaled=None):
+    """Catalog entry for a weapon, unscaled unless scaled damage/value fields are given"""
+    if scaled is None:
+        scaled = {
+            'physical_damage': weapon._base_physical,
+            'magic_damage': weapon._base_magic,
+            'fire_damage': weapon._base_fire,
+            'light_damage': weapon._base_light,
+            'holy_damage': weapon._base_holy,
+            'value': weapon.value()
+        }
+    return {
+        'name': weapon.name(),
+        'type': weapon.type(),
+        'physical_damage': scaled['physical_damage'],
+        'magic_damage': scaled['magic_damage'],
+        'fire_damage': scaled['fire_damage'],
+        'light_damage': scaled['light_damage'],
+        'holy_damage': scaled['holy_damage'],
+        'crit_damage': weapon.crit_damage(),
+        'stamina_damage': weapon.stamina_damage(),
+        'strength_scaling': weapon.strength_scaling(),
+        'dexterity_scaling': weapon.dexterity_scaling(),
+        'intelligence_scaling': weapon.intelligence_scaling(),
+        'faith_scaling': weapon.faith_scaling(),
+        'arcane_scaling': weapon.arcane_scaling(),
+        'weight': weapon.weight(),
+        'upgrade_type': weapon.upgrade_stone(),
+        'value': scaled['value'],
+        'image_url': weapon.image_url(),
+        'description': weapon.description()
+    }
+
+def catalog_entries(rows=None, table=None):
+    """Unscaled catalog entries for rows of a table (every row of weapons_table by default), built on demand"""
+    if table is None:
+        table = weapons_table
+    if rows is None:
+        rows = range(len(table))
+    return [weapon_summary(table.record(row)) for row in rows]
+
+def route_label():
+    """Route pattern of the current request, so weapon names do not become label values"""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    if request_sampler is not None:
+        request_sampler.begin()
+
+@app.after_request
+def record_request(response):
+    started = g.get('request_started')
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    endpoint = route_label()
+    request_duration.observe(elapsed, endpoint, request.method)
+    requests_total.inc(endpoint, request.method, str(response.status_code))
+    if response.status_code >= 500:
+        request_errors.inc(endpoint)
+    if request_sampler is not None and request_sampler.end(f'{request.method} {endpoint}', elapsed):
+        slow_request_profiles.inc(endpoint)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text exposition of this worker's metrics"""
+    return Response(metrics.render(), content_type=MetricsRegistry.CONTENT_TYPE)
+
 @app.route('/')
 def index():
     return "Elden Ring Weapons API is running!"
 
+# Query parameters understood by filtered /api/weapons requests
+FORMAT_PARAMS = {'fields', 'layout'}
+QUERY_PARAMS = FORMAT_PARAMS | (
+    {'type', 'upgrade_type', 'sort', 'order', 'limit', 'cursor'} |
+    {f'{stat}_scaling' for stat in ATTRIBUTES} |
+    {f'{bound}_{field}' for field in NUMERIC_FIELDS for bound in ('min', 'max')}
+)
+
+def projected_payload(fields, layout):
+    """Cached whole-catalog payload for a PROJECTION_PRESETS fields/layout combination"""
+    key = (fields, layout)
+    payload = projected_payloads.get(key)
+    if payload is None:
+        with projected_payloads_lock:
+            payload = projected_payloads.get(key)
+            if payload is None:
+                table = weapons_table
+                payload = CachedPayload(lambda: shape(catalog_entries(table=table), fields, layout))
+                projected_payloads[key] = payload
+    return payload
+
+def split_list(args, key):
+    """Values of a repeatable, comma-separated query parameter"""
+    return [value.strip() for raw in args.getlist(key) for value in raw.split(',') if value.strip()]
+
 @app.route('/api/weapons', methods=['GET'])
 def get_weapons():
+    """The whole catalog, or a filtered, sorted page of it when query parameters are given.
+
+    Filters: type, upgrade_type (comma-separated or repeated), <attribute>_scaling
+    (grades like "B", "B,C" or "C+" for C or better), min_/max_<field> for the
+    damage types, crit_damage, stamina_damage, weight and value.
+    Paging: sort (name or a numeric field), order (asc/desc), limit, cursor
+    (the next_cursor of the previous page).
+    Format: fields (comma-separated keys to keep), layout=columns for one
+    list per field instead of one object per weapon; the PROJECTION_PRESETS
+    are cached with ETags, other projections are built per request. Send
+    Accept: application/msgpack for MessagePack when msgpack is installed.
+    """
     try:
-        weapons = []
-        if not weapons_collection or not hasattr(weapons_collection, '_object_dictionary'):
-            print("Warning: weapons_collection is not properly initialized")
-            return jsonify([]), 500
-            
-        print(f"Collection has {len(weapons_collection._object_dictionary)} weapon types")
-        for key in weapons_collection._object_dictionary:
-            for weapon in weapons_collection._object_dictionary[key]:
-                weapons.append({
-                    'name': weapon.name(),
-                    'type': weapon.type(),
-                    'physical_damage': weapon._base_physical if hasattr(weapon, '_base_physical') else weapon.physical_damage(),
-                    'magic_damage': weapon._base_magic if hasattr(weapon, '_base_magic') else weapon.magic_damage(),
-                    'fire_damage': weapon._base_fire if hasattr(weapon, '_base_fire') else weapon.fire_damage(),
-                    'light_damage': weapon._base_light if hasattr(weapon, '_base_light') else weapon.light_damage(),
-                    'holy_damage': weapon._base_holy if hasattr(weapon, '_base_holy') else weapon.holy_damage(),
-                    'crit_damage': weapon.crit_damage(),
-                    'stamina_damage': weapon.stamina_damage(),
-                    'strength_scaling': weapon.strength_scaling(),
-                    'dexterity_scaling': weapon.dexterity_scaling(),
-                    'intelligence_scaling': weapon.intelligence_scaling(),
-                    'faith_scaling': weapon.faith_scaling(),
-                    'arcane_scaling': weapon.arcane_scaling(),
-                    'weight': weapon.weight(),
-                    'upgrade_type': weapon.upgrade_stone(),
-                    'value': weapon.value(),
-                    'image_url': weapon.image_url(),
-                    'description': weapon.description()
-                })
-        return jsonify(weapons)
+        if weapons_payload is None:
+            return jsonify({'error': 'Weapons are not loaded'}), 500
+        if not request.args:
+            return weapons_payload.response(request)
+
+        args = request.args
+        unknown = set(args) - QUERY_PARAMS
+        if unknown:
+            return jsonify({'error': f"Unknown query parameters: {', '.join(sorted(unknown))}"}), 400
+        try:
+            fields = parse_fields(args.get('fields'))
+            layout = parse_layout(args.get('layout'))
+        except FormatError as e:
+            return jsonify({'error': str(e)}), 400
+        if set(args) <= FORMAT_PARAMS:
+            if (fields, layout) in PROJECTION_PRESETS:
+                return projected_payload(fields, layout).response(request)
+            return respond(request, shape(catalog_entries(), fields, layout))
+
+        try:
+            ranges = {}
+            for field in NUMERIC_FIELDS:
+                low, high = args.get(f'min_{field}'), args.get(f'max_{field}')
+                if low is not None or high is not None:
+                    ranges[field] = (None if low is None else float(low), None if high is None else float(high))
+            rows, total, next_cursor = catalog_index.query(
+                types=split_list(args, 'type'),
+                upgrades=split_list(args, 'upgrade_type'),
+                scaling={stat: args[f'{stat}_scaling'] for stat in ATTRIBUTES if f'{stat}_scaling' in args},
+                ranges=ranges,
+                sort=args.get('sort', 'name'),
+                order=args.get('order', 'asc'),
+                limit=int(args.get('limit', DEFAULT_LIMIT)),
+                cursor=args.get('cursor')
+            )
+        except (QueryError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+
+        return respond(request, {
+            'items': shape(catalog_entries(rows), fields, layout),
+            'total': total,
+            'next_cursor': next_cursor
+        })
     except Exception as e:
         print(f"Error in get_weapons: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -147,66 +440,508 @@ def get_weapon(name):
         fai_stat = int(request.args.get('faith', 10))
         arc_stat = int(request.args.get('arcane', 10))
         
-        # Case-insensitive weapon lookup
-        name_lower = name.lower().strip()
-        for weapons in weapons_collection._object_dictionary.values():
-            for base_weapon in weapons:
-                if base_weapon.name().lower().strip() == name_lower:
-                    # Create a new weapon instance for scaling
-                    weapon = Weapon(
-                        base_weapon.name(),
-                        base_weapon.type(),
-                        base_weapon._base_physical if hasattr(base_weapon, '_base_physical') else base_weapon.physical_damage(),
-                        base_weapon._base_magic if hasattr(base_weapon, '_base_magic') else base_weapon.magic_damage(),
-                        base_weapon._base_fire if hasattr(base_weapon, '_base_fire') else base_weapon.fire_damage(),
-                        base_weapon._base_light if hasattr(base_weapon, '_base_light') else base_weapon.light_damage(),
-                        base_weapon._base_holy if hasattr(base_weapon, '_base_holy') else base_weapon.holy_damage(),
-                        base_weapon.crit_damage(),
-                        base_weapon.stamina_damage(),
-                        base_weapon.strength_scaling(),
-                        base_weapon.dexterity_scaling(),
-                        base_weapon.intelligence_scaling(),
-                        base_weapon.faith_scaling(),
-                        base_weapon.arcane_scaling(),
-                        base_weapon.weight(),
-                        base_weapon.upgrade_stone(),
-                        base_weapon.image_url(),
-                        base_weapon.description(),
-                        level,
-                        str_stat,
-                        dex_stat,
-                        int_stat,
-                        fai_stat,
-                        arc_stat
-                    )
-                    
-                    return jsonify({
-                        'name': weapon.name(),
-                        'type': weapon.type(),
-                        'physical_damage': weapon.physical_damage(),
-                        'magic_damage': weapon.magic_damage(),
-                        'fire_damage': weapon.fire_damage(),
-                        'light_damage': weapon.light_damage(),
-                        'holy_damage': weapon.holy_damage(),
-                        'crit_damage': weapon.crit_damage(),
-                        'stamina_damage': weapon.stamina_damage(),
-                        'strength_scaling': weapon.strength_scaling(),
-                        'dexterity_scaling': weapon.dexterity_scaling(),
-                        'intelligence_scaling': weapon.intelligence_scaling(),
-                        'faith_scaling': weapon.faith_scaling(),
-                        'arcane_scaling': weapon.arcane_scaling(),
-                        'weight': weapon.weight(),
-                        'upgrade_type': weapon.upgrade_stone(),
-                        'value': weapon.value(),
-                        'image_url': weapon.image_url(),
-                        'description': weapon.description()
-                    })
-                    
-        return jsonify({'error': 'Weapon not found'}), 404
+        row = weapons_index.get(name)
+        if row is None:
+            return jsonify({'error': 'Weapon not found'}), 404
+        started = time.perf_counter()
+        scaled = stat_cache.get(row, level, str_stat, dex_stat, int_stat, fai_stat, arc_stat, scaling_tables.stats)
+        scaling_duration.observe(time.perf_counter() - started, 'get_weapon')
+        return jsonify(weapon_summary(weapons_table.record(row), scaled))
     except Exception as e:
         print(f"Error in get_weapon: {str(e)}")
         return jsonify({'error': str(e)}), 500
-        
+
+# Longest a live stream request waits for updates, well under gunicorn's 30 s worker timeout
+SESSION_WAIT = 5
+# A waiting stream request holds its worker, so streams only long-poll where that is cheap: threaded
+# workers (gthread, the dev server) report wsgi.multithread, async ones (gevent, eventlet) need SESSION_LONG_POLL=1
+SESSION_LONG_POLL = os.environ.get('SESSION_LONG_POLL', '').lower() in ('1', 'true', 'yes')
+# Milliseconds EventSource waits before asking for the next live stream request
+SESSION_RETRY_MS = 50
+# The same without long-polling, where every stream request answers at once
+SESSION_POLL_RETRY_MS = 2000
+
+def long_poll_allowed(environ):
+    """Whether this worker can hold a stream request open without starving other requests"""
+    return SESSION_LONG_POLL or bool(environ.get('wsgi.multithread'))
+
+def session_weapons(changes):
+    """[(version, {"seq", "weapon"})] for session changes, weapon shaped like get_weapon's response"""
+    weapons = []
+    for version, name, seq, profile in changes:
+        row = weapons_index.get(name)
+        if row is None:
+            continue
+        scaled = stat_cache.get(row, *(profile[field] for field in ('level',) + ATTRIBUTES), scaling_tables.stats)
+        weapons.append((version, {'seq': seq, 'weapon': weapon_summary(weapons_table.record(row), scaled)}))
+    return weapons
+
+@app.route('/api/sessions', methods=['POST'])
+def create_session():
+    """Open a live stat session for slider drags.
+
+    The client pushes changes with POST /api/sessions/<id>/updates, which
+    answers with the scaled weapons, so one request per change is enough.
+    Updates may be sent as text/plain so browsers skip the CORS preflight.
+    GET /api/sessions/<id>/events (Server-Sent Events) follows changes made
+    by other clients of the session.
+    """
+    try:
+        session = live_sessions.create()
+    except SessionError as e:
+        return jsonify({'error': str(e)}), 503
+    return jsonify({
+        'session_id': session.id(),
+        'events': f'/api/sessions/{session.id()}/events',
+        'updates': f'/api/sessions/{session.id()}/updates'
+    }), 201
+
+@app.route('/api/sessions/<session_id>/updates', methods=['POST'])
+def update_session(session_id):
+    """Push stat deltas: {"seq", "name", "level"?, "strength"?, ...} or {"updates": [...]}.
+
+    Only the changed fields need to be sent; fields never sent keep
+    get_weapon's defaults. seq must increase with every change the client
+    makes. The response lists each weapon of the request once, shaped like
+    the stream's events ({"seq", "weapon"}): scaled for its latest profile
+    and tagged with the highest seq that touched it, along with the session
+    version to resume the stream from.
+    """
+    try:
+        if live_sessions.get(session_id) is None:
+            return jsonify({'error': 'Session not found'}), 404
+        body = request.get_json(force=True, silent=True)
+        if not isinstance(body, dict):
+            return jsonify({'error': 'Expected a JSON object body'}), 400
+        updates = body['updates'] if 'updates' in body else [body]
+        if not isinstance(updates, list) or len(updates) > MAX_BATCH_ITEMS:
+            return jsonify({'error': f'updates must be a list of at most {MAX_BATCH_ITEMS} items'}), 400
+
+        # Validate the whole request before applying any of it
+        parsed = []
+        for update in updates:
+            if not isinstance(update, dict):
+                return jsonify({'error': 'Each update must be an object'}), 400
+            delta = dict(update)
+            name = delta.pop('name', None)
+            row = None if name is None else weapons_index.get(name)
+            if row is None:
+                return jsonify({'error': f'Weapon not found: {name}'}), 404
+            if 'seq' not in delta:
+                return jsonify({'error': 'Each update needs a seq'}), 400
+            unknown = set(delta) - {'seq', 'level'} - set(ATTRIBUTES)
+            if unknown:
+                return jsonify({'error': f"Unknown profile fields: {', '.join(sorted(unknown))}"}), 400
+            try:
+                seq = int(delta.pop('seq'))
+                parsed.append((weapons_table.names()[row], seq, {field: int(value) for field, value in delta.items()}))
+            except (TypeError, ValueError) as e:
+                return jsonify({'error': str(e)}), 400
+
+        updated = live_sessions.update(session_id, parsed)
+        if updated is None:
+            return jsonify({'error': 'Session not found'}), 404
+        accepted, session = updated
+        return jsonify({
+            'accepted': accepted,
+            'stale': len(updates) - accepted,
+            'version': session.version(),
+            'weapons': [weapon for _, weapon in session_weapons(session.current(name for name, _, _ in parsed))]
+        })
+    except Exception as e:
+        print(f"Error in update_session: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/sessions/<session_id>/events', methods=['GET'])
+def session_events(session_id):
+    """Server-Sent Events for a live session, one bounded request at a time.
+
+    Each request sends every weapon updated since the client's cursor and
+    ends; EventSource then reconnects, sending the last event id as
+    Last-Event-ID (or pass ?after=<id>). Any worker can answer since
+    sessions live in SESSION_DIR.
+
+    On threaded or async workers (see long_poll_allowed) a request with
+    nothing to send waits up to SESSION_WAIT seconds for a change, and the
+    client reconnects after SESSION_RETRY_MS. On sync workers, gunicorn's
+    default, that wait would hold a whole worker per open stream, so the
+    request answers at once and the client polls every
+    SESSION_POLL_RETRY_MS; the /updates response already carries the
+    client's own changes.
+
+    Each event is named 'stats', carries the session version as its id, and
+    its data is {"seq", "weapon"} with weapon shaped like get_weapon's
+    response. Clients should drop events older than the newest seq they
+    have shown for that weapon.
+    """
+    try:
+        after = int(request.headers.get('Last-Event-ID') or request.args.get('after', 0))
+    except ValueError:
+        return jsonify({'error': 'Last-Event-ID and after must be integers'}), 400
+    long_poll = long_poll_allowed(request.environ)
+    changes = live_sessions.wait(session_id, after, SESSION_WAIT if long_poll else 0)
+    if changes is None:
+        return jsonify({'error': 'Session not found'}), 404
+
+    events = [f'retry: {SESSION_RETRY_MS if long_poll else SESSION_POLL_RETRY_MS}\n\n']
+    for version, weapon in session_weapons(changes):
+        events.append(f'id: {version}\nevent: stats\ndata: {json.dumps(weapon, separators=(",", ":"))}\n\n')
+    if not changes:
+        events.append(': keep-alive\n\n')
+
+    response = Response(''.join(events), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/sessions/<session_id>', methods=['DELETE'])
+def close_session(session_id):
+    if not live_sessions.close(session_id):
+        return jsonify({'error': 'Session not found'}), 404
+    return '', 204
+
+# Upper bound on items per batch request
+MAX_BATCH_ITEMS = 1000
+
+def parse_profile(source, default_level=1):
+    """Read level and the five attributes from a dict-like source, using get_weapon's defaults"""
+    return {
+        'level': int(source.get('level', default_level)),
+        'strength': int(source.get('strength', 10)),
+        'dexterity': int(source.get('dexterity', 10)),
+        'intelligence': int(source.get('intelligence', 10)),
+        'faith': int(source.get('faith', 10)),
+        'arcane': int(source.get('arcane', 10))
+    }
+
+def clamp_profile(profile):
+    """A parse_profile() result with set_player_*()'s 1-99 attribute clamp and levels within 0-25.
+
+    Callers that score against the table clamp levels per upgrade stone
+    afterwards; clamping here first keeps huge values from overflowing
+    the table's int64 columns.
+    """
+    clamped = {stat: max(MIN_STAT, min(value, MAX_STAT)) for stat, value in profile.items()}
+    clamped['level'] = max(0, min(profile['level'], REGULAR_MAX_LEVEL))
+    return clamped
+
+def is_list_of(value, item_type):
+    return isinstance(value, list) and all(isinstance(item, item_type) for item in value)
+
+@app.route('/api/weapons/stats:batch', methods=['POST'])
+def get_weapon_stats_batch():
+    """Scale many (weapon, level, attributes) tuples in one vectorized pass.
+
+    Body is either {"items": [{"name", "level", "strength", ...}, ...]} or
+    {"names": [...], "profiles": [{"level", "strength", ...}, ...]}, which
+    evaluates every name against every profile (names vary fastest).
+    Levels and attributes are clamped like set_level() and set_player_*().
+    Results come back in the same order, one per tuple.
+    """
+    try:
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            return jsonify({'error': 'Expected a JSON object body'}), 400
+
+        # Sizes are checked before anything in the body is parsed
+        try:
+            if 'items' in body:
+                if not isinstance(body['items'], list) or len(body['items']) > MAX_BATCH_ITEMS:
+                    return jsonify({'error': f'items must be a list of at most {MAX_BATCH_ITEMS} objects'}), 400
+                if not is_list_of(body['items'], dict):
+                    return jsonify({'error': 'items must be a list of objects'}), 400
+                items = [(item['name'], clamp_profile(parse_profile(item))) for item in body['items']]
+            else:
+                names, profiles = body.get('names'), body.get('profiles', [{}])
+                if not isinstance(names, list) or not isinstance(profiles, list):
+                    return jsonify({'error': 'names must be a list of strings and profiles a list of objects'}), 400
+                if len(names) * len(profiles) > MAX_BATCH_ITEMS:
+                    return jsonify({'error': f'Batch is limited to {MAX_BATCH_ITEMS} items'}), 400
+                if not is_list_of(names, str) or not is_list_of(profiles, dict):
+                    return jsonify({'error': 'names must be a list of strings and profiles a list of objects'}), 400
+                items = [(name, profile) for profile in map(clamp_profile, map(parse_profile, profiles))
+                         for name in names]
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({'error': f'Invalid batch request: {str(e)}'}), 400
+        if not all(isinstance(name, str) for name, _ in items):
+            return jsonify({'error': 'Every item name must be a string'}), 400
+
+        rows = [weapons_index.get(name) for name, _ in items]
+        found = [i for i, row in enumerate(rows) if row is not None]
+        started = time.perf_counter()
+        if found:
+            profiles = {stat: [items[i][1][stat] for i in found] for stat in items[0][1]}
+            profiles['level'] = np.minimum(profiles['level'], weapons_table.max_levels()[[rows[i] for i in found]])
+            scaled = weapons_table.evaluate_pairs([rows[i] for i in found], **profiles)
+        else:
+            scaled = {}
+        scaling_duration.observe(time.perf_counter() - started, 'batch')
+
+        results = [{'name': name, 'error': 'Weapon not found'} for name, _ in items]
+        for position, i in enumerate(found):
+            results[i] = weapon_summary(
+                weapons_table.record(rows[i]),
+                {field: column[position].item() for field, column in scaled.items()}
+            )
+        return jsonify({'results': results})
+    except Exception as e:
+        print(f"Error in get_weapon_stats_batch: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+# Upper bound on weapons returned by a catalog-wide optimization
+MAX_OPTIMIZE_RESULTS = 20
+
+@app.route('/api/optimize', methods=['POST'])
+def optimize():
+    """Best attribute allocation under a point budget.
+
+    Body: {"budget", "level", "minimums": {"strength": ...}, "objective"}
+    plus either "name" for a single weapon, or optional "type" and "limit"
+    to search the whole catalog for the best weapon + allocation pairs.
+    objective is "total" (sum of the five damage types), "value" or a
+    single damage type.
+    """
+    try:
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict) or 'budget' not in body:
+            return jsonify({'error': 'Expected a JSON object body with a budget'}), 400
+
+        level = int(body.get('level', 1))
+        budget = int(body['budget'])
+        minimums = body.get('minimums') or {}
+        objective = body.get('objective', 'total')
+
+        if 'name' in body:
+            if not isinstance(body['name'], str):
+                return jsonify({'error': 'name must be a string'}), 400
+            row = weapons_index.get(body['name'])
+            if row is None:
+                return jsonify({'error': 'Weapon not found'}), 404
+            return jsonify(optimize_allocation(weapons_table, row, level, budget, minimums, objective))
+
+        limit = max(1, min(int(body.get('limit', 1)), MAX_OPTIMIZE_RESULTS))
+        indices = None
+        if 'type' in body:
+            indices = [row for row, weapon_type in enumerate(weapons_table.types()) if weapon_type == body['type']]
+        results = optimize_catalog(weapons_table, level, budget, minimums, objective, limit, indices)
+        return jsonify({'results': results})
+    except (OptimizerError, TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in optimize: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def frontier_group(rows, weights, scores):
+    """Skyline of one group of table rows as JSON-ready frontier and dominated lists"""
+    frontier, dominator = skyline(weights, scores)
+    names = weapons_table.names()
+
+    def entry(position):
+        row = rows[position]
+        return {'name': names[row], 'type': weapons_table.types()[row],
+                'weight': float(weights[position]), 'score': scores[position].item()}
+
+    dominated = []
+    for position in np.flatnonzero(dominator >= 0):
+        item = entry(position)
+        item['dominated_by'] = names[rows[dominator[position]]]
+        dominated.append(item)
+    return {'frontier': [entry(position) for position in frontier], 'dominated': dominated}
+
+@app.route('/api/frontier', methods=['GET'])
+def get_frontier():
+    """Weapons that are not beaten on damage by anything lighter.
+
+    Query: level and the five attributes (as for /api/weapons/<name>, but
+    clamped like set_level() and set_player_*(): levels per upgrade stone,
+    attributes to 1-99), metric ("total" AR, "value" or one damage type),
+    optional type filter, and by_type=true for one frontier per type.
+    Every dominated weapon names its nearest dominator.
+    """
+    try:
+        try:
+            profile = clamp_profile(parse_profile(request.args))
+            fields = objective_fields(request.args.get('metric', 'total'))
+        except (OptimizerError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+
+        types = split_list(request.args, 'type')
+        rows = np.array([row for row, weapon_type in enumerate(weapons_table.types())
+                         if not types or weapon_type in types], dtype=np.intp)
+        levels = np.clip(profile.pop('level'), 0, weapons_table.max_levels()[rows])
+        started = time.perf_counter()
+        scaled = weapons_table.evaluate_pairs(rows, level=levels, **profile)
+        scores = sum(scaled[field] for field in fields)
+        scaling_duration.observe(time.perf_counter() - started, 'frontier')
+        weights = weapons_table.weights()[rows]
+
+        if request.args.get('by_type', 'false').lower() != 'true':
+            return jsonify(frontier_group(rows, weights, scores))
+
+        row_types = np.array(weapons_table.types())[rows]
+        groups = {}
+        for weapon_type in sorted(set(row_types.tolist())):
+            members = np.flatnonzero(row_types == weapon_type)
+            groups[weapon_type] = frontier_group(rows[members], weights[members], scores[members])
+        return jsonify({'groups': groups})
+    except Exception as e:
+        print(f"Error in get_frontier: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def current_search_index():
+    """search_index, built over weapons_table by the first search after a load"""
+    global search_index
+    index = search_index
+    if index is None:
+        with search_index_lock:
+            index = search_index
+            if index is None:
+                table = weapons_table
+                index = SearchIndex([(weapon.name(), weapon.description()) for weapon in table.weapons()])
+                search_index = index
+    return index
+
+# Result limits for /api/search
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+
+def search_limit(args):
+    return max(1, min(int(args.get('limit', DEFAULT_SEARCH_LIMIT)), MAX_SEARCH_LIMIT))
+
+@app.route('/api/search', methods=['GET'])
+def search_weapons():
+    """BM25 full-text search over weapon names and descriptions.
+
+    Misspelled words match their closest catalog words, and the last word is
+    also completed as a prefix while it is being typed (unless q ends in a
+    space), so this can run on every keystroke.
+    """
+    try:
+        query = request.args.get('q', '')
+        try:
+            limit = search_limit(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        typing = bool(query) and not query[-1].isspace()
+        names = weapons_table.names()
+        types = weapons_table.types()
+        return jsonify({
+            'query': query,
+            'items': [
+                {'name': names[row], 'type': types[row], 'score': score}
+                for row, score in current_search_index().search(query, limit, prefix=typing)
+            ]
+        })
+    except Exception as e:
+        print(f"Error in search_weapons: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/search/suggest', methods=['GET'])
+def suggest_weapons():
+    """Typeahead name completions: prefix matches, then word matches, then fuzzy ones"""
+    try:
+        query = request.args.get('q', '')
+        try:
+            limit = search_limit(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        names = weapons_table.names()
+        types = weapons_table.types()
+        return jsonify({
+            'query': query,
+            'items': [
+                {'name': names[row], 'type': types[row], 'match': match}
+                for row, match in current_search_index().suggest(query, limit)
+            ]
+        })
+    except Exception as e:
+        print(f"Error in suggest_weapons: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+# Upper bound on weapons per sweep request
+MAX_SWEEP_WEAPONS = 10
+
+@app.route('/api/sweep', methods=['GET'])
+def get_sweep():
+    """Damage curves for one or more weapons in a single response.
+
+    Query: name (repeated or comma-separated), level and the five attributes
+    for the fixed point, and optionally attribute to limit which 1-99 curves
+    are returned (all five by default). Level and attributes follow the
+    set_level() / set_player_*() clamps. Each weapon carries its clamped
+    fixed point and curves: {'level': ..., 'attributes': {attribute: ...}},
+    each curve a list per damage type and value; level curves start at 0,
+    attribute curves at 1.
+    """
+    try:
+        names = split_list(request.args, 'name')
+        attributes = split_list(request.args, 'attribute') or list(ATTRIBUTES)
+        try:
+            profile = parse_profile(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if not names:
+            return jsonify({'error': 'At least one name is required'}), 400
+        if len(names) > MAX_SWEEP_WEAPONS:
+            return jsonify({'error': f'Sweeps are limited to {MAX_SWEEP_WEAPONS} weapons'}), 400
+        unknown = [attribute for attribute in attributes if attribute not in ATTRIBUTES]
+        if unknown:
+            return jsonify({'error': f"Unknown attributes: {', '.join(unknown)}"}), 400
+
+        level = profile.pop('level')
+        stats = {stat: max(1, min(value, 99)) for stat, value in profile.items()}
+        weapons = []
+        for name in names:
+            row = weapons_index.get(name)
+            if row is None:
+                weapons.append({'name': name, 'error': 'Weapon not found'})
+                continue
+            started = time.perf_counter()
+            weapons.append(sweep_weapon(weapons_table, row, level, stats, attributes))
+            scaling_duration.observe(time.perf_counter() - started, 'sweep')
+        return jsonify({'weapons': weapons})
+    except Exception as e:
+        print(f"Error in get_sweep: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Run a heavy catalog query in the background.
+
+    Body: {"kind": "optimize" | "sweep" | "rank", "params": {...}}.
+    optimize takes /api/optimize's body (without name) for a catalog-wide
+    build search, sweep takes /api/sweep's parameters for every weapon of an
+    optional type, and rank takes "profiles" (a list of stat profiles),
+    "metric" and "limit". Identical requests share one job and its result.
+    """
+    try:
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict) or not isinstance(body.get('params', {}), dict):
+            return jsonify({'error': 'Expected a JSON object body with a kind and params object'}), 400
+        try:
+            description, reused = job_executor.submit(body.get('kind'), body.get('params', {}))
+        except PARAMETER_ERRORS as e:
+            return jsonify({'error': str(e)}), 400
+        description['reused'] = reused
+        return jsonify(description), 200 if reused else 202
+    except Exception as e:
+        print(f"Error in submit_job: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status and progress of a job, with its result once done"""
+    description = job_executor.describe(job_id)
+    if description is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(description)
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    if job_executor.cancel(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job_executor.describe(job_id, include_result=False))
+
 @app.route('/debug', methods=['GET'])
 def debug():
     import sys
@@ -214,7 +949,7 @@ def debug():
         "status": "online",
         "base_dir": BASE_DIR,
         "python_version": sys.version,
-        "weapons_loaded": hasattr(weapons_collection, '_object_dictionary')
+        "weapons_loaded": weapons_table is not None
     }
     
     # Check if data directory exists and list its contents
@@ -232,9 +967,13 @@ def debug():
         debug_info["elden_ring_csv_exists"] = os.path.exists(elden_ring_csv_path)
     
     # Check weapons collection
-    if hasattr(weapons_collection, '_object_dictionary'):
-        debug_info["weapon_types"] = list(weapons_collection._object_dictionary.keys())
-        debug_info["total_weapons"] = sum(len(weapons) for weapons in weapons_collection._object_dictionary.values())
+    if weapons_table is not None:
+        collection = current_collection()
+        debug_info["weapon_types"] = list(collection._object_dictionary.keys())
+        debug_info["total_weapons"] = sum(len(weapons) for weapons in collection._object_dictionary.values())
+
+    debug_info["stat_cache"] = stat_cache.stats()
+    debug_info["jobs"] = job_executor.stats()
     
     return jsonify(debug_info)
 
@@ -0,0 +1,95 @@
+"""Synthetic catalogs in the layout of data/elden_ring_weapon.csv and data/weapons.csv.
+
+    python benchmarks/generate_catalog.py 100000 /tmp/catalog-100k
+
+writes /tmp/catalog-100k/data/{elden_ring_weapon.csv,weapons.csv}, so the
+app can be started from /tmp/catalog-100k. The first rows are the real
+catalog; the rest are seeded variations of real weapons (damage and weight
+jittered, grades and descriptions mixed), so type, grade and upgrade stone
+distributions stay realistic at any size.
+"""
+import csv
+import os
+import random
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_DIR = os.path.join(BACKEND_DIR, 'data')
+STATS_CSV = 'elden_ring_weapon.csv'
+DETAILS_CSV = 'weapons.csv'
+
+# Columns of elden_ring_weapon.csv
+DAMAGE_COLUMNS = range(2, 9)
+GRADE_COLUMNS = range(9, 14)
+WEIGHT_COLUMN = 22
+GRADES = ['-', 'S', 'A', 'B', 'C', 'D', 'E']
+
+
+def _read(name):
+    with open(os.path.join(SOURCE_DIR, name), 'r', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        return header, list(reader)
+
+
+def _jitter(value, rng):
+    if value == '-':
+        return value
+    return str(max(1, int(int(value) * rng.uniform(0.8, 1.2))))
+
+
+def _variant(template, details, grade_pool, description_pool, index, rng):
+    name = f'{template[0].strip()} Variant {index}'
+    stats = list(template)
+    stats[0] = name
+    for column in DAMAGE_COLUMNS:
+        stats[column] = _jitter(stats[column], rng)
+    for column in GRADE_COLUMNS:
+        # keep ungraded attributes ungraded so damage types still line up with scaling
+        if stats[column] != '-':
+            stats[column] = rng.choice(grade_pool)
+    stats[WEIGHT_COLUMN] = f'{max(0.5, float(stats[WEIGHT_COLUMN]) * rng.uniform(0.8, 1.2)):.1f}'
+
+    row = list(details)
+    row[0] = f'{rng.getrandbits(128):032x}'
+    row[1] = name
+    row[2] = f'https://eldenring.fanapis.com/images/weapons/{row[0]}.png'
+    row[3] = ' '.join(rng.sample(description_pool, 2))
+    return stats, row
+
+
+def generate(size, directory, seed=2022):
+    """Write a catalog of size weapons under directory/data; returns the data directory."""
+    rng = random.Random(seed)
+    stats_header, stats_rows = _read(STATS_CSV)
+    details_header, details_rows = _read(DETAILS_CSV)
+    details_by_name = {row[1].strip().lower(): row for row in details_rows}
+    grade_pool = [row[column] for row in stats_rows for column in GRADE_COLUMNS if row[column] != '-']
+    description_pool = [sentence.strip() + '.' for row in details_rows for sentence in row[3].split('.') if sentence.strip()]
+
+    data_dir = os.path.join(directory, 'data')
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, STATS_CSV), 'w', encoding='utf-8', newline='') as stats_file, \
+            open(os.path.join(data_dir, DETAILS_CSV), 'w', encoding='utf-8', newline='') as details_file:
+        stats_writer = csv.writer(stats_file)
+        details_writer = csv.writer(details_file)
+        stats_writer.writerow(stats_header)
+        details_writer.writerow(details_header)
+        for index in range(size):
+            if index < len(stats_rows):
+                stats = stats_rows[index]
+                details = details_by_name.get(stats[0].strip().lower())
+            else:
+                template = rng.choice(stats_rows)
+                details = details_by_name.get(template[0].strip().lower()) or rng.choice(details_rows)
+                stats, details = _variant(template, details, grade_pool, description_pool, index, rng)
+            stats_writer.writerow(stats)
+            if details is not None:
+                details_writer.writerow(details)
+    return data_dir
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit('usage: generate_catalog.py SIZE DIRECTORY')
+    print(generate(int(sys.argv[1]), sys.argv[2]))
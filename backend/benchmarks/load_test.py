@@ -0,0 +1,266 @@
+"""Load test that replays the frontend's traffic against app.py under gunicorn.
+
+    python benchmarks/load_test.py --workers 2 --concurrency 16 --duration 30
+    python benchmarks/load_test.py --catalog 10000 --threads 4 --json results.json
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --concurrency 8
+
+Every virtual user repeats what WeaponList.tsx does: one /api/weapons
+fetch per page load, then slider drags (a burst of /api/weapons/<name>
+calls, one per slider step, each with the full profile) and comparison
+views (the current profile for up to five weapons). Users run
+concurrently, without waiting between sessions, for the given duration.
+
+Unless --url is given, gunicorn is started locally on a free port, from
+the real catalog or a synthetic one (--catalog, see generate_catalog.py),
+so runs are fully offline and worker count, thread count and caching
+changes can be compared directly. The report gives throughput and
+p50/p95/p99 latency per endpoint; --json writes it machine-readable.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARK_DIR)
+ATTRIBUTES = ('strength', 'dexterity', 'intelligence', 'faith', 'arcane')
+MAX_COMPARED = 5
+# Share of sessions that open the comparison view after dragging
+COMPARE_PROBABILITY = 0.3
+
+
+class Recorder:
+    """Latency samples per endpoint, shared by every virtual user"""
+
+    def __init__(self):
+        self._samples = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds, ok):
+        with self._lock:
+            self._samples.setdefault(endpoint, []).append(seconds)
+            if not ok:
+                self._errors[endpoint] = self._errors.get(endpoint, 0) + 1
+
+    def report(self, elapsed):
+        with self._lock:
+            samples = {endpoint: sorted(values) for endpoint, values in self._samples.items()}
+            errors = dict(self._errors)
+        everything = sorted(value for values in samples.values() for value in values)
+        endpoints = {endpoint: _summary(values, errors.get(endpoint, 0), elapsed) for endpoint, values in samples.items()}
+        return {
+            'elapsed_s': elapsed,
+            'total': _summary(everything, sum(errors.values()), elapsed),
+            'endpoints': endpoints
+        }
+
+
+def _percentile(values, percent):
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * percent // 100))
+    return values[int(rank) - 1]
+
+
+def _summary(values, errors, elapsed):
+    return {
+        'requests': len(values),
+        'errors': errors,
+        'throughput_rps': len(values) / elapsed if elapsed else 0.0,
+        'p50_ms': _ms(_percentile(values, 50)),
+        'p95_ms': _ms(_percentile(values, 95)),
+        'p99_ms': _ms(_percentile(values, 99)),
+        'max_ms': _ms(values[-1] if values else None)
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else seconds * 1000
+
+
+class VirtualUser:
+    """One browser tab: a keep-alive connection, reopened when the server closes it"""
+
+    def __init__(self, host, port, recorder, names, rng, drag_steps):
+        self._host = host
+        self._port = port
+        self._recorder = recorder
+        self._names = names
+        self._rng = rng
+        self._drag_steps = drag_steps
+        self._connection = None
+
+    def get(self, endpoint, path, headers=None):
+        started = time.perf_counter()
+        ok = False
+        body = None
+        for attempt in range(2):
+            try:
+                if self._connection is None:
+                    self._connection = http.client.HTTPConnection(self._host, self._port, timeout=30)
+                self._connection.request('GET', path, headers=headers or {})
+                response = self._connection.getresponse()
+                body = response.read()
+                ok = response.status < 400
+                if response.getheader('Connection', '').lower() == 'close':
+                    self._close()
+                break
+            except (http.client.HTTPException, OSError):
+                # Sync workers close idle connections; retry once on a fresh one
+                self._close()
+                if attempt:
+                    break
+        self._recorder.record(endpoint, time.perf_counter() - started, ok)
+        return body if ok else None
+
+    def _close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _weapon(self, name, level, profile):
+        query = urllib.parse.urlencode({'level': level, **profile})
+        return self.get('GET /api/weapons/<name>', f'/api/weapons/{urllib.parse.quote(name)}?{query}')
+
+    def session(self):
+        # The browser sends gzip in Accept-Encoding, so the cached compressed body is what it gets
+        self.get('GET /api/weapons', '/api/weapons', {'Accept-Encoding': 'gzip, deflate, br'})
+        name = self._rng.choice(self._names)
+        level = 0
+        profile = dict.fromkeys(ATTRIBUTES, 10)
+        self._weapon(name, level, profile)
+
+        # Drag one slider from its current value; every step fires a request
+        slider = self._rng.choice(('level',) + ATTRIBUTES)
+        target = self._rng.randint(0, 25) if slider == 'level' else self._rng.randint(1, 99)
+        current = level if slider == 'level' else profile[slider]
+        steps = max(1, min(self._drag_steps, abs(target - current)))
+        for step in range(1, steps + 1):
+            value = round(current + (target - current) * step / steps)
+            if slider == 'level':
+                level = value
+            else:
+                profile[slider] = value
+            self._weapon(name, level, profile)
+
+        if self._rng.random() < COMPARE_PROBABILITY:
+            for compared in self._rng.sample(self._names, min(MAX_COMPARED, len(self._names))):
+                self._weapon(compared, level, profile)
+
+    def run(self, deadline):
+        while time.monotonic() < deadline:
+            self.session()
+        self._close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, workers, threads, catalog):
+    """Start gunicorn on app:app; returns the process once it answers."""
+    directory = BACKEND_DIR
+    if catalog:
+        sys.path.insert(0, BENCHMARK_DIR)
+        from generate_catalog import generate
+        directory = os.path.join(BENCHMARK_DIR, 'data', str(catalog))
+        if not os.path.exists(os.path.join(directory, 'data', 'weapons.csv')):
+            generate(catalog, directory)
+    command = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+               '--threads', str(threads), '--pythonpath', BACKEND_DIR, '--chdir', directory,
+               '--log-level', 'warning', 'app:app']
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 600
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'gunicorn exited with status {server.returncode}')
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/')
+            if connection.getresponse().status == 200:
+                connection.close()
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError('gunicorn did not start in time')
+
+
+def weapon_names(host, port):
+    connection = http.client.HTTPConnection(host, port, timeout=60)
+    connection.request('GET', '/api/weapons?fields=name&layout=columns')
+    names = json.loads(connection.getresponse().read())['name']
+    connection.close()
+    return names
+
+
+def print_report(report):
+    print(f'\n{"endpoint":<28}{"requests":>10}{"errors":>8}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+    rows = sorted(report['endpoints'].items()) + [('total', report['total'])]
+    for endpoint, summary in rows:
+        print(f'{endpoint:<28}{summary["requests"]:>10}{summary["errors"]:>8}{summary["throughput_rps"]:>10.1f}'
+              f'{summary["p50_ms"] or 0:>10.2f}{summary["p95_ms"] or 0:>10.2f}{summary["p99_ms"] or 0:>10.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='target an already running server instead of starting gunicorn')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=1, help='threads per gunicorn worker (>1 uses gthread)')
+    parser.add_argument('--catalog', type=int, help='serve a synthetic catalog of this many rows')
+    parser.add_argument('--concurrency', type=int, default=8, help='virtual users running at once')
+    parser.add_argument('--duration', type=float, default=20, help='seconds of traffic')
+    parser.add_argument('--drag-steps', type=int, default=20, help='requests per slider drag at most')
+    parser.add_argument('--seed', type=int, default=2022)
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        target = urllib.parse.urlsplit(args.url)
+        host, port = target.hostname, target.port or 80
+    else:
+        host, port = '127.0.0.1', free_port()
+        print(f'Starting gunicorn ({args.workers} workers x {args.threads} threads) on port {port}')
+        server = start_server(port, args.workers, args.threads, args.catalog)
+
+    try:
+        names = weapon_names(host, port)
+        recorder = Recorder()
+        users = [VirtualUser(host, port, recorder, names, random.Random(args.seed + i), args.drag_steps)
+                 for i in range(args.concurrency)]
+        print(f'Replaying {args.concurrency} users for {args.duration:g}s against {len(names)} weapons')
+        started = time.monotonic()
+        deadline = started + args.duration
+        threads = [threading.Thread(target=user.run, args=(deadline,), daemon=True) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        report = recorder.report(time.monotonic() - started)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report['config'] = {key: value for key, value in vars(args).items() if key != 'json'}
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(report, file, indent=2)
+    return 1 if report['total']['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
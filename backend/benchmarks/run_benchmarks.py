@@ -0,0 +1,247 @@
+"""Microbenchmarks for catalog loading, Weapon scaling, CollectionObjects and the API.
+
+    python benchmarks/run_benchmarks.py                         # 300 and 10k rows, compared to baselines.json
+    python benchmarks/run_benchmarks.py --sizes 300,10000,100000,1000000
+    python benchmarks/run_benchmarks.py --update                # record new baselines
+
+Each catalog size is generated once under benchmarks/data/<size> (see
+generate_catalog.py) and benchmarked in a fresh interpreter started from
+that directory, since app.py loads the catalog found under its working
+directory at import. API handlers are driven through Flask's test client.
+
+A benchmark regresses when its median time per operation exceeds the
+baseline by more than the baseline's threshold factor; the run then exits
+with status 1. Baselines are machine specific: record them on the machine
+that compares against them.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARK_DIR)
+CATALOG_DIR = os.path.join(BENCHMARK_DIR, 'data')
+BASELINES_PATH = os.path.join(BENCHMARK_DIR, 'baselines.json')
+BASELINES_VERSION = 1
+DEFAULT_SIZES = (300, 10000)
+DEFAULT_THRESHOLD = 1.5
+# Minimum wall time per repeat, so fast operations are timed over many calls
+MIN_REPEAT_SECONDS = 0.05
+# Weapons used by the per-weapon scaling benchmarks
+SAMPLE_WEAPONS = 1000
+
+
+def measure(function, repeat):
+    """Median and best seconds per call of function() over repeat timed batches."""
+    function()
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_REPEAT_SECONDS or number >= 1 << 20:
+            break
+        number *= 2
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter() - started) / number)
+    return {'median_s': statistics.median(timings), 'min_s': min(timings), 'calls': number * repeat}
+
+
+def per_item(result, count):
+    """Turn a timing of a loop over count items into a timing per item."""
+    return {**result, 'median_s': result['median_s'] / count, 'min_s': result['min_s'] / count,
+            'calls': result['calls'] * count}
+
+
+def run_child(repeat):
+    """Benchmark the catalog in the working directory; returns {benchmark: timing}."""
+    sys.path.insert(0, BACKEND_DIR)
+    # Import dependencies first so the load timing only covers app.py itself
+    import flask, flask_cors, numpy  # noqa: F401
+    from weapon import Weapon
+
+    results = {}
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+    results['load_weapons_csv'] = {'median_s': time.perf_counter() - started, 'min_s': None, 'calls': 1}
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.load_weapons()
+    results['load_weapons_snapshot'] = {'median_s': time.perf_counter() - started, 'min_s': None, 'calls': 1}
+
+    # Decoded WeaponRecords, as the CSV loader builds them; the table's weapons are snapshot views
+    records = [app.weapons_table.record(row) for row in range(min(SAMPLE_WEAPONS, len(app.weapons_table)))]
+    weapons = [Weapon(record.name(), record.type(), record.physical_damage(), record.magic_damage(),
+                      record.fire_damage(), record.light_damage(), record.holy_damage(), record.crit_damage(),
+                      record.stamina_damage(), record.strength_scaling(), record.dexterity_scaling(),
+                      record.intelligence_scaling(), record.faith_scaling(), record.arcane_scaling(),
+                      record.weight(), record.upgrade_stone(), record.image_url(), record.description(),
+                      level=10, stre=40, dex=40, inte=20, fai=20, arc=15)
+               for record in records]
+
+    def weapon_value():
+        for weapon in weapons:
+            weapon.value()
+
+    def weapon_damage():
+        for weapon in weapons:
+            weapon.physical_damage()
+            weapon.magic_damage()
+            weapon.fire_damage()
+            weapon.light_damage()
+            weapon.holy_damage()
+
+    def record_scaled_value():
+        for record in records:
+            record.scaled(10, 40, 40, 20, 20, 15).value()
+
+    results['weapon_value'] = per_item(measure(weapon_value, repeat), len(weapons))
+    results['weapon_damage'] = per_item(measure(weapon_damage, repeat), len(weapons))
+    results['record_scaled_value'] = per_item(measure(record_scaled_value, repeat), len(records))
+
+    collection = app.current_collection()
+    keys = sorted(set(app.weapons_table.types()))
+    results['collection_sort'] = measure(lambda: [collection.sort(key) for key in keys], repeat)
+    results['collection_max_value'] = per_item(
+        measure(lambda: [collection.max_value(key) for key in keys], repeat), len(keys))
+
+    client = app.app.test_client()
+    gzip_headers = {'Accept-Encoding': 'gzip'}
+    common_type = max(keys, key=lambda key: len(collection._object_dictionary[key]))
+    names = app.weapons_table.names()
+    hit_url = f'/api/weapons/{names[0]}?level=10&strength=40&dexterity=40'
+    # More distinct profiles than the stat cache holds, so nearly every lookup misses
+    miss_urls = [f'/api/weapons/{names[i % len(names)]}?level={i % 11}&strength={10 + i % 89}&dexterity={99 - i % 89}'
+                 for i in range(2 * app.STAT_CACHE_SIZE)]
+    misses = iter(range(1 << 62))
+
+    results['api_get_weapons'] = measure(lambda: client.get('/api/weapons', headers=gzip_headers), repeat)
+    results['api_get_weapons_query'] = measure(
+        lambda: client.get(f'/api/weapons?type={common_type}&sort=value&order=desc&limit=50'), repeat)
+    results['api_get_weapon_hit'] = measure(lambda: client.get(hit_url), repeat)
+    results['api_get_weapon_miss'] = measure(
+        lambda: client.get(miss_urls[next(misses) % len(miss_urls)]), repeat)
+    return results
+
+
+def ensure_catalog(size):
+    directory = os.path.join(CATALOG_DIR, str(size))
+    if not os.path.exists(os.path.join(directory, 'data', 'weapons.csv')):
+        sys.path.insert(0, BENCHMARK_DIR)
+        from generate_catalog import generate
+        print(f'Generating {size} row catalog in {directory}')
+        generate(size, directory)
+    # Start from the CSVs every time, so load_weapons_csv measures a cold load
+    for name in ('weapons.snapshot', 'scaling_tables.npz'):
+        path = os.path.join(directory, 'data', name)
+        if os.path.exists(path):
+            os.remove(path)
+    return directory
+
+
+def run_size(size, repeat):
+    directory = ensure_catalog(size)
+    output = os.path.join(directory, 'results.json')
+    subprocess.run([sys.executable, os.path.abspath(__file__), '--child', output, '--repeat', str(repeat)],
+                   cwd=directory, check=True)
+    with open(output) as file:
+        return json.load(file)
+
+
+def load_baselines():
+    if not os.path.exists(BASELINES_PATH):
+        return None
+    with open(BASELINES_PATH) as file:
+        baselines = json.load(file)
+    return baselines if baselines.get('version') == BASELINES_VERSION else None
+
+
+def compare(size, results, baselines):
+    """Print a report for one size; returns the names of regressed benchmarks."""
+    recorded = (baselines or {}).get('sizes', {}).get(str(size), {})
+    default_threshold = (baselines or {}).get('threshold', DEFAULT_THRESHOLD)
+    regressions = []
+    print(f'\n{size} rows')
+    print(f'  {"benchmark":<24}{"median":>14}{"baseline":>14}{"ratio":>9}')
+    for name, result in results.items():
+        baseline = recorded.get(name)
+        line = f'  {name:<24}{_format(result["median_s"]):>14}'
+        if baseline is None:
+            print(line + f'{"-":>14}')
+            continue
+        ratio = result['median_s'] / baseline['median_s']
+        threshold = baseline.get('threshold', default_threshold)
+        status = 'REGRESSION' if ratio > threshold else ''
+        if status:
+            regressions.append(name)
+        print(line + f'{_format(baseline["median_s"]):>14}{ratio:>8.2f}x {status}')
+    return regressions
+
+
+def _format(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e3), ('us', 1e6)):
+        if seconds * scale >= 1:
+            return f'{seconds * scale:.2f} {unit}'
+    return f'{seconds * 1e9:.0f} ns'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='comma-separated catalog sizes (e.g. 300,10000,100000,1000000)')
+    parser.add_argument('--repeat', type=int, default=7, help='timed batches per benchmark')
+    parser.add_argument('--update', action='store_true', help='record these results as the baselines')
+    parser.add_argument('--threshold', type=float, help='regression factor to store with --update')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        results = run_child(args.repeat)
+        with open(args.child, 'w') as file:
+            json.dump(results, file)
+        return 0
+
+    baselines = load_baselines()
+    sizes = [int(size) for size in args.sizes.split(',')]
+    all_results = {size: run_size(size, args.repeat) for size in sizes}
+    regressions = []
+    for size, results in all_results.items():
+        regressions += [f'{size}:{name}' for name in compare(size, results, baselines)]
+
+    if args.update:
+        updated = baselines or {'version': BASELINES_VERSION, 'threshold': DEFAULT_THRESHOLD, 'sizes': {}}
+        if args.threshold is not None:
+            updated['threshold'] = args.threshold
+        updated['machine'] = {'python': platform.python_version(), 'platform': platform.platform(),
+                              'processor': platform.processor() or platform.machine(), 'cpus': os.cpu_count()}
+        updated['recorded'] = time.strftime('%Y-%m-%d')
+        for size, results in all_results.items():
+            updated['sizes'][str(size)] = {name: {'median_s': result['median_s']} for name, result in results.items()}
+        with open(BASELINES_PATH, 'w') as file:
+            json.dump(updated, file, indent=2, sort_keys=True)
+            file.write('\n')
+        print(f'\nWrote baselines to {BASELINES_PATH}')
+        return 0
+
+    if regressions:
+        print(f'\nRegressed: {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
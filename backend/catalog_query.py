@@ -0,0 +1,147 @@
+import base64
+import json
+
+import numpy as np
+
+from weapon_table import ATTRIBUTES, DAMAGE_TYPES
+
+NUMERIC_FIELDS = DAMAGE_TYPES + ('crit_damage', 'stamina_damage', 'weight', 'value')
+SORT_FIELDS = ('name',) + NUMERIC_FIELDS
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+class QueryError(ValueError):
+    """Raised for filters, sorts or cursors the index cannot answer."""
+
+
+class CatalogIndex:
+    """Secondary indexes over a WeaponTable for filtered, sorted, paged queries.
+
+    Built once per catalog load:
+    - every sortable column keeps its stable ascending row permutation and the
+      sorted values, so range filters are two binary searches;
+    - weapon type, upgrade stone and each attribute's scaling grade keep a
+      boolean bitmap per distinct value, so category filters are ANDs/ORs.
+
+    Pages are addressed by keyset cursors: the position of the last returned
+    row in the sort permutation, tied to the catalog version.
+    """
+
+    def __init__(self, table, grades, version):
+        self._version = version
+        self._size = len(table)
+        names = np.array([name.lower() for name in table.names()])
+        base = table.base_damage()
+        columns = {field: base[:, i] for i, field in enumerate(DAMAGE_TYPES)}
+        columns['crit_damage'] = table.crit_damages()
+        columns['stamina_damage'] = table.stamina_damages()
+        columns['weight'] = table.weights()
+        columns['value'] = table.values()
+        columns['name'] = names
+
+        self._order = {field: np.argsort(column, kind='stable') for field, column in columns.items()}
+        self._sorted = {field: columns[field][self._order[field]] for field in NUMERIC_FIELDS}
+
+        self._types = _bitmaps(table.types())
+        self._upgrades = _bitmaps(table.upgrade_stones())
+        # Grade letters in ascending strength, so 'C+' can OR every bitmap from C up
+        self._grade_letters = sorted(grades, key=grades.get)
+        letter_of = {value: letter for letter, value in grades.items()}
+        scaling = table.scaling()
+        self._grades = {
+            stat: _bitmaps([letter_of.get(value, '-') for value in scaling[:, i]])
+            for i, stat in enumerate(ATTRIBUTES)
+        }
+
+    def _category(self, bitmaps, values):
+        mask = np.zeros(self._size, dtype=bool)
+        for value in values:
+            if value in bitmaps:
+                mask |= bitmaps[value]
+        return mask
+
+    def _grade_mask(self, stat, spec):
+        letters = []
+        for grade in spec.split(','):
+            grade = grade.strip().upper()
+            at_least = grade.endswith('+')
+            grade = grade.rstrip('+')
+            if grade not in self._grade_letters:
+                raise QueryError(f"Unknown scaling grade '{grade}' for {stat}")
+            if at_least:
+                letters.extend(self._grade_letters[self._grade_letters.index(grade):])
+            else:
+                letters.append(grade)
+        return self._category(self._grades[stat], letters)
+
+    def _range_mask(self, field, low, high):
+        values = self._sorted[field]
+        start = 0 if low is None else np.searchsorted(values, low, side='left')
+        stop = len(values) if high is None else np.searchsorted(values, high, side='right')
+        mask = np.zeros(self._size, dtype=bool)
+        mask[self._order[field][start:stop]] = True
+        return mask
+
+    def query(self, types=None, upgrades=None, scaling=None, ranges=None, sort='name', order='asc',
+              limit=DEFAULT_LIMIT, cursor=None):
+        """Rows matching every filter, one page at a time.
+
+        types / upgrades: lists of accepted values.
+        scaling: {attribute: 'B' | 'B,C' | 'C+'} (a trailing + means that grade or better).
+        ranges: {field: (min or None, max or None)} over NUMERIC_FIELDS.
+        Returns (rows, total matches, next cursor or None).
+        """
+        if sort not in SORT_FIELDS:
+            raise QueryError(f"Cannot sort by '{sort}'")
+        if order not in ('asc', 'desc'):
+            raise QueryError("order must be 'asc' or 'desc'")
+        limit = max(1, min(int(limit), MAX_LIMIT))
+
+        mask = np.ones(self._size, dtype=bool)
+        if types:
+            mask &= self._category(self._types, types)
+        if upgrades:
+            mask &= self._category(self._upgrades, upgrades)
+        for stat, spec in (scaling or {}).items():
+            if stat not in self._grades:
+                raise QueryError(f"Unknown attribute '{stat}'")
+            mask &= self._grade_mask(stat, spec)
+        for field, (low, high) in (ranges or {}).items():
+            if field not in NUMERIC_FIELDS:
+                raise QueryError(f"Cannot filter on '{field}'")
+            mask &= self._range_mask(field, low, high)
+
+        permutation = self._order[sort]
+        if order == 'desc':
+            permutation = permutation[::-1]
+        positions = np.flatnonzero(mask[permutation])
+        total = len(positions)
+        if cursor is not None:
+            positions = positions[positions > self._decode_cursor(cursor, sort, order)]
+
+        page = positions[:limit]
+        next_cursor = None
+        if len(positions) > limit:
+            next_cursor = self._encode_cursor(sort, order, int(page[-1]))
+        return permutation[page].tolist(), total, next_cursor
+
+    def _encode_cursor(self, sort, order, position):
+        data = json.dumps([self._version, sort, order, position], separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(data).decode('ascii')
+
+    def _decode_cursor(self, cursor, sort, order):
+        try:
+            version, cursor_sort, cursor_order, position = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except (ValueError, TypeError):
+            raise QueryError('Malformed cursor')
+        if version != self._version:
+            raise QueryError('Cursor is from an older catalog version, restart from the first page')
+        if (cursor_sort, cursor_order) != (sort, order):
+            raise QueryError('Cursor was issued for a different sort')
+        return int(position)
+
+
+def _bitmaps(values):
+    values = np.asarray(values)
+    return {value: values == value for value in np.unique(values).tolist()}
@@ -0,0 +1,273 @@
+import hashlib
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from weapon import WeaponRecord
+
+MAGIC = b'ERWSNAP\x00'
+# 2: records are stored in WeaponTable row order (grouped by weapon type)
+SNAPSHOT_VERSION = 2
+
+# magic, version, record count, string table offset, string table length
+HEADER = struct.Struct('<8sIIQQ')
+# per source CSV: size, mtime in ns, sha256
+SOURCE = struct.Struct('<QQ32s')
+# scaling (str, dex, int, fai, arc), weight, damages (phy, mag, fir, lit, hol, cri, sta),
+# then (offset, length) into the string table for name, type, upgrade, image url, description
+RECORD = struct.Struct('<6d7i10I')
+# The same layout as a numpy record, so columns can be read in place
+RECORD_DTYPE = np.dtype([('scaling', '<f8', (5,)), ('weight', '<f8'), ('damage', '<i4', (7,)),
+                         ('strings', '<u4', (5, 2))])
+STRING_FIELDS = ('name', 'type', 'upgrade_type', 'image_url', 'description')
+
+
+def source_stamp(path):
+    """(size, mtime_ns, sha256) of a source file."""
+    stat = os.stat(path)
+    with open(path, 'rb') as file:
+        digest = hashlib.sha256(file.read()).digest()
+    return stat.st_size, stat.st_mtime_ns, digest
+
+
+def write_snapshot(path, weapons, sources):
+    """Compile weapons, in WeaponTable row order, into a snapshot file stamped with their source CSVs.
+
+    The file is written next to path and moved into place, so workers that
+    already mapped an older snapshot keep reading a consistent file.
+    """
+    strings = bytearray()
+    string_refs = {}
+
+    def add_string(text):
+        if text not in string_refs:
+            data = text.encode('utf-8')
+            string_refs[text] = (len(strings), len(data))
+            strings.extend(data)
+        return string_refs[text]
+
+    records = bytearray()
+    for weapon in weapons:
+        refs = []
+        for text in (weapon.name(), weapon.type(), weapon.upgrade_stone(), weapon.image_url(), weapon.description()):
+            refs.extend(add_string(text))
+        records.extend(RECORD.pack(
+            weapon.strength_scaling(), weapon.dexterity_scaling(), weapon.intelligence_scaling(),
+            weapon.faith_scaling(), weapon.arcane_scaling(), weapon.weight(),
+            weapon._base_physical, weapon._base_magic, weapon._base_fire, weapon._base_light, weapon._base_holy,
+            weapon.crit_damage(), weapon.stamina_damage(),
+            *refs
+        ))
+
+    stamps = b''.join(SOURCE.pack(*source_stamp(source)) for source in sources)
+    strings_offset = HEADER.size + len(stamps) + len(records)
+    header = HEADER.pack(MAGIC, SNAPSHOT_VERSION, len(weapons), strings_offset, len(strings))
+
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(header)
+        file.write(stamps)
+        file.write(records)
+        file.write(strings)
+    os.replace(temp_path, path)
+
+
+class CatalogSnapshot:
+    """Read-only, memory-mapped view of a compiled catalog snapshot.
+
+    Every worker maps the same file, so its pages live once in the OS page
+    cache instead of once per process, and loading skips CSV parsing, grade
+    lookups and the weapons.csv join entirely. The mapping stays open for
+    the life of the snapshot: records() and the SnapshotWeapons read from it
+    in place rather than copying it into per-process objects.
+    """
+
+    def __init__(self, mapped, sources, path=None):
+        self._map = mapped
+        self._path = path
+        magic, version, self._count, self._strings_offset, self._strings_length = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError('Not a compatible catalog snapshot')
+        self._stamps = [SOURCE.unpack_from(mapped, HEADER.size + i * SOURCE.size) for i in range(len(sources))]
+        self._sources = sources
+        self._values = None
+        # Decoded types and upgrade stones by offset; a catalog has only a handful of each
+        self._shared_strings = {}
+        self._records_offset = HEADER.size + len(sources) * SOURCE.size
+        if self._records_offset + self._count * RECORD.size != self._strings_offset:
+            raise ValueError('Catalog snapshot is truncated or was built from different sources')
+
+    @classmethod
+    def load(cls, path, sources):
+        """Map a snapshot; raises OSError or ValueError if it is missing or not a valid snapshot."""
+        with open(path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(mapped, sources, path)
+        except struct.error as e:
+            raise ValueError(str(e))
+
+    @classmethod
+    def open(cls, path, sources):
+        """Map a snapshot; returns None if it is missing or not a valid snapshot."""
+        try:
+            return cls.load(path, sources)
+        except (OSError, ValueError):
+            return None
+
+    def __reduce__(self):
+        # Other processes map the file themselves instead of receiving a copy
+        return _reopen, (self._path, self._sources, self._stamps)
+
+    def __len__(self):
+        return self._count
+
+    def stamps(self):
+        return self._stamps
+
+    def digest(self):
+        """sha256 of the whole file; the same in every process mapping the same snapshot."""
+        return hashlib.sha256(self._map).hexdigest()[:32]
+
+    def is_fresh(self):
+        """True if every source CSV still matches the stamp taken at compile time.
+
+        Size and mtime are compared first; only a changed mtime with an
+        unchanged size costs a hash of the file.
+        """
+        for source, (size, mtime_ns, digest) in zip(self._sources, self._stamps):
+            try:
+                stat = os.stat(source)
+            except OSError:
+                return False
+            if stat.st_size != size:
+                return False
+            if stat.st_mtime_ns != mtime_ns and source_stamp(source)[2] != digest:
+                return False
+        return True
+
+    def string(self, offset, length):
+        start = self._strings_offset + offset
+        return self._map[start:start + length].decode('utf-8')
+
+    def shared_string(self, offset, length):
+        """string(), decoded once per offset; only for fields with few distinct values."""
+        string = self._shared_strings.get(offset)
+        if string is None:
+            string = self._shared_strings[offset] = self.string(offset, length)
+        return string
+
+    def records(self):
+        """Every record as a read-only RECORD_DTYPE array over the mapping (no copy)."""
+        return np.frombuffer(self._map, dtype=RECORD_DTYPE, count=self._count, offset=self._records_offset)
+
+    def record(self, index):
+        """The unpacked RECORD tuple of one weapon."""
+        return RECORD.unpack_from(self._map, self._records_offset + index * RECORD.size)
+
+    def values(self):
+        """WeaponRecord.value() of every record, computed once on first use."""
+        if self._values is None:
+            damage = self.records()['damage']
+            base = damage[:, :6].sum(axis=1, dtype=np.int64) / np.maximum(1, damage[:, 6])
+            self._values = (base * 10).tolist()
+        return self._values
+
+    def strings(self, field):
+        """One STRING_FIELDS field decoded for every record; repeated strings share one object."""
+        refs = self.records()['strings'][:, STRING_FIELDS.index(field)]
+        decoded = {}
+        strings = []
+        for offset, length in refs.tolist():
+            if offset not in decoded:
+                decoded[offset] = self.string(offset, length)
+            strings.append(decoded[offset])
+        return strings
+
+    def weapons(self):
+        """A SnapshotWeapon per record, in the order they were written."""
+        return [SnapshotWeapon(self, index) for index in range(self._count)]
+
+
+def _reopen(path, sources, stamps):
+    snapshot = CatalogSnapshot.load(path, sources)
+    if snapshot.stamps() != stamps:
+        raise ValueError(f'Catalog snapshot at {path} was rebuilt from different sources')
+    return snapshot
+
+
+class SnapshotWeapon:
+    """A catalog weapon read in place from a mapped snapshot.
+
+    Holds only the snapshot and a record index: numbers are unpacked and
+    strings decoded on every access, so the catalog costs each worker a few
+    bytes per weapon. Answers the WeaponRecord accessors; record() decodes
+    a standalone WeaponRecord when many fields are needed at once.
+    """
+
+    __slots__ = ('_snapshot', '_index')
+
+    def __init__(self, snapshot, index):
+        self._snapshot = snapshot
+        self._index = index
+
+    def _string(self, field):
+        record = self._snapshot.record(self._index)
+        position = 13 + 2 * STRING_FIELDS.index(field)
+        return self._snapshot.string(record[position], record[position + 1])
+
+    def _scaling(self, attribute):
+        # the CSV loader uses int 0 for ungraded attributes
+        return self._snapshot.record(self._index)[attribute] or 0
+
+    def name(self): return self._string('name')
+    def type(self): return self._string('type')
+    def physical_damage(self): return self._snapshot.record(self._index)[6]
+    def magic_damage(self): return self._snapshot.record(self._index)[7]
+    def fire_damage(self): return self._snapshot.record(self._index)[8]
+    def light_damage(self): return self._snapshot.record(self._index)[9]
+    def holy_damage(self): return self._snapshot.record(self._index)[10]
+    def crit_damage(self): return self._snapshot.record(self._index)[11]
+    def stamina_damage(self): return self._snapshot.record(self._index)[12]
+    def strength_scaling(self): return self._scaling(0)
+    def dexterity_scaling(self): return self._scaling(1)
+    def intelligence_scaling(self): return self._scaling(2)
+    def faith_scaling(self): return self._scaling(3)
+    def arcane_scaling(self): return self._scaling(4)
+    def weight(self): return self._snapshot.record(self._index)[5]
+    def upgrade_stone(self): return self._string('upgrade_type')
+    def image_url(self): return self._string('image_url')
+    def description(self): return self._string('description')
+
+    def value(self):
+        # Sorting and the collection aggregates call this per weapon, so it is a list lookup
+        return self._snapshot.values()[self._index]
+
+    def record(self):
+        """Decode this weapon into a WeaponRecord."""
+        snapshot = self._snapshot
+        record = snapshot.record(self._index)
+        return WeaponRecord(
+            snapshot.string(record[13], record[14]), snapshot.shared_string(record[15], record[16]),
+            *record[6:13], *(scale if scale else 0 for scale in record[:5]), record[5],
+            snapshot.shared_string(record[17], record[18]), snapshot.string(record[19], record[20]),
+            snapshot.string(record[21], record[22])
+        )
+
+    def scaled(self, level=0, stre=10, dex=10, inte=10, fai=10, arc=10):
+        """A ScaledWeapon over this weapon's decoded record."""
+        return self.record().scaled(level, stre, dex, inte, fai, arc)
+
+    def __repr__(self):
+        return f'SnapshotWeapon({self.name()!r}, {self.type()!r})'
+
+
+if __name__ == '__main__':
+    # Offline build: python catalog_snapshot.py
+    import app
+
+    weapons = app.table_order(app.read_weapon_csvs())
+    write_snapshot(app.SNAPSHOT_PATH, weapons, app.SNAPSHOT_SOURCES)
+    print(f"Wrote snapshot of {len(weapons)} weapons to {app.SNAPSHOT_PATH}")
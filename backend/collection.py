@@ -1,3 +1,7 @@
+import heapq
+import operator
+
+
 class CollectionObjects:
 
     def __init__(self):
@@ -26,10 +30,9 @@ class CollectionObjects:
     '''
 
     def total(self, key):
-        temp_sum = 0
-        for obj in self._object_dictionary[key]:
-            temp_sum = obj.value()
-        return temp_sum
+        # Objects can change value() after being added (set_level() and the like),
+        # so every aggregate reads the current values, as sort() and top_k() do
+        return sum(obj.value() for obj in self._object_dictionary[key])
 
     '''Return the average of all object.value() grouped
     on provided key.
@@ -40,9 +43,17 @@ class CollectionObjects:
     '''
 
     def average(self, key):
-        temp_sum = self.total(key)
-        temp_avg = temp_sum / len(self._object_dictionary)
-        return temp_avg
+        return self.total(key) / len(self._object_dictionary[key])
+
+    '''Return the number of objects grouped on provided key.
+    @params
+    key the key used to group the related objects
+    @return
+    int The number of objects for key
+    '''
+
+    def count(self, key):
+        return len(self._object_dictionary[key])
 
     '''Sort in place all objects grouped based on provided
     key. Sort is ascending based on comparison between
@@ -52,7 +63,8 @@ class CollectionObjects:
     '''
 
     def sort(self, key):
-        self._object_dictionary[key].sort()
+        # value() is read once per object; objects may have changed since they were added
+        self._object_dictionary[key].sort(key=_stat_getter(None))
 
     '''Return the max value of all object.value() grouped
     on provided key.
@@ -63,7 +75,8 @@ class CollectionObjects:
     '''
 
     def max_value(self, key):
-        return max(self._object_dictionary[key])
+        # First of the tied maxima, like max() over the group
+        return max(self._object_dictionary[key], key=_stat_getter(None))
 
     '''Return the min value of all object.value() grouped
     on provided key.
@@ -74,5 +87,95 @@ class CollectionObjects:
     '''
 
     def min_value(self, key):
-        return min(self._object_dictionary[key])
+        return min(self._object_dictionary[key], key=_stat_getter(None))
+
+    '''Return the median of all object.value() grouped
+    on provided key.
+    @params
+    key the key used to group the related objects
+    @return
+    float The median of all object.value() for key
+    '''
+
+    def median(self, key):
+        return self.percentile(key, 50)
+
+    '''Return a percentile of all object.value() grouped
+    on provided key, interpolating linearly between the
+    two closest ranks.
+    @params
+    key the key used to group the related objects
+    percent the percentile to return, from 0 to 100
+    @return
+    float The percentile of all object.value() for key
+    '''
+
+    def percentile(self, key, percent):
+        if not 0 <= percent <= 100:
+            raise ValueError('percent must be between 0 and 100')
+        values = sorted(obj.value() for obj in self._object_dictionary[key])
+        position = (len(values) - 1) * percent / 100
+        lower = int(position)
+        upper = min(lower + 1, len(values) - 1)
+        return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+    '''Return objects ordered by a stat, computing the stat
+    once per object (decorate-sort-undecorate) instead of
+    on every comparison.
+    @params
+    key the key used to group the related objects, or None
+    for every object in the collection
+    stat name of a no-argument method (default 'value') or
+    a callable taking the object
+    reverse True for descending order
+    @return
+    list The ordered objects; the collection is unchanged
+    '''
+
+    def rank(self, key=None, stat=None, reverse=False):
+        # sorted() evaluates key once per object and is stable for ties
+        return sorted(self._objects(key), key=_stat_getter(stat), reverse=reverse)
+
+    '''Return the k objects with the highest stat using a
+    bounded heap, without sorting the whole group.
+    @params
+    key the key used to group the related objects, or None
+    for every object in the collection
+    k how many objects to return
+    stat name of a no-argument method (default 'value') or
+    a callable taking the object
+    @return
+    list Up to k objects, highest stat first
+    '''
+
+    def top_k(self, k, key=None, stat=None):
+        return heapq.nlargest(k, self._objects(key), key=_stat_getter(stat))
+
+    '''Return the k objects with the lowest stat using a
+    bounded heap, without sorting the whole group.
+    @params
+    key the key used to group the related objects, or None
+    for every object in the collection
+    k how many objects to return
+    stat name of a no-argument method (default 'value') or
+    a callable taking the object
+    @return
+    list Up to k objects, lowest stat first
+    '''
+
+    def bottom_k(self, k, key=None, stat=None):
+        return heapq.nsmallest(k, self._objects(key), key=_stat_getter(stat))
+
+    def _objects(self, key):
+        if key is not None:
+            return self._object_dictionary[key]
+        return [obj for objs in self._object_dictionary.values() for obj in objs]
+
+
+def _stat_getter(stat):
+    if stat is None:
+        stat = 'value'
+    if callable(stat):
+        return stat
+    return operator.methodcaller(stat)
 
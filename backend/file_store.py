@@ -0,0 +1,162 @@
+import json
+import os
+import re
+import threading
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # no flock on Windows, where the single-process dev server is all that runs
+    fcntl = None
+
+# Keys become file names, so they are limited to URL-safe token characters
+KEY_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,128}')
+
+
+class FileStore:
+    """JSON documents in a directory, shared by every worker process.
+
+    Each document is one file named after its key. Reads hold a shared
+    flock and updates an exclusive one for the whole read-modify-write, so
+    workers never see a half-written document or lose each other's
+    updates. Documents are created with their content in a single link()
+    and removed with unlink(); an update that waited on a removed document
+    finds it gone rather than writing to the unlinked file. The directory
+    is only created by the first create() or hold(), so constructing a
+    store touches nothing on disk.
+    """
+
+    def __init__(self, directory):
+        self._directory = directory
+        # Without flock only this process' threads need excluding
+        self._lock = threading.RLock() if fcntl is None else None
+        self._held = []
+
+    def directory(self): return self._directory
+
+    def valid(self, key):
+        return KEY_PATTERN.fullmatch(key) is not None
+
+    def path(self, key):
+        if not self.valid(key):
+            raise KeyError(key)
+        return os.path.join(self._directory, f'{key}.json')
+
+    def create(self, key, document):
+        """Store a new document; returns False if key already exists."""
+        path = self.path(key)
+        os.makedirs(self._directory, exist_ok=True)
+        temporary = os.path.join(self._directory, f'.{key}.{uuid.uuid4().hex}.tmp')
+        with open(temporary, 'w') as file:
+            json.dump(document, file, separators=(',', ':'))
+        try:
+            os.link(temporary, path)
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            os.remove(temporary)
+
+    def read(self, key):
+        """The document stored under key, or None."""
+        try:
+            with open(self.path(key)) as file, _Locked(file, self._lock, exclusive=False):
+                return _load(file)
+        except (FileNotFoundError, KeyError):
+            return None
+
+    def update(self, key, function):
+        """Call function(document), write the document back and return the result.
+
+        Raises KeyError if there is no such document. Nothing is written if
+        function raises.
+        """
+        try:
+            file = open(self.path(key), 'r+')
+        except FileNotFoundError:
+            raise KeyError(key)
+        with file, _Locked(file, self._lock, exclusive=True):
+            document = _load(file)
+            if document is None:
+                raise KeyError(key)
+            result = function(document)
+            file.seek(0)
+            file.truncate()
+            json.dump(document, file, separators=(',', ':'))
+            file.flush()
+            return result
+
+    def remove(self, key):
+        """Delete a document; returns False if there was none."""
+        try:
+            os.remove(self.path(key))
+            return True
+        except (FileNotFoundError, KeyError):
+            return False
+
+    def modified(self, key):
+        """Modification time of a document in ns, or None if it does not exist."""
+        try:
+            return os.stat(self.path(key)).st_mtime_ns
+        except (FileNotFoundError, KeyError):
+            return None
+
+    def stamp(self, key):
+        """(mtime_ns, size) of a document, which changes with every write; None if it does not exist."""
+        try:
+            stat = os.stat(self.path(key))
+            return stat.st_mtime_ns, stat.st_size
+        except (FileNotFoundError, KeyError):
+            return None
+
+    def touch(self, key):
+        try:
+            os.utime(self.path(key))
+        except (FileNotFoundError, KeyError):
+            pass
+
+    def hold(self, name):
+        """Block until this process holds the exclusive lock name, then keep it until the process exits.
+
+        Elects one worker for a role: the others wait here and the next one
+        takes over when the holder dies and the OS drops its lock.
+        """
+        if fcntl is None:
+            return
+        os.makedirs(self._directory, exist_ok=True)
+        file = open(os.path.join(self._directory, f'{name}.lock'), 'a')
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        self._held.append(file)
+
+    def keys(self):
+        try:
+            names = os.listdir(self._directory)
+        except FileNotFoundError:
+            return []
+        return [name[:-len('.json')] for name in names if name.endswith('.json') and not name.startswith('.')]
+
+
+class _Locked:
+    def __init__(self, file, lock, exclusive):
+        self._file = file
+        self._lock = lock
+        self._exclusive = exclusive
+
+    def __enter__(self):
+        if fcntl is None:
+            self._lock.acquire()
+        else:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX if self._exclusive else fcntl.LOCK_SH)
+
+    def __exit__(self, *exc):
+        if fcntl is None:
+            self._lock.release()
+        else:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+
+def _load(file):
+    # A document unlinked while its reader waited for the lock is gone
+    if os.fstat(file.fileno()).st_nlink == 0:
+        return None
+    return json.load(file)
@@ -0,0 +1,346 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+
+from file_store import FileStore
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+# Set in each pool process by _install(); what job chunks run against
+_context = None
+
+
+class JobError(ValueError):
+    """Raised for unknown job kinds or parameters a job cannot run with."""
+
+
+def _install(context):
+    global _context
+    _context = context
+
+
+def _run_chunk(run, params, chunk):
+    return run(_context, params, chunk)
+
+
+class JobKind:
+    """How one kind of job is split, run and merged.
+
+    plan(context, params) validates the parameters in the request thread
+    and returns (normalized params, chunks); planning normalized params
+    again gives the same chunks. run(context, params, chunk) is a
+    module-level function executed in a pool process for every chunk.
+    combine(context, params, results) merges the chunk results, in order.
+    """
+
+    def __init__(self, plan, run, combine):
+        self.plan = plan
+        self.run = run
+        self.combine = combine
+
+
+class _Running:
+    """The runner's in-flight chunks of one job."""
+
+    def __init__(self, futures):
+        self.futures = futures
+        self.completed = 0
+        # Set once the last chunk's result has been written back, or dropped
+        self.settled = False
+        self.lock = threading.Lock()
+
+
+class JobExecutor:
+    """Runs heavy catalog jobs on one process pool shared by every worker.
+
+    Jobs are documents in a FileStore under directory, keyed by a hash of
+    (catalog version, kind, normalized params), so every worker can report,
+    reuse or cancel any job, and submitting the same job again from any
+    worker returns the existing one and, with it, the cached result.
+    Results are stored next to them in directory/results.
+
+    One worker at a time is the runner, elected with a lock in directory:
+    it plans queued jobs into chunks of table rows, fans them out across its
+    pool and writes progress and results back. Every worker that serves a
+    job request waits to take over, so when the runner dies the next one
+    picks up its queued and orphaned running jobs. The pool uses the
+    forkserver start method where available, so its processes are never
+    forked from a threaded worker; a snapshot-backed catalog reaches them
+    as the snapshot's path and is mapped rather than copied.
+    """
+
+    def __init__(self, kinds, directory, workers=1, max_jobs=256, poll_interval=0.1):
+        self._kinds = kinds
+        self._workers = workers
+        self._max_jobs = max_jobs
+        self._poll_interval = poll_interval
+        self._jobs = FileStore(directory)
+        self._results = FileStore(os.path.join(directory, 'results'))
+        self._context = None
+        self._version = None
+        self._lock = threading.Lock()
+        # Runner state, only used by the process holding the runner lock
+        self._standby_pid = None
+        self._runner = False
+        self._pool = None
+        self._pool_version = None
+        self._running = {}
+        self._stamps = {}
+
+    def reset(self, context, version):
+        """Run new jobs against a newly loaded catalog; jobs of the old one fail when they would run."""
+        with self._lock:
+            self._context = context
+            self._version = version
+
+    def _ensure_standby(self):
+        # Started lazily from job requests, so it runs in gunicorn workers and never in a preloading master
+        with self._lock:
+            if self._standby_pid == os.getpid():
+                return
+            self._standby_pid = os.getpid()
+        threading.Thread(target=self._standby, name='job-runner', daemon=True).start()
+
+    def _standby(self):
+        self._jobs.hold('runner')
+        self._runner = True
+        while True:
+            try:
+                self._dispatch()
+            except Exception as e:
+                print(f"Error in job runner: {str(e)}")
+            time.sleep(self._poll_interval)
+
+    def submit(self, kind, params):
+        """Start a job, or return the live or finished job with the same key; returns (description, reused)."""
+        if kind not in self._kinds:
+            raise JobError(f"Unknown job kind '{kind}'")
+        self._ensure_standby()
+        params, chunks = self._kinds[kind].plan(self._context, params)
+        key = json.dumps([self._version, kind, params], sort_keys=True, separators=(',', ':'))
+        job_id = hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+        document = {
+            'job_id': job_id,
+            'kind': kind,
+            'params': params,
+            'version': self._version,
+            'status': QUEUED,
+            'progress': {'completed': 0, 'total': len(chunks)},
+            'submitted': time.time(),
+            'finished': None
+        }
+
+        if self._jobs.create(job_id, document):
+            self._evict()
+            return _describe(document), False
+
+        def resubmit(existing):
+            # Failed and cancelled jobs run again; anything else is reused
+            if existing['status'] not in (FAILED, CANCELLED):
+                return False
+            existing.clear()
+            existing.update(document)
+            return True
+        try:
+            rerun = self._jobs.update(job_id, resubmit)
+        except KeyError:
+            # Evicted in between; start it afresh
+            return self.submit(kind, params)
+        if rerun:
+            self._results.remove(job_id)
+        return self.describe(job_id, include_result=False), not rerun
+
+    def _evict(self):
+        # Oldest finished jobs go first; queued and running ones are never dropped
+        job_ids = self._jobs.keys()
+        if len(job_ids) <= self._max_jobs:
+            return
+        finished = []
+        for job_id in job_ids:
+            document = self._jobs.read(job_id)
+            if document is not None and document['status'] in FINISHED:
+                finished.append((document['finished'] or 0, job_id))
+        for _, job_id in sorted(finished)[:len(job_ids) - self._max_jobs]:
+            self._jobs.remove(job_id)
+            self._results.remove(job_id)
+
+    def _get_pool(self):
+        with self._lock:
+            context, version = self._context, self._version
+        if self._pool is not None and self._pool_version != version:
+            # A reload replaced the catalog the pool processes hold
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            mp_context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            if 'forkserver' in methods:
+                mp_context.set_forkserver_preload(['job_executor', 'analytics_jobs'])
+            self._pool = ProcessPoolExecutor(self._workers, mp_context=mp_context,
+                                             initializer=_install, initargs=(context,))
+            self._pool_version = version
+        return self._pool, context, version
+
+    def _dispatch(self):
+        """One pass of the runner: start new and orphaned jobs, stop cancelled ones."""
+        for job_id in self._jobs.keys():
+            stamp = self._jobs.stamp(job_id)
+            # Finished documents only change again when resubmitted, which changes their stamp
+            if job_id not in self._running and stamp == self._stamps.get(job_id):
+                continue
+            document = self._jobs.read(job_id)
+            if document is None:
+                continue
+            self._stamps[job_id] = stamp
+            running = self._running.get(job_id)
+            if running is not None:
+                if document['status'] == CANCELLED:
+                    # Chunks already running finish in the background; their results are dropped
+                    for future in running.futures:
+                        future.cancel()
+                if document['status'] in FINISHED or running.settled:
+                    del self._running[job_id]
+                    # Read it again next pass, in case its chunks were dropped with a replaced pool
+                    self._stamps.pop(job_id, None)
+            elif document['status'] in (QUEUED, RUNNING):
+                self._start(job_id, document)
+        for job_id in set(self._stamps) - set(self._jobs.keys()):
+            del self._stamps[job_id]
+
+    def _start(self, job_id, document):
+        pool, context, version = self._get_pool()
+        if document['version'] != version:
+            self._fail(job_id, 'The catalog changed before the job ran; submit it again')
+            return
+        job_kind = self._kinds[document['kind']]
+        try:
+            params, chunks = job_kind.plan(context, document['params'])
+        except Exception as e:
+            self._fail(job_id, str(e))
+            return
+
+        def claim(current):
+            if current['status'] in FINISHED:
+                return False
+            current['status'] = RUNNING
+            current['progress'] = {'completed': 0, 'total': len(chunks)}
+            return True
+        if not self._update(job_id, claim):
+            return
+        if not chunks:
+            self._finish(job_id, job_kind, context, params, [])
+            return
+        running = _Running([pool.submit(_run_chunk, job_kind.run, params, chunk) for chunk in chunks])
+        self._running[job_id] = running
+        for future in running.futures:
+            future.add_done_callback(lambda future: self._chunk_done(job_id, running, job_kind, context, params))
+
+    def _chunk_done(self, job_id, running, job_kind, context, params):
+        with running.lock:
+            running.completed += 1
+            completed = running.completed
+
+        def progress(current):
+            if current['status'] == RUNNING:
+                current['progress']['completed'] = max(current['progress']['completed'], completed)
+        self._update(job_id, progress)
+        if completed < len(running.futures):
+            return
+        try:
+            results = [future.result() for future in running.futures]
+        except CancelledError:
+            pass
+        except Exception as e:
+            self._fail(job_id, str(e))
+        else:
+            self._finish(job_id, job_kind, context, params, results)
+        finally:
+            running.settled = True
+
+    def _finish(self, job_id, job_kind, context, params, results):
+        try:
+            result = job_kind.combine(context, params, results)
+        except Exception as e:
+            self._fail(job_id, str(e))
+            return
+        self._results.remove(job_id)
+        self._results.create(job_id, result)
+
+        def done(current):
+            if current['status'] in FINISHED:
+                return False
+            current['status'] = DONE
+            current['finished'] = time.time()
+            return True
+        if not self._update(job_id, done):
+            self._results.remove(job_id)
+
+    def _fail(self, job_id, error):
+        def fail(current):
+            if current['status'] not in FINISHED:
+                current['status'] = FAILED
+                current['error'] = error
+                current['finished'] = time.time()
+        self._update(job_id, fail)
+
+    def _update(self, job_id, function):
+        try:
+            return self._jobs.update(job_id, function)
+        except KeyError:
+            return None
+
+    def describe(self, job_id, include_result=True):
+        """Status, progress and (once done) result of a job; None if it is unknown."""
+        self._ensure_standby()
+        document = self._jobs.read(job_id)
+        if document is None:
+            return None
+        description = _describe(document)
+        if include_result and document['status'] == DONE:
+            description['result'] = self._results.read(job_id)
+        return description
+
+    def cancel(self, job_id):
+        """Cancel a job; returns None if it is unknown, else whether it was still running."""
+        self._ensure_standby()
+
+        def cancel(current):
+            if current['status'] in FINISHED:
+                return False
+            current['status'] = CANCELLED
+            current['finished'] = time.time()
+            return True
+        return self._update(job_id, cancel)
+
+    def stats(self):
+        counts = {}
+        job_ids = self._jobs.keys()
+        for job_id in job_ids:
+            document = self._jobs.read(job_id)
+            if document is not None:
+                counts[document['status']] = counts.get(document['status'], 0) + 1
+        return {'jobs': len(job_ids), 'by_status': counts, 'runner': self._runner, 'pool_started': self._pool is not None}
+
+
+def _describe(document):
+    description = {
+        'job_id': document['job_id'],
+        'kind': document['kind'],
+        'params': document['params'],
+        'status': document['status'],
+        'progress': document['progress'],
+        'submitted': document['submitted'],
+        'finished': document['finished']
+    }
+    if 'error' in document:
+        description['error'] = document['error']
+    return description
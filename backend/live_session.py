@@ -0,0 +1,141 @@
+import secrets
+import time
+
+from file_store import FileStore
+
+PROFILE_FIELDS = ('level', 'strength', 'dexterity', 'intelligence', 'faith', 'arcane')
+# get_weapon's defaults
+DEFAULT_PROFILE = {'level': 1, 'strength': 10, 'dexterity': 10, 'intelligence': 10, 'faith': 10, 'arcane': 10}
+
+
+class SessionError(ValueError):
+    """Raised for malformed updates."""
+
+
+class LiveSession:
+    """Latest stat profile per weapon for one client, over its stored document.
+
+    Updates are deltas: only the fields that changed, tagged with the
+    client's sequence number. Each field remembers the sequence that last set
+    it, so a delta that arrives after a newer one cannot roll a field back.
+    Every applied update bumps the session's version and stamps the weapon
+    with it; changes(after) returns each weapon changed since a version
+    once, with its latest profile, under the highest sequence that touched it.
+    """
+
+    def __init__(self, session_id, document):
+        self._id = session_id
+        self._document = document
+
+    def id(self): return self._id
+    def version(self): return self._document['version']
+
+    def update(self, weapon, seq, delta):
+        """Merge a delta for a weapon; returns False if every field in it was stale."""
+        unknown = set(delta) - set(PROFILE_FIELDS)
+        if unknown:
+            raise SessionError(f"Unknown profile fields: {', '.join(sorted(unknown))}")
+        entry = self._document['weapons'].setdefault(weapon, {
+            'profile': dict(DEFAULT_PROFILE),
+            'field_seqs': dict.fromkeys(PROFILE_FIELDS, -1),
+            'seq': -1,
+            'version': 0
+        })
+        applied = False
+        for field, value in delta.items():
+            if seq > entry['field_seqs'][field]:
+                entry['profile'][field] = int(value)
+                entry['field_seqs'][field] = seq
+                applied = True
+        # A weapon is pushed again even for an empty delta, e.g. to subscribe to it
+        if applied or not delta:
+            self._document['version'] += 1
+            entry['seq'] = max(seq, entry['seq'])
+            entry['version'] = self._document['version']
+        return applied or not delta
+
+    def changes(self, after):
+        """[(version, weapon, seq, profile)] for every weapon changed after a version, oldest first."""
+        changed = [(entry['version'], weapon, entry['seq'], dict(entry['profile']))
+                   for weapon, entry in self._document['weapons'].items() if entry['version'] > after]
+        return sorted(changed)
+
+    def current(self, weapons):
+        """[(version, weapon, seq, profile)] for each of weapons the session has seen, oldest change first."""
+        entries = self._document['weapons']
+        return sorted((entries[weapon]['version'], weapon, entries[weapon]['seq'], dict(entries[weapon]['profile']))
+                      for weapon in set(weapons) if weapon in entries)
+
+
+class SessionStore:
+    """Live sessions as documents under directory, expired after idle_timeout seconds.
+
+    Sessions live in a FileStore rather than in memory, so any worker can
+    take a session's updates or serve its stream, and they outlive worker
+    restarts.
+    """
+
+    def __init__(self, directory, idle_timeout=300, max_sessions=1000, poll_interval=0.05):
+        self._store = FileStore(directory)
+        self._idle_timeout = idle_timeout
+        self._max_sessions = max_sessions
+        self._poll_interval = poll_interval
+
+    def _expire(self):
+        now = time.time_ns()
+        for session_id in self._store.keys():
+            modified = self._store.modified(session_id)
+            if modified is not None and now - modified > self._idle_timeout * 1e9:
+                self._store.remove(session_id)
+
+    def create(self):
+        self._expire()
+        if len(self) >= self._max_sessions:
+            raise SessionError('Too many live sessions, try again later')
+        document = {'version': 0, 'weapons': {}}
+        session_id = secrets.token_urlsafe(16)
+        while not self._store.create(session_id, document):
+            session_id = secrets.token_urlsafe(16)
+        return LiveSession(session_id, document)
+
+    def get(self, session_id):
+        """The session as currently stored, or None."""
+        document = self._store.read(session_id)
+        return None if document is None else LiveSession(session_id, document)
+
+    def update(self, session_id, updates):
+        """Apply [(weapon, seq, delta)] in one step.
+
+        Returns (how many were accepted, the session as written), or None
+        without the session.
+        """
+        def apply(document):
+            session = LiveSession(session_id, document)
+            return sum(session.update(weapon, seq, delta) for weapon, seq, delta in updates), session
+        try:
+            return self._store.update(session_id, apply)
+        except KeyError:
+            return None
+
+    def wait(self, session_id, after, timeout):
+        """Poll for up to timeout seconds for changes after a version.
+
+        Returns changes() as soon as there are any, [] on timeout, or None if
+        the session does not exist or is closed while waiting.
+        """
+        self._store.touch(session_id)
+        deadline = time.monotonic() + timeout
+        while True:
+            session = self.get(session_id)
+            if session is None:
+                return None
+            changes = session.changes(after)
+            if changes or time.monotonic() >= deadline:
+                return changes
+            time.sleep(self._poll_interval)
+
+    def close(self, session_id):
+        return self._store.remove(session_id)
+
+    def __len__(self):
+        return len(self._store.keys())
@@ -0,0 +1,68 @@
+import re
+import unicodedata
+
+# Apostrophe look-alikes that show up in the two CSVs and in URLs typed by users
+_APOSTROPHES = str.maketrans({'’': "'", '‘': "'", '`': "'", '´': "'"})
+_DROPPED = re.compile(r"[.,]")
+_WHITESPACE = re.compile(r"[\s_]+")
+
+
+def normalize_name(name):
+    """Canonical lookup key for a weapon name.
+
+    Case, accents (Miséricorde / Misericorde), apostrophe variants, periods
+    (St. / St) and runs of whitespace are all folded away.
+    """
+    if name.isascii():
+        # Nothing to decompose; ` is the only apostrophe look-alike in ASCII
+        name = name.replace('`', "'")
+    else:
+        name = unicodedata.normalize('NFKD', name.translate(_APOSTROPHES))
+        name = ''.join(char for char in name if not unicodedata.combining(char))
+    name = _DROPPED.sub('', name.lower())
+    return _WHITESPACE.sub(' ', name).strip()
+
+
+def _aliases(key):
+    """Looser spellings of an already normalized key."""
+    yield key.replace("'", '')
+    yield key.replace('-', ' ')
+
+
+class NameIndex:
+    """Hash index from normalized weapon names to stored objects.
+
+    Every name is registered under its normalized key plus a few aliases
+    (no apostrophes, hyphens as spaces). Exact keys always win over aliases,
+    and the first object registered under an alias keeps it.
+    """
+
+    def __init__(self):
+        self._keys = {}
+        self._aliases = {}
+
+    def add(self, name, obj):
+        key = normalize_name(name)
+        self._keys[key] = obj
+        for alias in _aliases(key):
+            if alias != key:
+                self._aliases.setdefault(alias, obj)
+
+    def get(self, name, default=None):
+        key = normalize_name(name)
+        if key in self._keys:
+            return self._keys[key]
+        if key in self._aliases:
+            return self._aliases[key]
+        for alias in _aliases(key):
+            if alias in self._keys:
+                return self._keys[alias]
+            if alias in self._aliases:
+                return self._aliases[alias]
+        return default
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __len__(self):
+        return len(self._keys)
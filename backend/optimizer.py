@@ -0,0 +1,193 @@
+import numpy as np
+
+from weapon_table import ATTRIBUTES, DAMAGE_TYPES
+
+MIN_STAT = 1
+MAX_STAT = 99
+BASELINE_STAT = 10
+
+# Attributes that feed the same damage type have to be searched jointly, since
+# Weapon truncates each damage type with int() after summing its bonuses.
+# Everything else is additive, so the groups can be combined with a knapsack.
+GROUPS = (('strength', 'dexterity'), ('intelligence',), ('faith',), ('arcane',))
+
+OBJECTIVES = ('total', 'value') + DAMAGE_TYPES
+
+
+class OptimizerError(ValueError):
+    """Raised for budgets or minimums that no allocation can satisfy."""
+
+
+def objective_fields(objective):
+    """Result fields summed to score an allocation."""
+    if objective == 'total':
+        return DAMAGE_TYPES
+    if objective in OBJECTIVES:
+        return (objective,)
+    raise OptimizerError(f"Unknown objective '{objective}', expected one of {', '.join(OBJECTIVES)}")
+
+
+def clamp_level(table, row, level):
+    """Weapon.set_level() semantics for a table row."""
+    return max(0, min(int(level), int(table.max_levels()[row])))
+
+
+def _minimums(minimums):
+    minimums = minimums or {}
+    unknown = set(minimums) - set(ATTRIBUTES)
+    if unknown:
+        raise OptimizerError(f"Unknown attributes: {', '.join(sorted(unknown))}")
+    return {stat: max(MIN_STAT, min(int(minimums.get(stat, MIN_STAT)), MAX_STAT)) for stat in ATTRIBUTES}
+
+
+def _check_budget(budget, minimums):
+    required = sum(minimums.values())
+    if budget < required:
+        raise OptimizerError(f'Budget {budget} is below the {required} points the minimums require')
+
+
+def check_request(budget, minimums=None, objective='total'):
+    """Raise OptimizerError for an objective, minimums or budget no search can use."""
+    objective_fields(objective)
+    _check_budget(int(budget), _minimums(minimums))
+
+
+def _score(table, row, level, fields, **profile):
+    scaled = table.evaluate(level=level, indices=[row], **profile)
+    return sum(scaled[field][..., 0] for field in fields)
+
+
+def _group_best(table, row, level, fields, group, minimums):
+    """Best score for every point total the group can spend.
+
+    Returns (offset, best, choices): best[c] is the highest score reachable
+    by spending exactly offset + c points on the group's attributes, and
+    choices[c] is the stat tuple that reaches it.
+    """
+    ranges = [np.arange(minimums[stat], MAX_STAT + 1) for stat in group]
+    if len(group) == 1:
+        scores = _score(table, row, level, fields, **{group[0]: ranges[0]})
+        return int(ranges[0][0]), scores, [(int(stat),) for stat in ranges[0]]
+
+    first, second = ranges
+    scores = _score(table, row, level, fields, **{group[0]: first[:, np.newaxis], group[1]: second[np.newaxis, :]})
+    size = len(first) + len(second) - 1
+    best = np.full(size, -np.inf)
+    picks = np.zeros(size, dtype=np.intp)
+    # Walk the anti-diagonals: row i of the grid covers totals i .. i + len(second) - 1
+    for i in range(len(first)):
+        window = slice(i, i + len(second))
+        better = scores[i] > best[window]
+        best[window] = np.where(better, scores[i], best[window])
+        picks[window] = np.where(better, i, picks[window])
+    choices = [(int(first[i]), int(second[total - i])) for total, i in enumerate(picks)]
+    return int(first[0] + second[0]), best, choices
+
+
+def _combine(left, right):
+    """Max-plus convolution of two group tables, keeping the winning split."""
+    left_offset, left_best, left_choices = left
+    right_offset, right_best, right_choices = right
+    size = len(left_best) + len(right_best) - 1
+    best = np.full(size, -np.inf)
+    picks = np.zeros(size, dtype=np.intp)
+    for i in range(len(left_best)):
+        window = slice(i, i + len(right_best))
+        candidate = left_best[i] + right_best
+        better = candidate > best[window]
+        best[window] = np.where(better, candidate, best[window])
+        picks[window] = np.where(better, i, picks[window])
+    choices = [left_choices[i] + right_choices[total - i] for total, i in enumerate(picks)]
+    return left_offset + right_offset, best, choices
+
+
+def optimize_allocation(table, row, level, budget, minimums=None, objective='total'):
+    """Attribute spread that maximizes the objective for one weapon.
+
+    budget caps the sum of all five attributes; each attribute stays within
+    [minimum, 99]. Exact for the truncated Weapon formulas: each group of
+    attributes is scored on its full grid, then the groups are merged with a
+    knapsack over point totals, so the work is a few thousand vectorized
+    evaluations rather than a search over 99^5 spreads.
+    """
+    fields = objective_fields(objective)
+    minimums = _minimums(minimums)
+    budget = int(budget)
+    _check_budget(budget, minimums)
+    level = clamp_level(table, row, level)
+
+    combined = None
+    for group in GROUPS:
+        table_for_group = _group_best(table, row, level, fields, group, minimums)
+        combined = table_for_group if combined is None else _combine(combined, table_for_group)
+    offset, best, choices = combined
+
+    # argmax picks the cheapest total among equally good ones
+    affordable = best[:budget - offset + 1]
+    choice = choices[int(np.argmax(affordable))]
+    allocation = dict(zip((stat for group in GROUPS for stat in group), choice))
+
+    scaled = table.evaluate(level=level, indices=[row], **allocation)
+    result = {field: column[0].item() for field, column in scaled.items()}
+    result['total'] = sum(result[field] for field in DAMAGE_TYPES)
+    return {
+        'name': table.names()[row],
+        'level': level,
+        'objective': objective,
+        'score': sum(result[field] for field in fields),
+        'allocation': {stat: allocation[stat] for stat in ATTRIBUTES},
+        'points_spent': sum(allocation.values()),
+        'stats': result
+    }
+
+
+def upper_bounds(table, level, budget, minimums=None, objective='total'):
+    """Per-row upper bound on optimize_allocation()'s score, for every row at once.
+
+    Drops the int() truncation and the dead zone below 10 points, which turns
+    the problem into a fractional knapsack: spend the spare points on the
+    steepest per-point gains first.
+    """
+    fields = objective_fields(objective)
+    minimums = _minimums(minimums)
+    levels = np.minimum(np.maximum(0, int(level)), table.max_levels())
+
+    at_minimum = table.evaluate_pairs(np.arange(len(table)), level=levels, **minimums)
+    bound = sum(at_minimum[field] for field in fields).astype(np.float64)
+    if fields != ('value',):
+        # int() truncation hides less than one point per damage type
+        bound += len(fields)
+
+    gains = table.gains()
+    slopes = sum(gains[field] for field in fields)
+    caps = np.array([MAX_STAT - max(minimums[stat], BASELINE_STAT) for stat in ATTRIBUTES], dtype=np.float64)
+    spare = np.full(len(table), float(max(0, int(budget) - sum(minimums.values()))))
+    rows = np.arange(len(table))
+    for column in np.argsort(-slopes, axis=1).T:
+        spend = np.minimum(spare, caps[column])
+        bound += spend * slopes[rows, column]
+        spare -= spend
+    # Leave room for float rounding in value()
+    return bound + 1e-9 * np.abs(bound)
+
+
+def optimize_catalog(table, level, budget, minimums=None, objective='total', limit=1, indices=None):
+    """Best weapons (and their allocations) across the catalog.
+
+    Branch and bound: rows are visited in order of upper_bounds(), solved
+    exactly with optimize_allocation(), and the search stops as soon as the
+    limit-th best exact score beats every remaining bound.
+    """
+    _check_budget(int(budget), _minimums(minimums))
+    bounds = upper_bounds(table, level, budget, minimums, objective)
+    candidates = np.arange(len(table)) if indices is None else np.asarray(indices, dtype=np.intp)
+    order = candidates[np.argsort(-bounds[candidates], kind='stable')]
+
+    best = []
+    for row in order:
+        if len(best) >= limit and best[-1]['score'] >= bounds[row]:
+            break
+        best.append(optimize_allocation(table, int(row), level, budget, minimums, objective))
+        best.sort(key=lambda result: result['score'], reverse=True)
+        del best[limit:]
+    return best
@@ -0,0 +1,37 @@
+import numpy as np
+
+
+def skyline(weights, scores):
+    """Weight-vs-score Pareto frontier in O(n log n).
+
+    A weapon is dominated when another one is no heavier and scores at least
+    as much, and is strictly better on one of the two. Returns
+    (frontier, dominator): the non-dominated positions ordered by weight, and
+    for every position the frontier position that dominates it with the
+    smallest score surplus (the lightest weapon that matches it), or -1 for
+    frontier members.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    scores = np.asarray(scores, dtype=np.float64)
+    if len(weights) == 0:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+
+    # Lightest first; within equal weight, best score first
+    order = np.lexsort((-scores, weights))
+    sorted_weights = weights[order]
+    sorted_scores = scores[order]
+
+    running_best = np.maximum.accumulate(sorted_scores)
+    group_start = np.searchsorted(sorted_weights, sorted_weights, side='left')
+    # Best score among strictly lighter weapons
+    lighter_best = np.where(group_start > 0, running_best[np.maximum(group_start - 1, 0)], -np.inf)
+    dominated = (lighter_best >= sorted_scores) | (sorted_scores < sorted_scores[group_start])
+
+    frontier = order[~dominated]
+    dominator = np.full(len(weights), -1, dtype=np.intp)
+    if dominated.any():
+        # Frontier scores rise with weight, so the first one reaching the
+        # dominated score is also the lightest weapon dominating it
+        nearest = np.searchsorted(scores[frontier], sorted_scores[dominated], side='left')
+        dominator[order[dominated]] = frontier[nearest]
+    return frontier, dominator
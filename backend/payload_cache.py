@@ -0,0 +1,105 @@
+import gzip
+import hashlib
+import threading
+
+from flask import Response
+
+from wire_format import JSON_MIMETYPE, MSGPACK_MIMETYPE, media_types, negotiate, serialize
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# The first br request compresses the catalog. On the real catalog quality 11
+# is ~75x the CPU of quality 5 (0.6 s vs 8 ms) for a ~13% smaller body
+BROTLI_QUALITY = 5
+
+# ETag suffixes that keep every representation's tag distinct
+MEDIA_TAGS = {JSON_MIMETYPE: '', MSGPACK_MIMETYPE: '-mp'}
+ENCODING_TAGS = {'identity': '', 'gzip': '-gz', 'br': '-br'}
+
+
+class CachedPayload:
+    """A body serialized and compressed once, served many times.
+
+    build() returns the data to serialize. Nothing is built up front, so
+    workers that never serve the payload never pay for it: the JSON body is
+    built by the first request or etag() call, and every other
+    representation (MessagePack when the msgpack module is installed, gzip
+    and, with the brotli module, brotli) the first time a request
+    negotiates it, and kept. Each representation gets its own strong ETag;
+    a request whose If-None-Match carries any tag of the negotiated media
+    type gets a 304.
+    """
+
+    def __init__(self, build, cache_control='public, max-age=300, must-revalidate'):
+        self._build = build
+        self._cache_control = cache_control
+        # mimetype -> encoding -> (body, etag); filled in under the lock
+        self._media = {}
+        self._lock = threading.Lock()
+        self._encodings = ['identity', 'gzip'] + (['br'] if brotli is not None else [])
+
+    def _representation(self, mimetype, encoding):
+        encodings = self._media.get(mimetype)
+        if encodings is not None and encoding in encodings:
+            return encodings[encoding]
+        with self._lock:
+            encodings = self._media.get(mimetype)
+            if encodings is None:
+                body = serialize(self._build(), mimetype)
+                digest = hashlib.sha256(body).hexdigest()[:32] + MEDIA_TAGS[mimetype]
+                encodings = {'identity': (body, digest)}
+                self._media[mimetype] = encodings
+            if encoding not in encodings:
+                body, digest = encodings['identity']
+                if encoding == 'gzip':
+                    body = gzip.compress(body, compresslevel=9, mtime=0)
+                else:
+                    body = brotli.compress(body, quality=BROTLI_QUALITY)
+                encodings[encoding] = (body, digest + ENCODING_TAGS[encoding])
+            return encodings[encoding]
+
+    def _tags(self, mimetype):
+        """Every ETag of a media type, without building the compressed bodies."""
+        digest = self._representation(mimetype, 'identity')[1]
+        return [digest + ENCODING_TAGS[encoding] for encoding in self._encodings]
+
+    def etag(self, encoding='identity', mimetype=JSON_MIMETYPE):
+        return self._representation(mimetype, 'identity')[1] + ENCODING_TAGS[encoding]
+
+    def encodings(self):
+        return list(self._encodings)
+
+    def media_types(self):
+        return media_types()
+
+    def size(self, encoding='identity', mimetype=JSON_MIMETYPE):
+        return len(self._representation(mimetype, encoding)[0])
+
+    def built_sizes(self, mimetype=JSON_MIMETYPE):
+        """{encoding: body size} of the representations of a media type built so far; builds nothing."""
+        return {encoding: len(body) for encoding, (body, _) in list(self._media.get(mimetype, {}).items())}
+
+    def response(self, request):
+        """Build the Response for a Flask request, negotiating media type, encoding and 304s."""
+        mimetype = negotiate(request)
+        offered = [encoding for encoding in ('br', 'gzip', 'identity') if encoding in self._encodings]
+        encoding = request.accept_encodings.best_match(offered, default='identity')
+
+        if any(request.if_none_match.contains(tag) for tag in self._tags(mimetype)):
+            response = Response(status=304)
+            etag = self.etag(encoding, mimetype)
+        else:
+            body, etag = self._representation(mimetype, encoding)
+            response = Response(body, mimetype=mimetype)
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = self._cache_control
+        response.vary.add('Accept-Encoding')
+        if len(media_types()) > 1:
+            response.vary.add('Accept')
+        return response
@@ -0,0 +1,72 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class RequestSampler:
+    """Opt-in sampling profiler for slow requests.
+
+    A daemon thread wakes every interval seconds and records the current
+    stack of each thread that is inside a request. When a request ends after
+    threshold seconds or more, its samples are written to directory as
+    collapsed stacks ("frame;frame;frame count" per line, the input format
+    of flamegraph.pl and speedscope); faster requests are discarded. Only the
+    sampler thread walks frames, so requests themselves pay two dict updates.
+    """
+
+    def __init__(self, directory, threshold=0.5, interval=0.005, max_profiles=200):
+        self._directory = directory
+        self._threshold = threshold
+        self._interval = interval
+        self._max_profiles = max_profiles
+        self._active = {}
+        self._lock = threading.Lock()
+        self._written = 0
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            os.makedirs(self._directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name='request-sampler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self._interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                frames = sys._current_frames()
+                for ident, samples in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        samples[_collapse(frame)] += 1
+
+    def begin(self):
+        with self._lock:
+            self._active[threading.get_ident()] = Counter()
+
+    def end(self, label, elapsed):
+        """Stop sampling the current thread; returns the profile path if one was written."""
+        with self._lock:
+            samples = self._active.pop(threading.get_ident(), None)
+        if not samples or elapsed < self._threshold or self._written >= self._max_profiles:
+            return None
+        self._written += 1
+        safe_label = ''.join(char if char.isalnum() else '_' for char in label).strip('_')
+        path = os.path.join(self._directory, f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-{self._written}-{safe_label}.folded')
+        with open(path, 'w') as file:
+            for stack, count in samples.most_common():
+                file.write(f'{stack} {count}\n')
+        return path
+
+
+def _collapse(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+        frame = frame.f_back
+    return ';'.join(reversed(stack))
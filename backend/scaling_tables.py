@@ -0,0 +1,137 @@
+import os
+import sys
+
+import numpy as np
+
+from weapon_table import REGULAR_MAX_LEVEL, SOMBER_MAX_LEVEL, SOMBER_RATE, REGULAR_RATE
+
+TABLES_VERSION = 1
+MAX_STAT = 99
+
+
+class ScalingTables:
+    """Precompiled lookup tables for constant-time stat queries.
+
+    Every Weapon bonus is a function of (scaling grade, stat) or (upgrade
+    stone, level), so the tables are indexed by grade code rather than by
+    weapon: each weapon only keeps five uint8 grade codes, its base damages
+    and the precomputed value() base. A query is then a few list lookups and
+    adds, in the same operation order as Weapon, so the results are identical.
+
+    Stats outside 0-99 and levels outside the upgrade range are not in the
+    tables and fall back to the plain formulas.
+    """
+
+    def __init__(self, names, grades, codes, somber, bases, base_values, bonus, value_terms, level_bonus):
+        self._names = list(names)
+        self._grades = np.asarray(grades, dtype=np.float64)
+        self._codes = np.asarray(codes, dtype=np.uint8)
+        self._somber = np.asarray(somber, dtype=bool)
+        self._bases = np.asarray(bases, dtype=np.int32)
+        self._base_values = np.asarray(base_values, dtype=np.float64)
+        self._bonus = np.asarray(bonus, dtype=np.float64)
+        self._value_terms = np.asarray(value_terms, dtype=np.float64)
+        self._level_bonus = np.asarray(level_bonus, dtype=np.float64)
+
+        # Plain Python views: scalar indexing into lists beats numpy scalars
+        self._bonus_rows = self._bonus.tolist()
+        self._value_rows = self._value_terms.tolist()
+        self._level_rows = [self._level_bonus[0].tolist(), self._level_bonus[1][:SOMBER_MAX_LEVEL + 1].tolist()]
+        self._grade_list = self._grades.tolist()
+        self._weapons = [
+            (tuple(bases), base_value, int(somber), tuple(codes))
+            for bases, base_value, somber, codes in zip(
+                self._bases.tolist(), self._base_values.tolist(), self._somber.tolist(), self._codes.tolist())
+        ]
+
+    @classmethod
+    def compile(cls, table):
+        """Build the tables from a WeaponTable."""
+        scaling = table.scaling()
+        grades, codes = np.unique(scaling, return_inverse=True)
+        codes = codes.reshape(scaling.shape)
+        stats = np.arange(MAX_STAT + 1) - 10
+        # Same expressions as the Weapon methods, one row per grade
+        bonus = np.maximum(0, stats[np.newaxis, :] * grades[:, np.newaxis] * 0.01)
+        value_terms = np.maximum(0, stats[np.newaxis, :] * grades[:, np.newaxis])
+        levels = np.arange(REGULAR_MAX_LEVEL + 1)
+        level_bonus = np.stack([REGULAR_RATE * levels, SOMBER_RATE * levels])
+        return cls(table.names(), grades, codes, table.somber(), table.base_damage(), table.base_values(),
+                   bonus, value_terms, level_bonus)
+
+    def save(self, path):
+        np.savez_compressed(
+            path, version=np.array(TABLES_VERSION), names=np.array(self._names), grades=self._grades,
+            codes=self._codes, somber=self._somber, bases=self._bases, base_values=self._base_values,
+            bonus=self._bonus, value_terms=self._value_terms, level_bonus=self._level_bonus
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load tables written by save(); returns None for a missing or outdated file."""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            if int(data['version']) != TABLES_VERSION:
+                return None
+            return cls(data['names'].tolist(), data['grades'], data['codes'], data['somber'], data['bases'],
+                       data['base_values'], data['bonus'], data['value_terms'], data['level_bonus'])
+
+    def names(self): return self._names
+
+    def matches(self, table):
+        """True if these tables were compiled from the same catalog data as table."""
+        return (
+            self._names == table.names()
+            and np.array_equal(self._bases, table.base_damage())
+            and np.array_equal(self._grades[self._codes], table.scaling())
+            and np.array_equal(self._somber, table.somber())
+            and np.array_equal(self._base_values, table.base_values())
+        )
+
+    def __len__(self):
+        return len(self._weapons)
+
+    def stats(self, row, level=0, strength=10, dexterity=10, intelligence=10, faith=10, arcane=10):
+        """Scaled damage types and value() for one weapon row."""
+        (physical, magic, fire, light, holy), base_value, somber, (str_code, dex_code, int_code, fai_code, arc_code) = \
+            self._weapons[row]
+        levels = self._level_rows[somber]
+        if 0 <= level < len(levels) and all(0 <= stat <= MAX_STAT for stat in (strength, dexterity, intelligence, faith, arcane)):
+            bonus = self._bonus_rows
+            terms = self._value_rows
+            level_bonus = levels[level]
+            str_bonus = bonus[str_code][strength]
+            dex_bonus = bonus[dex_code][dexterity]
+            int_bonus = bonus[int_code][intelligence]
+            fai_bonus = bonus[fai_code][faith]
+            attr_scaling = (terms[str_code][strength] + terms[dex_code][dexterity] + terms[int_code][intelligence] +
+                            terms[fai_code][faith] + terms[arc_code][arcane]) * 0.01
+        else:
+            grades = self._grade_list
+            level_bonus = (SOMBER_RATE if somber else REGULAR_RATE) * level
+            str_bonus = max(0, (strength - 10) * grades[str_code] * 0.01)
+            dex_bonus = max(0, (dexterity - 10) * grades[dex_code] * 0.01)
+            int_bonus = max(0, (intelligence - 10) * grades[int_code] * 0.01)
+            fai_bonus = max(0, (faith - 10) * grades[fai_code] * 0.01)
+            attr_scaling = (max(0, (strength - 10) * grades[str_code]) + max(0, (dexterity - 10) * grades[dex_code]) +
+                            max(0, (intelligence - 10) * grades[int_code]) + max(0, (faith - 10) * grades[fai_code]) +
+                            max(0, (arcane - 10) * grades[arc_code])) * 0.01
+
+        return {
+            'physical_damage': int(physical * (1 + str_bonus + dex_bonus + level_bonus)),
+            'magic_damage': int(magic * (1 + int_bonus + level_bonus)),
+            'fire_damage': int(fire * (1 + fai_bonus + level_bonus)),
+            'light_damage': int(light * (1 + fai_bonus + level_bonus)),
+            'holy_damage': int(holy * (1 + fai_bonus + level_bonus)),
+            'value': base_value * (1 + level_bonus + attr_scaling) * 10
+        }
+
+
+if __name__ == '__main__':
+    # Offline build: python scaling_tables.py [output path]
+    import app
+
+    output = sys.argv[1] if len(sys.argv) > 1 else app.SCALING_TABLES_PATH
+    ScalingTables.compile(app.weapons_table).save(output)
+    print(f"Wrote scaling tables for {len(app.weapons_table)} weapons to {output}")
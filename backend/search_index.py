@@ -0,0 +1,259 @@
+import bisect
+import heapq
+import math
+import re
+from collections import defaultdict
+
+import numpy as np
+
+from name_index import normalize_name
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Name matches count this much more than description matches
+NAME_BOOST = 3.0
+# Upper bound on vocabulary terms a single prefix may expand to
+MAX_EXPANSIONS = 64
+# Cached typo expansions per index (the vocabulary is fixed once built)
+MAX_CACHED_EXPANSIONS = 4096
+# Minimum trigram similarity for a fuzzy whole-name suggestion
+MIN_NAME_SIMILARITY = 0.3
+
+
+def tokenize(text):
+    """Lowercase, accent-free word tokens; apostrophes are dropped (Rivers' -> rivers)."""
+    return _TOKEN.findall(normalize_name(text).replace("'", ''))
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edits(term):
+    """Typos tolerated in a query term of this length."""
+    if len(term) < 3:
+        return 0
+    return 1 if len(term) < 6 else 2
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance, or limit + 1 as soon as it is known to exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class SearchIndex:
+    """In-memory full-text and typeahead index over weapon names and descriptions.
+
+    Built once per catalog load, with documents in table row order:
+    - an inverted index whose postings already hold each term's BM25 weight
+      per row (name and description fields scored separately, names boosted)
+      as numpy arrays, so ranking a query is a few scatter-adds;
+    - a sorted vocabulary for prefix expansion of the word being typed;
+    - trigram postings over the vocabulary for typo-tolerant term matching,
+      and over whole names for fuzzy suggestions.
+    """
+
+    def __init__(self, documents):
+        self._names = [name for name, _ in documents]
+        self._keys = [normalize_name(name) for name in self._names]
+        postings = defaultdict(dict)
+        fields = [
+            ([tokenize(name) for name, _ in documents], NAME_BOOST),
+            ([tokenize(description) for _, description in documents], 1.0)
+        ]
+        count = len(documents)
+        for field_tokens, boost in fields:
+            average_length = sum(map(len, field_tokens)) / max(1, count)
+            frequencies = []
+            document_frequency = defaultdict(int)
+            for tokens in field_tokens:
+                frequency = defaultdict(int)
+                for token in tokens:
+                    frequency[token] += 1
+                frequencies.append(frequency)
+                for token in frequency:
+                    document_frequency[token] += 1
+            for row, (tokens, frequency) in enumerate(zip(field_tokens, frequencies)):
+                norm = K1 * (1 - B + B * len(tokens) / max(average_length, 1e-9))
+                for token, tf in frequency.items():
+                    df = document_frequency[token]
+                    idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                    weight = boost * idf * tf * (K1 + 1) / (tf + norm)
+                    postings[token][row] = postings[token].get(row, 0.0) + weight
+        self._postings = {
+            term: (np.fromiter(rows, dtype=np.intp, count=len(rows)),
+                   np.fromiter(rows.values(), dtype=np.float64, count=len(rows)))
+            for term, rows in postings.items()
+        }
+
+        self._terms = sorted(self._postings)
+        self._term_trigrams = defaultdict(list)
+        self._term_gram_counts = {}
+        for term in self._terms:
+            grams = trigrams(term)
+            self._term_gram_counts[term] = len(grams)
+            for gram in grams:
+                self._term_trigrams[gram].append(term)
+        self._fuzzy_cache = {}
+
+        self._sorted_keys = sorted((key, row) for row, key in enumerate(self._keys))
+        self._name_trigrams = defaultdict(list)
+        self._name_gram_counts = []
+        for row, key in enumerate(self._keys):
+            grams = trigrams(key)
+            self._name_gram_counts.append(len(grams))
+            for gram in grams:
+                self._name_trigrams[gram].append(row)
+        self._name_rows = defaultdict(set)
+        for row, name in enumerate(self._names):
+            for term in tokenize(name):
+                self._name_rows[term].add(row)
+        self._name_vocabulary = sorted(self._name_rows)
+
+    def __len__(self):
+        return len(self._names)
+
+    def _prefixed(self, terms, prefix):
+        start = bisect.bisect_left(terms, prefix)
+        matches = []
+        for term in terms[start:start + MAX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+
+    def _fuzzy(self, term):
+        """Vocabulary terms within max_edits(term) of term, as (term, edits)."""
+        if term in self._fuzzy_cache:
+            return self._fuzzy_cache[term]
+        limit = max_edits(term)
+        matches = []
+        if limit:
+            grams = trigrams(term)
+            shared = defaultdict(int)
+            for gram in grams:
+                for candidate in self._term_trigrams.get(gram, ()):
+                    shared[candidate] += 1
+            for candidate, overlap in shared.items():
+                # Each edit changes at most three trigrams of either word
+                if overlap < max(len(grams), self._term_gram_counts[candidate]) - 3 * limit:
+                    continue
+                if abs(len(candidate) - len(term)) > limit:
+                    continue
+                edits = edit_distance(term, candidate, limit)
+                if edits <= limit:
+                    matches.append((candidate, edits))
+        if len(self._fuzzy_cache) >= MAX_CACHED_EXPANSIONS:
+            self._fuzzy_cache.clear()
+        self._fuzzy_cache[term] = matches
+        return matches
+
+    def expand(self, token, prefix=False):
+        """Vocabulary terms a query token stands for, as {term: weight factor}.
+
+        An exact hit weighs 1. Otherwise typo matches weigh less per edit.
+        With prefix (the word still being typed) completions are added too,
+        weighted by how much of the term has been typed.
+        """
+        expansions = {}
+        if token in self._postings:
+            expansions[token] = 1.0
+        else:
+            for term, edits in self._fuzzy(token):
+                expansions[term] = 1.0 - edits / (len(token) + 1)
+        if prefix:
+            for term in self._prefixed(self._terms, token):
+                expansions.setdefault(term, len(token) / len(term))
+        return expansions
+
+    def search(self, query, limit=10, prefix=False):
+        """Rows ranked by BM25 over names and descriptions, as [(row, score)].
+
+        Each query token contributes its best matching expansion per row, so
+        a prefix with many completions does not outweigh one exact word.
+        """
+        tokens = tokenize(query)
+        scores = np.zeros(len(self._names))
+        for i, token in enumerate(tokens):
+            expansions = self.expand(token, prefix=prefix and i == len(tokens) - 1)
+            if len(expansions) == 1:
+                (term, factor), = expansions.items()
+                rows, weights = self._postings[term]
+                scores[rows] += weights * factor
+            elif expansions:
+                best = np.zeros(len(self._names))
+                for term, factor in expansions.items():
+                    rows, weights = self._postings[term]
+                    best[rows] = np.maximum(best[rows], weights * factor)
+                scores += best
+        matches = np.flatnonzero(scores)
+        if len(matches) > limit:
+            matches = matches[np.argpartition(-scores[matches], limit - 1)[:limit]]
+        # Best score first, ties in row order
+        matches = matches[np.lexsort((matches, -scores[matches]))]
+        return list(zip(matches.tolist(), scores[matches].tolist()))
+
+    def suggest(self, text, limit=10):
+        """Name completions for typeahead, as [(row, match)].
+
+        Names starting with the text come first ('prefix'), then names whose
+        words start with every typed word ('word'), then names that look
+        similar by trigrams ('fuzzy'), so a typo still finds the weapon.
+        """
+        key = normalize_name(text)
+        if not key:
+            return []
+        results = []
+        seen = set()
+
+        start = bisect.bisect_left(self._sorted_keys, (key,))
+        for name_key, row in self._sorted_keys[start:]:
+            if len(results) >= limit or not name_key.startswith(key):
+                break
+            results.append((row, 'prefix'))
+            seen.add(row)
+
+        tokens = tokenize(text)
+        if tokens and len(results) < limit:
+            candidates = None
+            for i, token in enumerate(tokens):
+                completions = self._prefixed(self._name_vocabulary, token) if i == len(tokens) - 1 else [token]
+                rows = set().union(*(self._name_rows.get(term, ()) for term in completions))
+                candidates = rows if candidates is None else candidates & rows
+                if not candidates:
+                    break
+            for row in sorted(candidates, key=lambda row: self._keys[row]):
+                if len(results) >= limit:
+                    break
+                if row not in seen:
+                    results.append((row, 'word'))
+                    seen.add(row)
+
+        if len(results) < limit:
+            grams = trigrams(key)
+            shared = defaultdict(int)
+            for gram in grams:
+                for row in self._name_trigrams.get(gram, ()):
+                    shared[row] += 1
+            similar = []
+            for row, overlap in shared.items():
+                similarity = 2 * overlap / (len(grams) + self._name_gram_counts[row])
+                if row not in seen and similarity >= MIN_NAME_SIMILARITY:
+                    similar.append((similarity, row))
+            for _, row in heapq.nlargest(limit - len(results), similar, key=lambda item: (item[0], -item[1])):
+                results.append((row, 'fuzzy'))
+        return results
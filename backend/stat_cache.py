@@ -0,0 +1,73 @@
+import threading
+from collections import OrderedDict
+
+BASELINE_STAT = 10
+
+
+class ScaledStatCache:
+    """Bounded LRU cache of scaled stat results per (weapon row, profile).
+
+    Keys are canonicalized before lookup: an attribute the weapon does not
+    scale with, or any value at or below the 10-point baseline, contributes
+    nothing to the Weapon formulas, so all of them collapse to 10. Different
+    slider positions that give identical numbers then share one entry.
+
+    Cached results are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, maxsize=4096):
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._scaling = []
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def reset(self, scaling):
+        """Drop every entry and take the per-row scaling grades of a newly loaded catalog."""
+        with self._lock:
+            self._entries.clear()
+            self._scaling = [tuple(grade != 0 for grade in row) for row in scaling]
+            self._invalidations += 1
+
+    def key(self, row, level, *stats):
+        scales = self._scaling[row]
+        return (row, level) + tuple(
+            stat if scaled and stat > BASELINE_STAT else BASELINE_STAT
+            for stat, scaled in zip(stats, scales)
+        )
+
+    def get(self, row, level, strength, dexterity, intelligence, faith, arcane, compute):
+        """Cached compute(row, level, *stats), called with the canonical stats on a miss."""
+        key = self.key(row, level, strength, dexterity, intelligence, faith, arcane)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return result
+            self._misses += 1
+
+        result = compute(*key)
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return result
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self._maxsize,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations
+            }
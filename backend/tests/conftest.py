@@ -0,0 +1,66 @@
+import os
+import random
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from weapon import Weapon  # noqa: E402
+from weapon_table import ATTRIBUTES  # noqa: E402
+
+# Randomized (weapon, profile) comparisons are seeded so failures reproduce
+SEED = 2022
+
+
+@pytest.fixture(scope='session')
+def app():
+    """app.py, imported over the real catalog."""
+    cwd = os.getcwd()
+    # app.py reads data/ under the working directory at import
+    os.chdir(BACKEND_DIR)
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    return app
+
+
+@pytest.fixture(scope='session')
+def records(app):
+    """The real catalog as WeaponRecords, parsed by the app's CSV loader."""
+    return app.read_weapon_csvs()
+
+
+@pytest.fixture
+def rng():
+    return random.Random(SEED)
+
+
+def random_profile(rng):
+    """A level and five attributes, mostly in range, sometimes outside it."""
+    level = rng.choice([rng.randint(0, 25), rng.randint(0, 10), rng.randint(-3, 40)])
+    stats = {stat: rng.choice([rng.randint(1, 99), 10, rng.randint(-5, 150)]) for stat in ATTRIBUTES}
+    return level, stats
+
+
+def as_weapon(record, level=0, strength=10, dexterity=10, intelligence=10, faith=10, arcane=10):
+    """The original Weapon for a record, at a level and attribute profile."""
+    return Weapon(record.name(), record.type(), record.physical_damage(), record.magic_damage(),
+                  record.fire_damage(), record.light_damage(), record.holy_damage(), record.crit_damage(),
+                  record.stamina_damage(), record.strength_scaling(), record.dexterity_scaling(),
+                  record.intelligence_scaling(), record.faith_scaling(), record.arcane_scaling(),
+                  record.weight(), record.upgrade_stone(), record.image_url(), record.description(),
+                  level=level, stre=strength, dex=dexterity, inte=intelligence, fai=faith, arc=arcane)
+
+
+def weapon_stats(weapon):
+    return {
+        'physical_damage': weapon.physical_damage(),
+        'magic_damage': weapon.magic_damage(),
+        'fire_damage': weapon.fire_damage(),
+        'light_damage': weapon.light_damage(),
+        'holy_damage': weapon.holy_damage(),
+        'value': weapon.value()
+    }
@@ -0,0 +1,181 @@
+"""Catalog loading and routes in app.py."""
+from metrics import LATENCY_BUCKETS
+
+
+def test_reload_replaces_the_catalog(app, records):
+    before = app.current_collection()
+    assert app.load_weapons()
+    assert app.load_weapons()
+    assert app.weapons_collection is None
+    assert app.current_collection() is not before
+    assert sum(len(weapons) for weapons in app.current_collection()._object_dictionary.values()) == len(records)
+    assert len(app.weapons_table) == len(records)
+
+
+def test_session_updates_answer_with_the_scaled_weapons(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(app, 'live_sessions', app.SessionStore(str(tmp_path)))
+    client = app.app.test_client()
+    name = app.weapons_table.names()[0]
+    session_id = client.post('/api/sessions').get_json()['session_id']
+    body = client.post(f'/api/sessions/{session_id}/updates', json={'updates': [
+        {'name': name, 'seq': 1, 'strength': 40}, {'name': name, 'seq': 2, 'level': 5},
+        {'name': name, 'seq': 0, 'strength': 10}]}).get_json()
+    assert (body['accepted'], body['stale'], body['version']) == (2, 1, 2)
+    [weapon] = body['weapons']
+    expected = client.get(f'/api/weapons/{name}?level=5&strength=40').get_json()
+    assert weapon == {'seq': 2, 'weapon': expected}
+
+    # The test client is a sync worker, so the stream answers without waiting
+    events = client.get(f'/api/sessions/{session_id}/events', headers={'Last-Event-ID': '2'})
+    assert events.get_data(as_text=True) == f'retry: {app.SESSION_POLL_RETRY_MS}\n\n: keep-alive\n\n'
+    events = client.get(f'/api/sessions/{session_id}/events?after=0').get_data(as_text=True)
+    assert 'id: 2\nevent: stats\n' in events
+
+
+def test_search_index_is_built_by_the_first_search(app):
+    assert app.load_weapons()
+    assert app.search_index is None
+    name = app.weapons_table.names()[0]
+    items = app.app.test_client().get('/api/search', query_string={'q': name + ' '}).get_json()['items']
+    assert items[0]['name'] == name
+    assert app.search_index is not None and len(app.search_index) == len(app.weapons_table)
+
+
+def test_load_builds_no_payloads(app):
+    assert app.load_weapons()
+    assert app.weapons_payload.built_sizes() == {}
+    client = app.app.test_client()
+    response = client.get('/api/weapons', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert set(app.weapons_payload.built_sizes()) == {'identity', 'gzip'}
+    metrics = client.get('/metrics').get_data(as_text=True)
+    assert f'eldenarmory_catalog_payload_bytes{{encoding="gzip"}} {len(response.get_data())}' in metrics
+
+
+def test_optimize_rejects_non_string_names(app):
+    client = app.app.test_client()
+    for name in (5, ['Dagger'], None):
+        response = client.post('/api/optimize', json={'budget': 60, 'name': name})
+        assert response.status_code == 400, name
+    assert client.post('/api/optimize', json={'budget': 60, 'name': 'no such weapon'}).status_code == 404
+
+
+def test_frontier_clamps_huge_stats(app):
+    client = app.app.test_client()
+    huge = client.get('/api/frontier', query_string={'level': 10 ** 30, 'strength': 10 ** 30, 'faith': -10 ** 30})
+    assert huge.status_code == 200
+    capped = client.get('/api/frontier', query_string={'level': 25, 'strength': 99, 'faith': 1})
+    assert huge.get_json() == capped.get_json()
+    frontier = capped.get_json()['frontier']
+    assert [entry['weight'] for entry in frontier] == sorted(entry['weight'] for entry in frontier)
+
+
+def test_batch_rejects_oversized_bodies_before_parsing(app, monkeypatch):
+    parsed = []
+    monkeypatch.setattr(app, 'parse_profile', lambda source: parsed.append(source) or {})
+    client = app.app.test_client()
+    items = [{'name': 'Dagger', 'level': 'not a number'}] * (app.MAX_BATCH_ITEMS + 1)
+    assert client.post('/api/weapons/stats:batch', json={'items': items}).status_code == 400
+    assert client.post('/api/weapons/stats:batch', json={'names': ['Dagger'] * 2, 'profiles': [{}] * 501}).status_code == 400
+    assert parsed == []
+
+
+def test_batch_clamps_profiles_like_the_setters(app, records):
+    client = app.app.test_client()
+    names = [record.name() for record in records[:40]]
+    huge = {'level': 10 ** 30, 'strength': 10 ** 30, 'dexterity': -10 ** 30, 'faith': 150}
+    response = client.post('/api/weapons/stats:batch', json={'names': names, 'profiles': [huge]})
+    assert response.status_code == 200
+    for record, result in zip(records[:40], response.get_json()['results']):
+        weapon = record.scaled()
+        weapon.set_level(10 ** 30)
+        weapon.set_player_strength(10 ** 30)
+        weapon.set_player_dexterity(-10 ** 30)
+        weapon.set_player_faith(150)
+        assert result['name'] == record.name()
+        assert result['physical_damage'] == weapon.physical_damage()
+        assert result['fire_damage'] == weapon.fire_damage()
+        assert result['value'] == weapon.value()
+
+
+def test_sweep_curves_follow_the_setters(app, records):
+    client = app.app.test_client()
+    record = next(record for record in records if record.strength_scaling() and record.faith_scaling())
+    response = client.get('/api/sweep', query_string={
+        'name': f'{record.name()},no such weapon', 'attribute': 'strength,faith',
+        'level': 40, 'strength': 30, 'faith': 150})
+    assert response.status_code == 200
+    weapon, missing = response.get_json()['weapons']
+    assert missing == {'name': 'no such weapon', 'error': 'Weapon not found'}
+    max_level = int(app.weapons_table.max_levels()[app.weapons_index.get(record.name())])
+    assert (weapon['name'], weapon['level'], weapon['strength'], weapon['faith'], weapon['arcane']) == \
+        (record.name(), max_level, 30, 99, 10)
+    curves = weapon['curves']
+    assert set(curves['attributes']) == {'strength', 'faith'}
+
+    def scaled(level=max_level, strength=30, faith=99):
+        scaled_weapon = record.scaled()
+        scaled_weapon.set_level(level)
+        scaled_weapon.set_player_strength(strength)
+        scaled_weapon.set_player_faith(faith)
+        return scaled_weapon
+
+    fields = ('physical_damage', 'holy_damage', 'value')
+    assert len(curves['level']['value']) == max_level + 1
+    for level in (0, max_level // 2, max_level):
+        expected = scaled(level=level)
+        assert [curves['level'][field][level] for field in fields] == [getattr(expected, field)() for field in fields]
+    for attribute in ('strength', 'faith'):
+        curve = curves['attributes'][attribute]
+        assert len(curve['value']) == 99
+        for stat in (1, 10, 55, 99):
+            expected = scaled(**{attribute: stat})
+            assert [curve[field][stat - 1] for field in fields] == [getattr(expected, field)() for field in fields]
+
+
+def test_sweep_rejects_bad_queries(app):
+    client = app.app.test_client()
+    assert client.get('/api/sweep').status_code == 400
+    assert client.get('/api/sweep', query_string={'name': 'Dagger', 'attribute': 'luck'}).status_code == 400
+    names = ','.join(['Dagger'] * (app.MAX_SWEEP_WEAPONS + 1))
+    assert client.get('/api/sweep', query_string={'name': names}).status_code == 400
+
+
+def _samples(text):
+    """{'name{labels}': value} of every sample line in a Prometheus exposition."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            key, value = line.rsplit(' ', 1)
+            samples[key] = float(value)
+    return samples
+
+
+def test_metrics_expose_each_request(app):
+    client = app.app.test_client()
+    name = app.weapons_table.names()[0]
+    route = 'endpoint="/api/weapons/<path:name>",method="GET"'
+    before = _samples(client.get('/metrics').get_data(as_text=True))
+    assert client.get(f'/api/weapons/{name}').status_code == 200
+    assert client.get('/api/weapons/no such weapon').status_code == 404
+    response = client.get('/metrics')
+    assert response.content_type == app.MetricsRegistry.CONTENT_TYPE
+    text = response.get_data(as_text=True)
+    assert text.endswith('\n')
+    lines = text.splitlines()
+    for metric, kind in [('requests_total', 'counter'), ('request_duration_seconds', 'histogram'),
+                         ('catalog_weapons', 'gauge')]:
+        assert f'# TYPE eldenarmory_{metric} {kind}' in lines
+        assert any(line.startswith(f'# HELP eldenarmory_{metric} ') for line in lines)
+
+    after = _samples(text)
+    for status in ('200', '404'):
+        key = f'eldenarmory_requests_total{{{route},status="{status}"}}'
+        assert after[key] == before.get(key, 0) + 1
+    count = after[f'eldenarmory_request_duration_seconds_count{{{route}}}']
+    assert count == before.get(f'eldenarmory_request_duration_seconds_count{{{route}}}', 0) + 2
+    assert after[f'eldenarmory_request_duration_seconds_bucket{{{route},le="+Inf"}}'] == count
+    buckets = [after[f'eldenarmory_request_duration_seconds_bucket{{{route},le="{bound!r}"}}']
+               for bound in LATENCY_BUCKETS]
+    assert buckets == sorted(buckets) and buckets[-1] <= count
+    assert after['eldenarmory_catalog_weapons'] == len(app.weapons_table)
@@ -0,0 +1,91 @@
+"""CatalogIndex filters and keyset paging against plain Python over the records."""
+import pytest
+
+from catalog_query import CatalogIndex, QueryError
+from weapon_table import WeaponTable
+
+VERSION = 'catalog-1'
+
+
+@pytest.fixture(scope='module')
+def table(records):
+    return WeaponTable(records)
+
+
+@pytest.fixture(scope='module')
+def index(app, table):
+    return CatalogIndex(table, app.SCALE_GRADES, VERSION)
+
+
+def _sort_keys(table, sort):
+    if sort == 'name':
+        return [name.lower() for name in table.names()]
+    columns = {'weight': table.weights(), 'value': table.values(), 'crit_damage': table.crit_damages(),
+               'physical_damage': table.base_damage()[:, 0]}
+    return columns[sort].tolist()
+
+
+def _expected(table, matches, sort, order):
+    keys = _sort_keys(table, sort)
+    # Stable ascending order; descending walks it backwards
+    rows = sorted(range(len(table)), key=lambda row: (keys[row], row))
+    if order == 'desc':
+        rows.reverse()
+    return [row for row in rows if matches(row)]
+
+
+def _pages(index, limit, **query):
+    rows, cursor, totals = [], None, set()
+    while True:
+        page, total, cursor = index.query(limit=limit, cursor=cursor, **query)
+        assert 0 < len(page) <= limit or total == 0
+        rows.extend(page)
+        totals.add(total)
+        if cursor is None:
+            return rows, totals
+
+
+@pytest.mark.parametrize('sort, order', [('name', 'asc'), ('value', 'desc'), ('weight', 'asc'),
+                                         ('crit_damage', 'desc'), ('physical_damage', 'asc')])
+@pytest.mark.parametrize('limit', [1, 7, 50, 500])
+def test_paging_visits_every_match_once(table, index, sort, order, limit):
+    rows, totals = _pages(index, limit, sort=sort, order=order)
+    assert rows == _expected(table, lambda row: True, sort, order)
+    assert totals == {len(table)}
+
+
+def test_combined_filters(app, table, index, records):
+    grades = app.SCALE_GRADES
+    types = sorted(set(table.types()))[:3]
+    upgrades = [table.upgrade_stones()[0]]
+    queries = [
+        ({'types': types}, lambda r: r.type() in types),
+        ({'types': types, 'ranges': {'weight': (2.0, 6.5)}},
+         lambda r: r.type() in types and 2.0 <= r.weight() <= 6.5),
+        ({'upgrades': upgrades, 'scaling': {'strength': 'C+'}, 'ranges': {'physical_damage': (100, None)}},
+         lambda r: r.upgrade_stone() in upgrades and r.strength_scaling() >= grades['C'] and
+         r.physical_damage() >= 100),
+        ({'scaling': {'dexterity': 'B,D', 'faith': '-'}},
+         lambda r: r.dexterity_scaling() in (grades['B'], grades['D']) and r.faith_scaling() == 0),
+        ({'types': ['No Such Type'], 'ranges': {'value': (None, 50.0)}}, lambda r: False),
+        ({'ranges': {'value': (None, 120.0), 'crit_damage': (100, 100)}},
+         lambda r: r.value() <= 120.0 and r.crit_damage() == 100),
+    ]
+    for query, matches in queries:
+        expected = _expected(table, lambda row: matches(records[row]), 'value', 'desc')
+        rows, totals = _pages(index, 5, sort='value', order='desc', **query)
+        assert rows == expected, query
+        assert totals == {len(expected)}
+
+
+def test_cursors_are_tied_to_their_sort_and_catalog(app, table, index):
+    _, _, cursor = index.query(sort='weight', limit=3)
+    with pytest.raises(QueryError):
+        index.query(sort='weight', order='desc', limit=3, cursor=cursor)
+    with pytest.raises(QueryError):
+        CatalogIndex(table, app.SCALE_GRADES, 'catalog-2').query(sort='weight', limit=3, cursor=cursor)
+    for bad in ('not a cursor', 'W10='):
+        with pytest.raises(QueryError):
+            index.query(sort='weight', cursor=bad)
+    with pytest.raises(QueryError):
+        index.query(scaling={'strength': 'Z'})
@@ -0,0 +1,127 @@
+"""CollectionObjects over mutable ScaledWeapons and small hand-made groups."""
+import statistics
+
+import pytest
+
+from collection import CollectionObjects
+from conftest import random_profile
+from weapon_table import ATTRIBUTES
+
+SETTERS = ('set_player_strength', 'set_player_dexterity', 'set_player_intelligence', 'set_player_faith',
+           'set_player_arcane')
+
+
+def test_sort_uses_current_values(records, rng):
+    collection = CollectionObjects()
+    weapons = [record.scaled() for record in records]
+    for weapon in weapons:
+        collection.add_object(weapon, weapon.type())
+    # Rescale after adding, so the order captured by add_object() is stale
+    for weapon in weapons:
+        level, stats = random_profile(rng)
+        weapon.set_level(level)
+        for setter, stat in zip(SETTERS, ATTRIBUTES):
+            getattr(weapon, setter)(stats[stat])
+    for key, group in collection._object_dictionary.items():
+        collection.sort(key)
+        values = [weapon.value() for weapon in group]
+        assert values == sorted(values), key
+
+
+class Item:
+    """Stands in for a weapon: a mutable value() and a name to tell ties apart."""
+
+    def __init__(self, name, value):
+        self.name = name
+        self._value = value
+
+    def value(self): return self._value
+    def set_value(self, value): self._value = value
+
+
+VALUES = [('a', 3.0), ('b', 7.5), ('c', 3.0), ('d', 1.0), ('e', 7.5), ('f', 4.0)]
+
+
+def _grouped(values, key='group'):
+    collection = CollectionObjects()
+    items = [Item(name, value) for name, value in values]
+    for item in items:
+        collection.add_object(item, key)
+    return collection, items
+
+
+def _percentile(values, percent):
+    # Linear interpolation between closest ranks, numpy's default
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _check_aggregates(collection, items):
+    values = [item.value() for item in items]
+    assert collection.count('group') == len(values)
+    assert collection.total('group') == pytest.approx(sum(values))
+    assert collection.average('group') == pytest.approx(sum(values) / len(values))
+    assert collection.median('group') == pytest.approx(statistics.median(values))
+    for percent in (0, 10, 25, 50, 90, 100):
+        assert collection.percentile('group', percent) == pytest.approx(_percentile(values, percent))
+    # Ties go to the first object added, like max() and min()
+    assert collection.max_value('group') is max(items, key=lambda item: item.value())
+    assert collection.min_value('group') is min(items, key=lambda item: item.value())
+
+
+def test_aggregates_match_sorted_values():
+    collection, items = _grouped(VALUES)
+    _check_aggregates(collection, items)
+    assert collection.max_value('group').name == 'b'
+    assert collection.percentile('group', 50) == 3.5
+
+
+def test_aggregates_follow_values_changed_after_adding():
+    collection, items = _grouped(VALUES)
+    assert collection.max_value('group').name == 'b'
+    items[3].set_value(9.0)
+    items[1].set_value(0.5)
+    _check_aggregates(collection, items)
+    assert (collection.max_value('group').name, collection.min_value('group').name) == ('d', 'b')
+    # sort() and the aggregates agree on the current values
+    collection.sort('group')
+    group = collection._object_dictionary['group']
+    assert (group[0], group[-1]) == (collection.min_value('group'), collection.max_value('group'))
+
+
+def test_percentile_bounds():
+    collection, _ = _grouped(VALUES)
+    with pytest.raises(ValueError):
+        collection.percentile('group', 101)
+    single, _ = _grouped([('only', 2.0)])
+    assert single.median('group') == single.percentile('group', 100) == 2.0
+
+
+def test_rankings_match_sorted():
+    collection, items = _grouped(VALUES)
+    collection.add_object(Item('other', 5.0), 'other')
+    everything = items + collection._object_dictionary['other']
+    by_value = lambda item: item.value()
+    # sorted() is stable, so ties keep the order objects were added in, as rank() does
+    assert collection.rank('group') == sorted(items, key=by_value)
+    assert collection.rank('group', reverse=True) == sorted(items, key=by_value, reverse=True)
+    assert collection.rank() == sorted(everything, key=by_value)
+    assert collection.rank('group', stat=lambda item: item.name) == sorted(items, key=lambda item: item.name)
+    for k in (0, 1, 2, 3, len(items), len(items) + 2):
+        assert collection.top_k(k, 'group') == sorted(items, key=by_value, reverse=True)[:k]
+        assert collection.bottom_k(k, 'group') == sorted(items, key=by_value)[:k]
+        assert collection.top_k(k) == sorted(everything, key=by_value, reverse=True)[:k]
+    # Tied values: b and e both hold 7.5, a and c 3.0; the first added comes first
+    assert [item.name for item in collection.top_k(2, 'group')] == ['b', 'e']
+    assert [item.name for item in collection.bottom_k(3, 'group')] == ['d', 'a', 'c']
+
+
+def test_rankings_follow_values_changed_after_adding():
+    collection, items = _grouped(VALUES)
+    items[3].set_value(10.0)
+    assert collection.top_k(1, 'group') == [items[3]]
+    assert collection.rank('group')[-1] is items[3]
+    assert collection.bottom_k(1, 'group') == [items[0]]
@@ -0,0 +1,124 @@
+"""Jobs are shared through their directory, so any worker can report, reuse or cancel them."""
+import time
+
+import pytest
+
+from analytics_jobs import JOB_KINDS, PARAMETER_ERRORS
+from file_store import FileStore
+from job_executor import CANCELLED, DONE, FINISHED, QUEUED, RUNNING, JobError, JobExecutor
+from weapon_table import WeaponTable
+
+VERSION = 'catalog-1'
+RANK = {'profiles': [{'level': 10, 'strength': 40}, {'faith': 60, 'level': 3}], 'limit': 3}
+
+
+@pytest.fixture(scope='module')
+def table(records):
+    return WeaponTable(records)
+
+
+def _executor(table, directory):
+    executor = JobExecutor(JOB_KINDS, str(directory), workers=1, poll_interval=0.02)
+    executor.reset(table, VERSION)
+    return executor
+
+
+def _wait(executor, job_id, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        description = executor.describe(job_id)
+        if description['status'] in FINISHED:
+            return description
+        time.sleep(0.05)
+    raise AssertionError(f'job {job_id} did not finish')
+
+
+def _inline(table, kind, params):
+    job_kind = JOB_KINDS[kind]
+    params, chunks = job_kind.plan(table, params)
+    return job_kind.combine(table, params, [job_kind.run(table, params, chunk) for chunk in chunks])
+
+
+def test_jobs_are_shared_between_executors(table, tmp_path):
+    # Two executors over one directory stand in for two gunicorn workers
+    first, second = _executor(table, tmp_path), _executor(table, tmp_path)
+    description, reused = first.submit('rank', RANK)
+    assert (description['status'], reused) == (QUEUED, False)
+    done = _wait(second, description['job_id'])
+    assert done['status'] == DONE
+    assert done['progress']['completed'] == done['progress']['total']
+    # Results round-trip through JSON, as jsonify() sends them
+    expected = _inline(table, 'rank', RANK)
+    for ranking, result in zip(expected['rankings'], done['result']['rankings']):
+        assert ranking['profile'] == result['profile']
+        assert ranking['results'] == result['results']
+
+    again, reused = second.submit('rank', RANK)
+    assert (again['job_id'], again['status'], reused) == (description['job_id'], DONE, True)
+
+
+def test_cancel_and_resubmit(table, tmp_path):
+    first, second = _executor(table, tmp_path), _executor(table, tmp_path)
+    description, _ = first.submit('sweep', {'level': 3})
+    assert second.cancel(description['job_id']) is True
+    assert second.cancel(description['job_id']) is False
+    assert first.describe(description['job_id'])['status'] == CANCELLED
+    rerun, reused = second.submit('sweep', {'level': 3})
+    assert not reused
+    assert _wait(first, rerun['job_id'])['status'] == DONE
+    assert first.cancel('no-such-job') is None
+
+
+def test_orphaned_running_jobs_are_restarted(table, tmp_path):
+    executor = _executor(table, tmp_path)
+    description, _ = executor.submit('sweep', {'type': 'Dagger'})
+    _wait(executor, description['job_id'])
+    # What a runner that died mid-job leaves behind
+    FileStore(str(tmp_path)).update(description['job_id'], lambda document: document.update(
+        status=RUNNING, finished=None, progress={'completed': 1, 'total': 4}))
+    restarted = _wait(executor, description['job_id'])
+    assert restarted['status'] == DONE
+    assert restarted['result'] == _inline(table, 'sweep', {'type': 'Dagger'})
+
+
+def test_jobs_of_a_replaced_catalog_fail(table, tmp_path):
+    executor = _executor(table, tmp_path)
+    # Make the up-to-date executor the runner before the stale one asks
+    assert executor.describe('no-such-job') is None
+    while not executor.stats()['runner']:
+        time.sleep(0.01)
+    stale = JobExecutor(JOB_KINDS, str(tmp_path))
+    stale.reset(table, 'catalog-0')
+    description, _ = stale.submit('sweep', {'type': 'Dagger'})
+    failed = _wait(executor, description['job_id'])
+    assert failed['status'] == 'failed' and 'catalog changed' in failed['error']
+
+
+@pytest.mark.parametrize('kind, params', [
+    ('optimize', {'budget': 60, 'minimums': [10, 10]}),
+    ('optimize', {'budget': 60, 'minimums': 'strength'}),
+    ('sweep', {'attributes': 'strength'}),
+    ('sweep', {'attributes': {'strength': 1}}),
+    ('sweep', {'type': ['Dagger']}),
+    ('rank', {'profiles': [10, 20]}),
+    ('rank', {'profiles': [{}], 'type': 5}),
+])
+def test_malformed_params_are_job_errors(table, kind, params):
+    with pytest.raises(JobError):
+        JOB_KINDS[kind].plan(table, params)
+
+
+def test_bad_values_are_parameter_errors(table):
+    # Anything plan() raises for bad input is answered with a 400
+    for kind, params in [('optimize', {'budget': 'lots'}), ('sweep', {'level': []}), ('rank', {'profiles': [{'level': 'x'}]})]:
+        with pytest.raises(PARAMETER_ERRORS):
+            JOB_KINDS[kind].plan(table, params)
+
+
+def test_store_directories_are_created_on_first_write(table, tmp_path):
+    directory = tmp_path / 'jobs'
+    executor = JobExecutor(JOB_KINDS, str(directory))
+    executor.reset(table, VERSION)
+    assert executor.stats()['jobs'] == 0 and not directory.exists()
+    FileStore(str(directory)).create('job', {})
+    assert directory.exists()
@@ -0,0 +1,76 @@
+"""Live sessions are shared through their directory, so any worker can serve them."""
+import os
+import threading
+import time
+
+from live_session import DEFAULT_PROFILE, SessionStore
+
+
+def test_sessions_are_shared_between_stores(tmp_path):
+    # Two stores over one directory stand in for two gunicorn workers
+    first, second = SessionStore(str(tmp_path)), SessionStore(str(tmp_path))
+    session_id = first.create().id()
+    accepted, session = second.update(session_id, [('Dagger', 1, {'strength': 40})])
+    assert accepted == 1 and session.version() == 1
+    assert first.get(session_id).changes(0) == [(1, 'Dagger', 1, {**DEFAULT_PROFILE, 'strength': 40})]
+    assert len(second) == 1
+    assert first.close(session_id)
+    assert second.get(session_id) is None
+    assert second.update(session_id, [('Dagger', 2, {})]) is None
+
+
+def test_stale_fields_do_not_roll_back(tmp_path):
+    store = SessionStore(str(tmp_path))
+    session_id = store.create().id()
+    accepted, _ = store.update(session_id, [('Dagger', 5, {'strength': 50, 'level': 3}),
+                                            ('Dagger', 4, {'strength': 40}), ('Dagger', 4, {'dexterity': 20})])
+    assert accepted == 2
+    [(version, _, seq, profile)] = store.get(session_id).changes(0)
+    assert (version, seq) == (2, 5)
+    assert (profile['strength'], profile['level'], profile['dexterity']) == (50, 3, 20)
+
+
+def test_changes_resume_after_a_version(tmp_path):
+    store = SessionStore(str(tmp_path))
+    session_id = store.create().id()
+    store.update(session_id, [('Dagger', 1, {'level': 1}), ('Moonveil', 2, {'level': 2}), ('Dagger', 3, {'level': 3})])
+    session = store.get(session_id)
+    assert [(version, name) for version, name, _, _ in session.changes(0)] == [(2, 'Moonveil'), (3, 'Dagger')]
+    assert session.changes(3) == []
+
+
+def test_update_returns_the_coalesced_weapons(tmp_path):
+    store = SessionStore(str(tmp_path))
+    session_id = store.create().id()
+    store.update(session_id, [('Moonveil', 1, {'level': 5})])
+    accepted, session = store.update(session_id, [('Dagger', 2, {'strength': 20}), ('Dagger', 3, {'faith': 30}),
+                                                  ('Dagger', 1, {'faith': 5})])
+    assert accepted == 2
+    [(version, name, seq, profile)] = session.current(['Dagger', 'Dagger', 'Uchigatana'])
+    assert (version, name, seq) == (3, 'Dagger', 3)
+    assert (profile['strength'], profile['faith']) == (20, 30)
+
+
+def test_wait_returns_on_update_or_timeout(tmp_path):
+    store = SessionStore(str(tmp_path), poll_interval=0.01)
+    session_id = store.create().id()
+    started = time.monotonic()
+    assert store.wait(session_id, 0, 0.1) == []
+    assert time.monotonic() - started >= 0.1
+
+    updater = threading.Timer(0.05, store.update, (session_id, [('Dagger', 1, {'faith': 30})]))
+    updater.start()
+    assert [name for _, name, _, _ in store.wait(session_id, 0, 5)] == ['Dagger']
+    updater.join()
+    assert store.wait('no-such-session', 0, 0.1) is None
+    assert store.wait('../escape', 0, 0.1) is None
+
+
+def test_idle_sessions_expire(tmp_path):
+    store = SessionStore(str(tmp_path), idle_timeout=60)
+    idle = store.create().id()
+    path = os.path.join(str(tmp_path), f'{idle}.json')
+    os.utime(path, (time.time() - 120, time.time() - 120))
+    store.create()
+    assert store.get(idle) is None
+    assert len(store) == 1
@@ -0,0 +1,49 @@
+"""NameIndex lookups through normalized names and their aliases."""
+from name_index import NameIndex, normalize_name
+
+
+def test_normalize_name_folds_case_accents_and_punctuation():
+    assert normalize_name('Miséricorde') == normalize_name('MISERICORDE') == 'misericorde'
+    assert normalize_name('St. Trina’s  Torch') == normalize_name("st trina's torch") == "st trina's torch"
+    assert normalize_name('Rivers`of_Blood ') == "rivers'of blood"
+    assert normalize_name('Ｄａｇｇｅｒ') == 'dagger'
+    # The ASCII fast path gives what the unicodedata path gives
+    assert normalize_name('Coded Sword, Grafted Blade') == normalize_name('Coded Sword, Grafted Bladé')
+
+
+def test_lookups_by_normalized_names_and_aliases():
+    index = NameIndex()
+    for row, name in enumerate(['Miséricorde', "Devourer's Scepter", 'Ghiza’s Wheel', 'Bloodhound’s Fang',
+                                'Great-Stars', "St. Trina's Torch"]):
+        index.add(name, row)
+    assert len(index) == 6
+    assert index.get('misericorde') == 0
+    assert index.get('MISÉRICORDE') == 0
+    assert index.get('devourers scepter') == 1
+    assert index.get("devourer`s  scepter") == 1
+    assert index.get("Ghiza's Wheel") == 2
+    assert index.get('ghizas wheel') == 2
+    assert index.get('Bloodhounds Fang') == 3
+    assert index.get('great stars') == 4
+    assert index.get('great-stars') == 4
+    assert index.get('st trinas torch') == 5
+    assert index.get('St Trina’s Torch') == 5
+    assert index.get('moonveil') is None
+    assert index.get('moonveil', 'missing') == 'missing'
+    assert 'Great Stars' in index and 'Greatstars' not in index
+
+
+def test_exact_names_win_over_aliases():
+    index = NameIndex()
+    index.add("Ruins Greatsword", 'alias owner')
+    index.add("Ruin's Greatsword", 'apostrophe')
+    index.add('Ruins-Greatsword', 'hyphen')
+    # "ruins greatsword" is both an exact key and an alias of the other two
+    assert index.get('ruins greatsword') == 'alias owner'
+    assert index.get("ruin's greatsword") == 'apostrophe'
+    assert index.get('ruins-greatsword') == 'hyphen'
+    # The first object registered under an alias keeps it
+    later = NameIndex()
+    later.add("Ruin's Greatsword", 'first')
+    later.add('Ruins-Greatsword', 'second')
+    assert later.get('Ruins Greatsword') == 'first'
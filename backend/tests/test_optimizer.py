@@ -0,0 +1,70 @@
+"""The optimizer against exhaustive search over small budgets."""
+import itertools
+
+import numpy as np
+import pytest
+
+from optimizer import OptimizerError, optimize_allocation, optimize_catalog
+from weapon_table import ATTRIBUTES, DAMAGE_TYPES, WeaponTable
+
+# Few enough spare points over the minimums to try every allocation
+MINIMUMS = {'strength': 8, 'dexterity': 9, 'intelligence': 8, 'faith': 9, 'arcane': 8}
+SPARE = 9
+
+
+@pytest.fixture(scope='module')
+def table(records):
+    # Every eighth weapon: a small catalog that still covers every scaling shape
+    return WeaponTable(records[::8])
+
+
+def _allocations():
+    """Every spread of at most SPARE extra points, as one array per attribute."""
+    spreads = [spread for spread in itertools.product(range(SPARE + 1), repeat=len(ATTRIBUTES))
+               if sum(spread) <= SPARE]
+    extra = np.array(spreads).T
+    return {stat: MINIMUMS[stat] + extra[i] for i, stat in enumerate(ATTRIBUTES)}
+
+
+def _brute_force(table, row, level, fields):
+    allocations = _allocations()
+    scaled = table.evaluate(level=level, indices=[row], **allocations)
+    return max(sum(scaled[field][..., 0] for field in fields)).item()
+
+
+@pytest.mark.parametrize('objective, fields', [
+    ('total', DAMAGE_TYPES), ('value', ('value',)), ('magic_damage', ('magic_damage',))])
+def test_allocation_matches_exhaustive_search(table, objective, fields):
+    budget = sum(MINIMUMS.values()) + SPARE
+    for row in range(len(table)):
+        for level in (0, 7):
+            result = optimize_allocation(table, row, level, budget, MINIMUMS, objective)
+            assert result['score'] == pytest.approx(_brute_force(table, row, result['level'], fields))
+            assert result['points_spent'] <= budget
+            assert all(result['allocation'][stat] >= MINIMUMS[stat] for stat in ATTRIBUTES)
+            # The reported score is what the allocation actually scales to
+            scaled = table.evaluate(level=result['level'], indices=[row], **result['allocation'])
+            assert result['score'] == pytest.approx(sum(scaled[field][0].item() for field in fields))
+
+
+def test_catalog_search_matches_solving_every_weapon(table):
+    budget = sum(MINIMUMS.values()) + SPARE
+    for objective in ('total', 'value', 'fire_damage'):
+        exact = sorted((optimize_allocation(table, row, 10, budget, MINIMUMS, objective)['score']
+                        for row in range(len(table))), reverse=True)
+        for limit in (1, 5):
+            results = optimize_catalog(table, 10, budget, MINIMUMS, objective, limit)
+            assert [result['score'] for result in results] == pytest.approx(exact[:limit])
+        rows = [row for row, weapon_type in enumerate(table.types()) if weapon_type == table.types()[0]]
+        results = optimize_catalog(table, 10, budget, MINIMUMS, objective, 3, rows)
+        assert {result['name'] for result in results} <= {table.names()[row] for row in rows}
+        assert [result['score'] for result in results] == pytest.approx(sorted(
+            (optimize_allocation(table, row, 10, budget, MINIMUMS, objective)['score'] for row in rows),
+            reverse=True)[:3])
+
+
+def test_unreachable_budgets_are_rejected(table):
+    with pytest.raises(OptimizerError):
+        optimize_allocation(table, 0, 1, sum(MINIMUMS.values()) - 1, MINIMUMS)
+    with pytest.raises(OptimizerError):
+        optimize_catalog(table, 1, 60, {'luck': 10})
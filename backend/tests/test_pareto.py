@@ -0,0 +1,49 @@
+"""skyline() against the quadratic definition of dominance."""
+import numpy as np
+
+from pareto import skyline
+
+
+def _dominates(weights, scores, i, j):
+    return (weights[i] <= weights[j] and scores[i] >= scores[j] and
+            (weights[i] < weights[j] or scores[i] > scores[j]))
+
+
+def _check(weights, scores):
+    frontier, dominator = skyline(weights, scores)
+    n = len(weights)
+    dominated = {j for j in range(n) if any(_dominates(weights, scores, i, j) for i in range(n))}
+    assert set(frontier.tolist()) == set(range(n)) - dominated
+    assert len(frontier) == len(set(frontier.tolist()))
+    # Ordered by weight, with scores rising along it (identical weapons share a place)
+    assert np.all(np.diff(weights[frontier]) >= 0)
+    assert np.all(np.diff(scores[frontier]) >= 0)
+    for j in range(n):
+        if j not in dominated:
+            assert dominator[j] == -1
+            continue
+        # The frontier member dominating j with the smallest score surplus
+        candidates = [i for i in frontier if _dominates(weights, scores, i, j)]
+        assert dominator[j] in candidates
+        assert scores[dominator[j]] == min(scores[i] for i in candidates)
+
+
+def test_skyline_matches_brute_force():
+    rng = np.random.default_rng(2022)
+    for n in (1, 2, 5, 30, 200):
+        for _ in range(20):
+            # Few distinct values, so equal weights and scores are common
+            weights = rng.integers(0, 8, n).astype(np.float64) / 2
+            scores = rng.integers(0, 10, n).astype(np.float64)
+            _check(weights, scores)
+        _check(rng.random(n) * 20, rng.random(n) * 300)
+
+
+def test_skyline_edge_cases():
+    frontier, dominator = skyline([], [])
+    assert len(frontier) == 0 and len(dominator) == 0
+    # Identical weapons do not dominate each other
+    frontier, dominator = skyline([3.0, 3.0], [10.0, 10.0])
+    assert sorted(frontier.tolist()) == [0, 1] and dominator.tolist() == [-1, -1]
+    frontier, dominator = skyline([1.0, 2.0, 2.0], [5.0, 5.0, 7.0])
+    assert frontier.tolist() == [0, 2] and dominator.tolist() == [-1, 0, -1]
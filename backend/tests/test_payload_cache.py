@@ -0,0 +1,69 @@
+"""CachedPayload builds each representation once, on first use."""
+import gzip
+import json
+import threading
+
+from flask import Flask, request
+
+from payload_cache import CachedPayload
+
+DATA = [{'name': 'Dagger', 'value': 1.5}, {'name': 'Moonveil', 'value': 2.5}]
+
+
+def _payload():
+    calls = []
+
+    def build():
+        calls.append(1)
+        return DATA
+    return CachedPayload(build), calls
+
+
+def _respond(payload, headers):
+    app = Flask(__name__)
+    with app.test_request_context(headers=headers):
+        return payload.response(request)
+
+
+def test_nothing_is_built_up_front():
+    payload, calls = _payload()
+    assert calls == [] and payload.built_sizes() == {}
+    payload.etag()
+    assert len(calls) == 1
+    assert list(payload._media) == ['application/json']
+    assert list(payload._media['application/json']) == ['identity']
+    assert json.loads(payload._media['application/json']['identity'][0]) == DATA
+    assert payload.built_sizes() == {'identity': len(payload._media['application/json']['identity'][0])}
+
+
+def test_compressed_bodies_are_built_on_first_request():
+    payload, calls = _payload()
+    response = _respond(payload, {'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(response.get_data())) == DATA
+    assert response.headers['ETag'] == f'"{payload.etag("gzip")}"'
+    assert 'gzip' in payload._media['application/json']
+    assert len(calls) == 1
+
+
+def test_not_modified_without_building_the_encoding():
+    payload, _ = _payload()
+    response = _respond(payload, {'Accept-Encoding': 'gzip', 'If-None-Match': f'"{payload.etag("gzip")}"'})
+    assert response.status_code == 304
+    assert list(payload._media['application/json']) == ['identity']
+
+
+def test_concurrent_requests_build_once():
+    payload, calls = _payload()
+    barrier = threading.Barrier(8)
+
+    def size():
+        barrier.wait()
+        payload.size('gzip')
+    threads = [threading.Thread(target=size) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert payload.size('gzip') == len(payload._media['application/json']['gzip'][0])
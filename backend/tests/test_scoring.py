@@ -0,0 +1,67 @@
+"""The batched scoring paths must give exactly what the Weapon formulas give."""
+import numpy as np
+
+from conftest import as_weapon, random_profile, weapon_stats
+from scaling_tables import ScalingTables
+from stat_cache import ScaledStatCache
+from weapon_table import ATTRIBUTES, WeaponTable
+
+PROFILES = 40
+
+
+def test_weapon_table_evaluate_matches_weapon(records, rng):
+    table = WeaponTable(records)
+    for _ in range(PROFILES):
+        level, stats = random_profile(rng)
+        scaled = table.evaluate(level, **stats)
+        values = table.values(level, **stats)
+        for row, record in enumerate(records):
+            expected = weapon_stats(as_weapon(record, level, **stats))
+            assert {field: column[row].item() for field, column in scaled.items()} == expected, record.name()
+            assert values[row].item() == expected['value'], record.name()
+
+
+def test_weapon_table_profile_broadcasting(records, rng):
+    table = WeaponTable(records)
+    profiles = [random_profile(rng) for _ in range(PROFILES)]
+    levels = np.array([level for level, _ in profiles])
+    stats = {stat: np.array([profile[stat] for _, profile in profiles]) for stat in ATTRIBUTES}
+    rows = [rng.randrange(len(records)) for _ in range(5)]
+    scaled = table.evaluate(levels, indices=rows, **stats)
+    for i, (level, profile) in enumerate(profiles):
+        for position, row in enumerate(rows):
+            expected = weapon_stats(as_weapon(records[row], level, **profile))
+            assert {field: column[i, position].item() for field, column in scaled.items()} == expected
+
+
+def test_weapon_table_evaluate_pairs_matches_weapon(records, rng):
+    table = WeaponTable(records)
+    rows = [rng.randrange(len(records)) for _ in range(2000)]
+    profiles = [random_profile(rng) for _ in rows]
+    scaled = table.evaluate_pairs(rows, level=[level for level, _ in profiles],
+                                  **{stat: [profile[stat] for _, profile in profiles] for stat in ATTRIBUTES})
+    for i, (row, (level, profile)) in enumerate(zip(rows, profiles)):
+        expected = weapon_stats(as_weapon(records[row], level, **profile))
+        assert {field: column[i].item() for field, column in scaled.items()} == expected
+
+
+def test_scaling_tables_match_weapon(records, rng):
+    tables = ScalingTables.compile(WeaponTable(records))
+    for _ in range(PROFILES):
+        level, stats = random_profile(rng)
+        for row, record in enumerate(records):
+            assert tables.stats(row, level, *stats.values()) == weapon_stats(as_weapon(record, level, **stats))
+
+
+def test_stat_cache_matches_weapon(records, rng):
+    table = WeaponTable(records)
+    tables = ScalingTables.compile(table)
+    # Small enough that the run also exercises eviction
+    cache = ScaledStatCache(maxsize=512)
+    cache.reset(table.scaling())
+    for _ in range(20000):
+        row = rng.randrange(len(records))
+        level, stats = random_profile(rng)
+        cached = cache.get(row, level, *stats.values(), tables.stats)
+        assert cached == weapon_stats(as_weapon(records[row], level, **stats))
+    assert cache.stats()['hits'] > 0 and cache.stats()['evictions'] > 0
@@ -0,0 +1,72 @@
+"""A table read in place from the mapped snapshot must match one built from the WeaponRecords."""
+import pickle
+
+import numpy as np
+import pytest
+
+from catalog_snapshot import CatalogSnapshot, write_snapshot
+from conftest import random_profile
+from weapon_table import WeaponTable
+
+ACCESSORS = ('name', 'type', 'physical_damage', 'magic_damage', 'fire_damage', 'light_damage', 'holy_damage',
+             'crit_damage', 'stamina_damage', 'strength_scaling', 'dexterity_scaling', 'intelligence_scaling',
+             'faith_scaling', 'arcane_scaling', 'weight', 'upgrade_stone', 'image_url', 'description', 'value')
+COLUMNS = ('names', 'types', 'upgrade_stones', 'weights', 'crit_damages', 'stamina_damages', 'max_levels',
+           'somber', 'base_values', 'scaling', 'base_damage')
+
+
+@pytest.fixture
+def sources(tmp_path):
+    paths = [tmp_path / 'stats.csv', tmp_path / 'details.csv']
+    for path in paths:
+        path.write_text(path.name)
+    return [str(path) for path in paths]
+
+
+@pytest.fixture
+def snapshot(records, sources, tmp_path):
+    path = str(tmp_path / 'weapons.snapshot')
+    write_snapshot(path, records, sources)
+    return CatalogSnapshot.load(path, sources)
+
+
+def test_snapshot_weapons_match_records(records, snapshot):
+    assert len(snapshot) == len(records)
+    for weapon, record in zip(snapshot.weapons(), records):
+        for accessor in ACCESSORS:
+            assert getattr(weapon, accessor)() == getattr(record, accessor)(), (record.name(), accessor)
+        decoded = weapon.record()
+        assert [getattr(decoded, accessor)() for accessor in ACCESSORS] == \
+            [getattr(record, accessor)() for accessor in ACCESSORS]
+
+
+def test_snapshot_table_matches_record_table(records, snapshot, rng):
+    mapped = WeaponTable.from_snapshot(snapshot)
+    built = WeaponTable(records)
+    for column in COLUMNS:
+        np.testing.assert_array_equal(getattr(mapped, column)(), getattr(built, column)(), err_msg=column)
+    for _ in range(10):
+        level, stats = random_profile(rng)
+        expected = built.evaluate(level, **stats)
+        for field, values in mapped.evaluate(level, **stats).items():
+            np.testing.assert_array_equal(values, expected[field], err_msg=field)
+
+
+def test_snapshot_table_pickles_as_its_path(records, snapshot):
+    table = WeaponTable.from_snapshot(snapshot)
+    payload = pickle.dumps(table)
+    # The columns stay in the mapped file; only the path and source stamps travel
+    assert len(payload) < 4096
+    restored = pickle.loads(payload)
+    assert restored.names() == table.names()
+    np.testing.assert_array_equal(restored.base_values(), table.base_values())
+
+
+def test_snapshot_rejects_rebuilt_file(records, snapshot, sources, tmp_path):
+    payload = pickle.dumps(WeaponTable.from_snapshot(snapshot))
+    with open(sources[0], 'a') as file:
+        file.write('changed')
+    assert not snapshot.is_fresh()
+    write_snapshot(str(tmp_path / 'weapons.snapshot'), records, sources)
+    with pytest.raises(ValueError):
+        pickle.loads(payload)
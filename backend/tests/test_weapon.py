@@ -0,0 +1,56 @@
+"""ScaledWeapon views over a WeaponRecord must behave exactly like the original Weapon."""
+import operator
+
+import pytest
+
+from conftest import as_weapon, random_profile, weapon_stats
+from weapon_table import ATTRIBUTES
+
+PROFILES = 50000
+SETTERS = ('set_player_strength', 'set_player_dexterity', 'set_player_intelligence', 'set_player_faith',
+           'set_player_arcane')
+OPERATORS = (operator.lt, operator.gt, operator.le, operator.ge, operator.eq, operator.ne,
+             operator.add, operator.sub, operator.mul, operator.truediv)
+
+
+def _outcome(function, *args):
+    try:
+        return function(*args)
+    except ZeroDivisionError:
+        return ZeroDivisionError
+
+
+def test_scaled_weapon_matches_weapon(records, rng):
+    for _ in range(PROFILES):
+        record = rng.choice(records)
+        level, stats = random_profile(rng)
+        scaled = record.scaled(level, *stats.values())
+        weapon = as_weapon(record, level, **stats)
+        assert weapon_stats(scaled) == weapon_stats(weapon), record.name()
+        assert (str(scaled), len(scaled)) == (str(weapon), len(weapon))
+
+
+def test_scaled_weapon_setters_clamp_like_weapon(records, rng):
+    for _ in range(PROFILES // 10):
+        record = rng.choice(records)
+        scaled, weapon = record.scaled(), as_weapon(record)
+        level, stats = random_profile(rng)
+        scaled.set_level(level)
+        weapon.set_level(level)
+        for setter, stat in zip(SETTERS, ATTRIBUTES):
+            getattr(scaled, setter)(stats[stat])
+            getattr(weapon, setter)(stats[stat])
+        assert scaled.level() == weapon._level
+        assert weapon_stats(scaled) == weapon_stats(weapon), record.name()
+
+
+@pytest.mark.parametrize('compare', OPERATORS, ids=lambda function: function.__name__)
+def test_scaled_weapon_operators_match_weapon(records, rng, compare):
+    for _ in range(PROFILES // 50):
+        pair = [rng.choice(records) for _ in range(2)]
+        profiles = [random_profile(rng) for _ in range(2)]
+        scaled = [record.scaled(level, *stats.values()) for record, (level, stats) in zip(pair, profiles)]
+        weapons = [as_weapon(record, level, **stats) for record, (level, stats) in zip(pair, profiles)]
+        assert _outcome(compare, *scaled) == _outcome(compare, *weapons)
+        # Mixed operands compare the same as two Weapons
+        assert _outcome(compare, scaled[0], weapons[1]) == _outcome(compare, *weapons)
@@ -200,4 +200,224 @@ class Weapon:
             ans = self.value() / other_weapon.value()
         except TypeError or ZeroDivisionError:
             ans = 0
-        return ans
\ No newline at end of file
+        return ans
+
+SOMBER_STONES = 'Somber Smithing Stones'
+
+
+def _level_bonus(upgrade_type, level):
+    return (0.08 if upgrade_type == SOMBER_STONES else 0.02) * level
+
+
+class WeaponRecord:
+    """Immutable base stats of a catalog weapon.
+
+    Holds only what the CSVs provide, in __slots__, and answers the same
+    accessors as an unscaled Weapon (level 0, every attribute at 10).
+    Scaled numbers come from cheap ScaledWeapon views over the record.
+    """
+
+    __slots__ = ('_name', '_type', '_base_physical', '_base_magic', '_base_fire', '_base_light', '_base_holy',
+                 '_critDMG', '_staminaDMG', '_strSCALE', '_dexSCALE', '_intSCALE', '_faiSCALE', '_arcSCALE',
+                 '_weight', '_upgradeTYPE', '_imgURL', '_description')
+
+    def __init__(self, name, weapon_type, physical_dmg, magic_dmg, fire_dmg, light_dmg, holy_dmg, crit_dmg, stamina_dmg,
+                 str_scale, dex_scale, int_scale, faith_scale, arc_scale, weight, upgrade_type, image_url, description=""):
+        values = (name, weapon_type, physical_dmg, magic_dmg, fire_dmg, light_dmg, holy_dmg, crit_dmg, stamina_dmg,
+                  str_scale, dex_scale, int_scale, faith_scale, arc_scale, weight, upgrade_type, image_url, description)
+        # The slots' own descriptors, as __setattr__ refuses; snapshot reads build these per request
+        for setter, value in zip(_RECORD_SETTERS, values):
+            setter(self, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def name(self): return self._name
+    def type(self): return self._type
+    def physical_damage(self): return self._base_physical
+    def magic_damage(self): return self._base_magic
+    def fire_damage(self): return self._base_fire
+    def light_damage(self): return self._base_light
+    def holy_damage(self): return self._base_holy
+    def crit_damage(self): return self._critDMG
+    def stamina_damage(self): return self._staminaDMG
+    def strength_scaling(self): return self._strSCALE
+    def dexterity_scaling(self): return self._dexSCALE
+    def intelligence_scaling(self): return self._intSCALE
+    def faith_scaling(self): return self._faiSCALE
+    def arcane_scaling(self): return self._arcSCALE
+    def weight(self): return self._weight
+    def upgrade_stone(self): return self._upgradeTYPE
+    def image_url(self): return self._imgURL
+    def description(self): return self._description
+
+    def value(self):
+        # Weapon.value() with no level or attribute scaling
+        return (
+            self._base_physical +
+            self._base_magic +
+            self._base_fire +
+            self._base_light +
+            self._base_holy +
+            self._critDMG
+        ) / max(1, self._staminaDMG) * 10
+
+    def scaled(self, level=0, stre=10, dex=10, inte=10, fai=10, arc=10):
+        """A view of this record at the given level and attributes."""
+        return ScaledWeapon(self, level, stre, dex, inte, fai, arc)
+
+    def __repr__(self):
+        return f'WeaponRecord({self._name!r}, {self._type!r})'
+
+    def __reduce__(self):
+        # __setattr__ is disabled, so unpickle through __init__ (e.g. in job pool processes)
+        return WeaponRecord, tuple(getattr(self, slot) for slot in self.__slots__)
+
+
+_RECORD_SETTERS = tuple(getattr(WeaponRecord, slot).__set__ for slot in WeaponRecord.__slots__)
+
+
+class ScaledWeapon:
+    """Level and attribute overrides on top of a shared WeaponRecord.
+
+    Behaves like the equivalent Weapon (same accessors, formulas, clamps and
+    value() comparisons) but only stores the record reference and the six
+    overrides.
+    """
+
+    __slots__ = ('_record', '_level', '_playerSTR', '_playerDEX', '_playerINT', '_playerFAI', '_playerARC')
+
+    def __init__(self, record, level=0, stre=10, dex=10, inte=10, fai=10, arc=10):
+        self._record = record
+        self._level = level
+        self._playerSTR = stre
+        self._playerDEX = dex
+        self._playerINT = inte
+        self._playerFAI = fai
+        self._playerARC = arc
+
+    def record(self): return self._record
+    def level(self): return self._level
+    def name(self): return self._record._name
+    def type(self): return self._record._type
+    def crit_damage(self): return self._record._critDMG
+    def stamina_damage(self): return self._record._staminaDMG
+    def strength_scaling(self): return self._record._strSCALE
+    def dexterity_scaling(self): return self._record._dexSCALE
+    def intelligence_scaling(self): return self._record._intSCALE
+    def faith_scaling(self): return self._record._faiSCALE
+    def arcane_scaling(self): return self._record._arcSCALE
+    def weight(self): return self._record._weight
+    def upgrade_stone(self): return self._record._upgradeTYPE
+    def image_url(self): return self._record._imgURL
+    def description(self): return self._record._description
+
+    def physical_damage(self):
+        record = self._record
+        str_bonus = max(0, (self._playerSTR - 10) * record._strSCALE * 0.01)
+        dex_bonus = max(0, (self._playerDEX - 10) * record._dexSCALE * 0.01)
+        level_bonus = _level_bonus(record._upgradeTYPE, self._level)
+        return int(record._base_physical * (1 + str_bonus + dex_bonus + level_bonus))
+
+    def magic_damage(self):
+        record = self._record
+        int_bonus = max(0, (self._playerINT - 10) * record._intSCALE * 0.01)
+        return int(record._base_magic * (1 + int_bonus + _level_bonus(record._upgradeTYPE, self._level)))
+
+    def fire_damage(self):
+        return self._faith_damage(self._record._base_fire)
+
+    def light_damage(self):
+        return self._faith_damage(self._record._base_light)
+
+    def holy_damage(self):
+        return self._faith_damage(self._record._base_holy)
+
+    def _faith_damage(self, base):
+        record = self._record
+        fai_bonus = max(0, (self._playerFAI - 10) * record._faiSCALE * 0.01)
+        return int(base * (1 + fai_bonus + _level_bonus(record._upgradeTYPE, self._level)))
+
+    def value(self):
+        record = self._record
+        attr_scaling = (
+            max(0, (self._playerSTR - 10) * record._strSCALE) +
+            max(0, (self._playerDEX - 10) * record._dexSCALE) +
+            max(0, (self._playerINT - 10) * record._intSCALE) +
+            max(0, (self._playerFAI - 10) * record._faiSCALE) +
+            max(0, (self._playerARC - 10) * record._arcSCALE)
+        ) * 0.01
+        base_damage = (
+            record._base_physical +
+            record._base_magic +
+            record._base_fire +
+            record._base_light +
+            record._base_holy +
+            record._critDMG
+        ) / max(1, record._staminaDMG)
+        return base_damage * (1 + _level_bonus(record._upgradeTYPE, self._level) + attr_scaling) * 10
+
+    def set_level(self, level):
+        max_level = 10 if self._record._upgradeTYPE == SOMBER_STONES else 25
+        self._level = max(0, min(level, max_level))
+
+    def set_player_strength(self, stat): self._playerSTR = max(1, min(stat, 99))
+    def set_player_dexterity(self, stat): self._playerDEX = max(1, min(stat, 99))
+    def set_player_intelligence(self, stat): self._playerINT = max(1, min(stat, 99))
+    def set_player_faith(self, stat): self._playerFAI = max(1, min(stat, 99))
+    def set_player_arcane(self, stat): self._playerARC = max(1, min(stat, 99))
+
+    def __str__(self):
+        return (f'{self.name()} [Type: {self.type()} | Rating %: {round(self.value(),1)}% | Weight: {self.weight()} | Level: {self._level}]')
+
+    def __len__(self):
+        return math.floor(self.value())
+
+    def __lt__(self, other_weapon):
+        return self.value() < other_weapon.value()
+
+    def __gt__(self, other_weapon):
+        return self.value() > other_weapon.value()
+
+    def __le__(self, other_weapon):
+        return self.value() <= other_weapon.value()
+
+    def __ge__(self, other_weapon):
+        return self.value() >= other_weapon.value()
+
+    def __eq__(self, other_weapon):
+        return self.value() == other_weapon.value()
+
+    def __ne__(self, other_weapon):
+        return self.value() != other_weapon.value()
+
+    def __add__(self, other_weapon):
+        try:
+            ans = self.value() + other_weapon.value()
+        except TypeError:
+            ans = 0
+        return ans
+
+    def __sub__(self, other_weapon):
+        try:
+            ans = self.value() - other_weapon.value()
+        except TypeError:
+            ans = 0
+        return ans
+
+    def __mul__(self, other_weapon):
+        try:
+            ans = self.value() * other_weapon.value()
+        except TypeError:
+            ans = 0
+        return ans
+
+    def __truediv__(self, other_weapon):
+        try:
+            ans = self.value() / other_weapon.value()
+        except TypeError:
+            ans = 0
+        return ans
@@ -0,0 +1,249 @@
+import numpy as np
+
+SOMBER_STONES = 'Somber Smithing Stones'
+SOMBER_RATE = 0.08
+REGULAR_RATE = 0.02
+SOMBER_MAX_LEVEL = 10
+REGULAR_MAX_LEVEL = 25
+
+ATTRIBUTES = ('strength', 'dexterity', 'intelligence', 'faith', 'arcane')
+DAMAGE_TYPES = ('physical_damage', 'magic_damage', 'fire_damage', 'light_damage', 'holy_damage')
+
+
+class WeaponTable:
+    """Columnar, NumPy-backed view of a weapon catalog.
+
+    Every column holds one entry per weapon, in the order the weapons were
+    given. evaluate() reproduces the Weapon damage and value() formulas for
+    the whole table (or a subset of rows) against one or many attribute/level
+    profiles in a single vectorized pass.
+    """
+
+    def __init__(self, weapons):
+        weapons = list(weapons)
+        self._snapshot = None
+        self._weapons = weapons
+        self._names = [weapon.name() for weapon in weapons]
+        self._types = [weapon.type() for weapon in weapons]
+        self._upgrade_stones = [weapon.upgrade_stone() for weapon in weapons]
+
+        self._physical = np.array([weapon._base_physical for weapon in weapons], dtype=np.int64)
+        self._magic = np.array([weapon._base_magic for weapon in weapons], dtype=np.int64)
+        self._fire = np.array([weapon._base_fire for weapon in weapons], dtype=np.int64)
+        self._light = np.array([weapon._base_light for weapon in weapons], dtype=np.int64)
+        self._holy = np.array([weapon._base_holy for weapon in weapons], dtype=np.int64)
+        self._crit = np.array([weapon.crit_damage() for weapon in weapons], dtype=np.int64)
+        self._stamina = np.array([weapon.stamina_damage() for weapon in weapons], dtype=np.int64)
+
+        self._str_scale = np.array([weapon.strength_scaling() for weapon in weapons], dtype=np.float64)
+        self._dex_scale = np.array([weapon.dexterity_scaling() for weapon in weapons], dtype=np.float64)
+        self._int_scale = np.array([weapon.intelligence_scaling() for weapon in weapons], dtype=np.float64)
+        self._fai_scale = np.array([weapon.faith_scaling() for weapon in weapons], dtype=np.float64)
+        self._arc_scale = np.array([weapon.arcane_scaling() for weapon in weapons], dtype=np.float64)
+
+        self._weight = np.array([weapon.weight() for weapon in weapons], dtype=np.float64)
+        self._derive()
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Build a table over a mapped CatalogSnapshot without copying its numbers.
+
+        The numeric columns are views into the mapped records, so every
+        worker reads them from the same page cache pages. Only names, types
+        and upgrade stones are decoded; weapons() are SnapshotWeapons.
+        """
+        table = cls.__new__(cls)
+        records = snapshot.records()
+        table._snapshot = snapshot
+        table._weapons = snapshot.weapons()
+        table._names = snapshot.strings('name')
+        table._types = snapshot.strings('type')
+        table._upgrade_stones = snapshot.strings('upgrade_type')
+        damage = records['damage']
+        (table._physical, table._magic, table._fire, table._light, table._holy,
+         table._crit, table._stamina) = (damage[:, i] for i in range(7))
+        scaling = records['scaling']
+        table._str_scale, table._dex_scale, table._int_scale, table._fai_scale, table._arc_scale = (
+            scaling[:, i] for i in range(5))
+        table._weight = records['weight']
+        table._derive()
+        return table
+
+    def _derive(self):
+        self._somber = np.array([stone == SOMBER_STONES for stone in self._upgrade_stones], dtype=bool)
+        self._level_rate = np.where(self._somber, SOMBER_RATE, REGULAR_RATE)
+        self._max_level = np.where(self._somber, SOMBER_MAX_LEVEL, REGULAR_MAX_LEVEL).astype(np.int64)
+
+        # (base sum) / max(1, stamina) is profile independent, so compute it once
+        base_total = sum(column.astype(np.int64) for column in (
+            self._physical, self._magic, self._fire, self._light, self._holy, self._crit))
+        self._base_value = base_total / np.maximum(1, self._stamina)
+
+    @classmethod
+    def from_collection(cls, collection):
+        """Build a table from every object in a CollectionObjects, key by key."""
+        weapons = []
+        for key in collection._object_dictionary:
+            weapons.extend(collection._object_dictionary[key])
+        return cls(weapons)
+
+    def __reduce_ex__(self, protocol):
+        # A snapshot-backed table is sent to other processes as its snapshot (a path)
+        if self._snapshot is not None:
+            return WeaponTable.from_snapshot, (self._snapshot,)
+        return super().__reduce_ex__(protocol)
+
+    def __len__(self):
+        return len(self._weapons)
+
+    def weapons(self): return self._weapons
+    def weapon(self, index): return self._weapons[index]
+    def snapshot(self): return self._snapshot
+    def names(self): return self._names
+    def types(self): return self._types
+    def upgrade_stones(self): return self._upgrade_stones
+    def weights(self): return self._weight
+    def crit_damages(self): return self._crit
+    def stamina_damages(self): return self._stamina
+    def max_levels(self): return self._max_level
+    def somber(self): return self._somber
+    def base_values(self): return self._base_value
+
+    def record(self, index):
+        """The WeaponRecord of a row, decoded from the snapshot when the table is mapped."""
+        weapon = self._weapons[index]
+        return weapon if self._snapshot is None else weapon.record()
+
+    def scaling(self):
+        """(n, 5) scaling grades, columns in ATTRIBUTES order."""
+        return np.stack([self._str_scale, self._dex_scale, self._int_scale, self._fai_scale, self._arc_scale], axis=1)
+
+    def base_damage(self):
+        """(n, 5) base damages, columns in DAMAGE_TYPES order."""
+        return np.stack([self._physical, self._magic, self._fire, self._light, self._holy], axis=1)
+
+    def evaluate(self, level=0, strength=10, dexterity=10, intelligence=10, faith=10, arcane=10, indices=None):
+        """Score the catalog against one or many attribute/level profiles.
+
+        Each profile argument may be a scalar or an array; all of them are
+        broadcast together to a common profile shape P. The result maps each
+        damage type and 'value' to an array of shape P + (n,), where n is the
+        number of selected rows (all rows unless indices is given).
+
+        Levels are used as given, exactly like the Weapon constructor; clamp
+        them against max_levels() first to get set_level() semantics.
+        """
+        level, strength, dexterity, intelligence, faith, arcane = _profiles(
+            level, strength, dexterity, intelligence, faith, arcane)
+        return self._evaluate(_rows(indices), level, strength, dexterity, intelligence, faith, arcane)
+
+    def evaluate_pairs(self, indices, level=0, strength=10, dexterity=10, intelligence=10, faith=10, arcane=10):
+        """Score row indices[i] against profile i, element by element.
+
+        indices and the profile arguments are broadcast together (no extra
+        weapon axis), so k rows with k profiles give arrays of shape (k,).
+        """
+        indices, level, strength, dexterity, intelligence, faith, arcane = np.broadcast_arrays(
+            np.asarray(indices, dtype=np.intp), level, strength, dexterity, intelligence, faith, arcane)
+        return self._evaluate(indices, level, strength, dexterity, intelligence, faith, arcane)
+
+    def _evaluate(self, rows, level, strength, dexterity, intelligence, faith, arcane):
+        level_bonus = self._level_rate[rows] * level
+
+        # Keep the exact operation order of the Weapon methods so the float
+        # results (and therefore the int() truncations) match bit for bit.
+        str_bonus = np.maximum(0, (strength - 10) * self._str_scale[rows] * 0.01)
+        dex_bonus = np.maximum(0, (dexterity - 10) * self._dex_scale[rows] * 0.01)
+        int_bonus = np.maximum(0, (intelligence - 10) * self._int_scale[rows] * 0.01)
+        fai_bonus = np.maximum(0, (faith - 10) * self._fai_scale[rows] * 0.01)
+        attr_scaling = self._attr_scaling(rows, strength, dexterity, intelligence, faith, arcane)
+
+        return {
+            'physical_damage': _truncate(self._physical[rows] * (1 + str_bonus + dex_bonus + level_bonus)),
+            'magic_damage': _truncate(self._magic[rows] * (1 + int_bonus + level_bonus)),
+            'fire_damage': _truncate(self._fire[rows] * (1 + fai_bonus + level_bonus)),
+            'light_damage': _truncate(self._light[rows] * (1 + fai_bonus + level_bonus)),
+            'holy_damage': _truncate(self._holy[rows] * (1 + fai_bonus + level_bonus)),
+            'value': self._base_value[rows] * (1 + level_bonus + attr_scaling) * 10,
+        }
+
+    def values(self, level=0, strength=10, dexterity=10, intelligence=10, faith=10, arcane=10, indices=None):
+        """Only the value() rating; skips the per-damage-type columns."""
+        level, strength, dexterity, intelligence, faith, arcane = _profiles(
+            level, strength, dexterity, intelligence, faith, arcane)
+        rows = _rows(indices)
+        attr_scaling = self._attr_scaling(rows, strength, dexterity, intelligence, faith, arcane)
+        return self._base_value[rows] * (1 + self._level_rate[rows] * level + attr_scaling) * 10
+
+    def sweep(self, row, level=0, strength=10, dexterity=10, intelligence=10, faith=10, arcane=10,
+              attributes=ATTRIBUTES, stat_range=(1, 99)):
+        """Damage curves for one weapon, from a single evaluate() call.
+
+        Returns {'level': {field: [...]}, 'attributes': {attribute: {field: [...]}}}.
+        The level curve runs from 0 to the weapon's max level with the given
+        attributes; each attribute curve runs over stat_range (inclusive) at
+        the given level with the other attributes held fixed.
+        """
+        fixed = np.array([level, strength, dexterity, intelligence, faith, arcane])
+        stats = np.arange(stat_range[0], stat_range[1] + 1)
+        blocks = [np.tile(fixed, (self._max_level[row] + 1, 1))]
+        blocks[0][:, 0] = np.arange(self._max_level[row] + 1)
+        for attribute in attributes:
+            block = np.tile(fixed, (len(stats), 1))
+            block[:, 1 + ATTRIBUTES.index(attribute)] = stats
+            blocks.append(block)
+        profiles = np.concatenate(blocks)
+
+        scaled = self.evaluate(*profiles.T, indices=[row])
+        bounds = np.cumsum([0] + [len(block) for block in blocks])
+
+        def curve(block):
+            return {field: column[bounds[block]:bounds[block + 1], 0].tolist() for field, column in scaled.items()}
+
+        return {
+            'level': curve(0),
+            'attributes': {attribute: curve(i + 1) for i, attribute in enumerate(attributes)}
+        }
+
+    def gains(self):
+        """Untruncated per-point gain of each attribute above 10.
+
+        Maps each damage type and 'value' to an (n, 5) array whose columns
+        follow ATTRIBUTES. Useful for bounds; the damage fields drop the int()
+        truncation, so they are upper bounds on the real per-point change.
+        """
+        zero = np.zeros(len(self))
+        scales = self.scaling()
+        return {
+            'physical_damage': np.stack([self._physical * self._str_scale * 0.01,
+                                         self._physical * self._dex_scale * 0.01, zero, zero, zero], axis=1),
+            'magic_damage': np.stack([zero, zero, self._magic * self._int_scale * 0.01, zero, zero], axis=1),
+            'fire_damage': np.stack([zero, zero, zero, self._fire * self._fai_scale * 0.01, zero], axis=1),
+            'light_damage': np.stack([zero, zero, zero, self._light * self._fai_scale * 0.01, zero], axis=1),
+            'holy_damage': np.stack([zero, zero, zero, self._holy * self._fai_scale * 0.01, zero], axis=1),
+            'value': self._base_value[:, np.newaxis] * scales * 0.1,
+        }
+
+    def _attr_scaling(self, rows, strength, dexterity, intelligence, faith, arcane):
+        # Mirrors Weapon._average_player_scaling_damage()
+        return (
+            np.maximum(0, (strength - 10) * self._str_scale[rows]) +
+            np.maximum(0, (dexterity - 10) * self._dex_scale[rows]) +
+            np.maximum(0, (intelligence - 10) * self._int_scale[rows]) +
+            np.maximum(0, (faith - 10) * self._fai_scale[rows]) +
+            np.maximum(0, (arcane - 10) * self._arc_scale[rows])
+        ) * 0.01
+
+
+def _truncate(damage):
+    """int() semantics: truncate toward zero."""
+    return np.trunc(damage).astype(np.int64)
+
+
+def _profiles(*stats):
+    """Broadcast profile arguments together, with a trailing axis for the weapon rows."""
+    return np.broadcast_arrays(*(np.asarray(stat)[..., np.newaxis] for stat in stats))
+
+
+def _rows(indices):
+    return slice(None) if indices is None else np.asarray(indices, dtype=np.intp)
@@ -0,0 +1,83 @@
+import json
+
+from flask import Response, jsonify
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional, JSON is always available
+    msgpack = None
+
+# Keys of a catalog entry, in weapon_summary() order
+SUMMARY_FIELDS = (
+    'name', 'type', 'physical_damage', 'magic_damage', 'fire_damage', 'light_damage', 'holy_damage',
+    'crit_damage', 'stamina_damage', 'strength_scaling', 'dexterity_scaling', 'intelligence_scaling',
+    'faith_scaling', 'arcane_scaling', 'weight', 'upgrade_type', 'value', 'image_url', 'description'
+)
+LAYOUTS = ('rows', 'columns')
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+
+class FormatError(ValueError):
+    """Raised for unknown fields or layouts."""
+
+
+def parse_fields(spec):
+    """Fields named in a comma-separated fields= value, in SUMMARY_FIELDS order; None for all."""
+    if spec is None:
+        return None
+    fields = {field.strip() for field in spec.split(',') if field.strip()}
+    unknown = fields - set(SUMMARY_FIELDS)
+    if unknown:
+        raise FormatError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    if not fields:
+        raise FormatError('fields must name at least one field')
+    return tuple(field for field in SUMMARY_FIELDS if field in fields)
+
+
+def parse_layout(layout):
+    layout = layout or 'rows'
+    if layout not in LAYOUTS:
+        raise FormatError("layout must be 'rows' or 'columns'")
+    return layout
+
+
+def shape(summaries, fields=None, layout='rows'):
+    """Project catalog entries onto fields and lay them out.
+
+    rows: a list of objects, as weapon_summary() builds them.
+    columns: one list per field ({field: [values]}), so every key is sent once.
+    """
+    fields = fields or SUMMARY_FIELDS
+    if layout == 'columns':
+        return {field: [summary[field] for summary in summaries] for field in fields}
+    if fields is SUMMARY_FIELDS:
+        return summaries
+    return [{field: summary[field] for field in fields} for summary in summaries]
+
+
+def media_types():
+    return [JSON_MIMETYPE, MSGPACK_MIMETYPE] if msgpack is not None else [JSON_MIMETYPE]
+
+
+def negotiate(request):
+    """JSON unless the client prefers MessagePack and it is installed."""
+    return request.accept_mimetypes.best_match(media_types(), default=JSON_MIMETYPE)
+
+
+def serialize(data, mimetype):
+    if mimetype == MSGPACK_MIMETYPE:
+        return msgpack.packb(data, use_bin_type=True)
+    return json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def respond(request, data):
+    """Uncached response in the negotiated media type."""
+    mimetype = negotiate(request)
+    if mimetype == JSON_MIMETYPE:
+        response = jsonify(data)
+    else:
+        response = Response(serialize(data, mimetype), mimetype=mimetype)
+    if msgpack is not None:
+        response.vary.add('Accept')
+    return response